@@ -207,6 +207,10 @@ class MartyBot:
             await asyncio.to_thread(self.envoyer_message, channel_id, message)
 
     def start(self):
+        # Permission checks rely on the Mattermost client being present, so they do not re-check it on every command.
+        if self.mattermost_api_client is None:
+            logging.error("Mattermost API client not available. Cannot start MartyBot.")
+            return
         logging.info(f"Initializing Marty Bot instance for dedicated thread: {threading.current_thread().name}")
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
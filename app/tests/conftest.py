@@ -0,0 +1,152 @@
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from clients.authentik_client import AuthentikClient
+from clients.brevo_client import BrevoClient
+from clients.mattermost_client import MattermostClient
+from clients.nocodb_client import NocoDBClient
+from clients.outline_client import OutlineClient
+from clients.vaultwarden_client import VaultwardenClient
+
+NOCODB_URL = "http://fake-nocodb.com"
+NOCODB_TOKEN = "fake-token"
+
+OUTLINE_URL = "http://fake-outline-url.com"
+OUTLINE_TOKEN = "fake_outline_token"
+
+MATTERMOST_URL = "http://fake-mattermost-url.com"
+MATTERMOST_TOKEN = "fake_mm_admin_token"
+MATTERMOST_TEAM_ID = "fake_team_id"
+
+
+@pytest.fixture(scope="module")
+def nocodb_client():
+    """A NocoDBClient shared by every test of a module. Tests must not mutate it."""
+    return NocoDBClient(nocodb_url=NOCODB_URL, token=NOCODB_TOKEN)
+
+
+@pytest.fixture(scope="module")
+def mm_client():
+    """A MattermostClient shared by every test of a module, built with a mocked /users/me call."""
+    me_response = Mock(status_code=200)
+    me_response.json.return_value = {"id": "bot_user_id_setup", "username": "testbot_setup"}
+    with patch("requests.Session.get", return_value=me_response):
+        return MattermostClient(base_url=MATTERMOST_URL, token=MATTERMOST_TOKEN, team_id=MATTERMOST_TEAM_ID)
+
+
+@pytest.fixture(scope="module")
+def outline_client():
+    """An OutlineClient shared by every test of a module. Tests must clear its cache before use."""
+    return OutlineClient(base_url=OUTLINE_URL, token=OUTLINE_TOKEN)
+
+
+def _public_api(client_class: type) -> list[str]:
+    """The public attribute names of a client class, used as a frozen spec_set."""
+    return [name for name in dir(client_class) if not name.startswith("_")]
+
+
+# Attribute lists computed once at import: spec_set=<list> skips the per-mock class introspection and
+# also rejects assignments to attributes the real client does not have.
+_AUTHENTIK_SPEC = _public_api(AuthentikClient)
+_MATTERMOST_SPEC = _public_api(MattermostClient)
+_OUTLINE_SPEC = _public_api(OutlineClient)
+_BREVO_SPEC = _public_api(BrevoClient)
+_NOCODB_SPEC = _public_api(NocoDBClient)
+_VAULTWARDEN_SPEC = _public_api(VaultwardenClient)
+
+
+# Each spec'd mock is built once per session and only reset (calls, return values, side effects)
+# before every test that uses it. They stay MagicMock rather than AsyncMock: the clients' methods are
+# synchronous and the services call them without awaiting, even from async methods such as
+# differential_sync(). Only awaited callables (e.g. orchestrate_group_synchronization) use AsyncMock.
+def _reset(spec_mock: MagicMock) -> MagicMock:
+    spec_mock.reset_mock(return_value=True, side_effect=True)
+    return spec_mock
+
+
+@pytest.fixture(scope="session")
+def _authentik_spec_mock():
+    return MagicMock(spec_set=_AUTHENTIK_SPEC)
+
+
+@pytest.fixture(scope="session")
+def _mattermost_spec_mock():
+    return MagicMock(spec_set=_MATTERMOST_SPEC)
+
+
+@pytest.fixture(scope="session")
+def _outline_spec_mock():
+    return MagicMock(spec_set=_OUTLINE_SPEC)
+
+
+@pytest.fixture(scope="session")
+def _brevo_spec_mock():
+    return MagicMock(spec_set=_BREVO_SPEC)
+
+
+@pytest.fixture(scope="session")
+def _nocodb_spec_mock():
+    return MagicMock(spec_set=_NOCODB_SPEC)
+
+
+@pytest.fixture(scope="session")
+def _vaultwarden_spec_mock():
+    return MagicMock(spec_set=_VAULTWARDEN_SPEC)
+
+
+@pytest.fixture
+def mock_auth(_authentik_spec_mock):
+    """A MagicMock(spec_set=<AuthentikClient public API>), reset for the current test."""
+    return _reset(_authentik_spec_mock)
+
+
+@pytest.fixture
+def mock_mm(_mattermost_spec_mock):
+    """A MagicMock(spec_set=<MattermostClient public API>), reset for the current test."""
+    return _reset(_mattermost_spec_mock)
+
+
+@pytest.fixture
+def mock_outline(_outline_spec_mock):
+    """A MagicMock(spec_set=<OutlineClient public API>), reset for the current test."""
+    return _reset(_outline_spec_mock)
+
+
+@pytest.fixture
+def mock_brevo(_brevo_spec_mock):
+    """A MagicMock(spec_set=<BrevoClient public API>), reset for the current test."""
+    return _reset(_brevo_spec_mock)
+
+
+@pytest.fixture
+def mock_nocodb(_nocodb_spec_mock):
+    """A MagicMock(spec_set=<NocoDBClient public API>), reset for the current test."""
+    return _reset(_nocodb_spec_mock)
+
+
+@pytest.fixture
+def mock_vaultwarden(_vaultwarden_spec_mock):
+    """A MagicMock(spec_set=<VaultwardenClient public API>), reset for the current test."""
+    return _reset(_vaultwarden_spec_mock)
+
+
+@pytest.fixture
+def default_clients(mock_auth, mock_mm, mock_outline, mock_brevo, mock_nocodb, mock_vaultwarden):
+    """The clients dict of orchestrate_group_synchronization, one spec'd mock per service.
+    Tests overlay it, e.g. {**default_clients, "mattermost": None}."""
+    return {
+        "authentik": mock_auth,
+        "mattermost": mock_mm,
+        "outline": mock_outline,
+        "brevo": mock_brevo,
+        "nocodb": mock_nocodb,
+        "vaultwarden": mock_vaultwarden,
+    }
+
+
+@pytest.fixture(scope="session")
+def permissions_matrix():
+    """A minimal PERMISSIONS_MATRIX with a single admin channel pattern. Shared by the whole session:
+    tests must not mutate it."""
+    return {"projet": {"admin": {"mattermost_channel_name_pattern": "projet-{base_name}-admin"}}}
@@ -1,9 +1,19 @@
+import io
 import logging  # Added for client logging visibility if needed during tests
 import unittest
 from unittest.mock import Mock, patch
 
+import orjson
 import requests
-from clients.authentik_client import AuthentikClient
+from urllib3.response import HTTPResponse
+from clients.authentik_client import PAGE_SIZE, REQUEST_TIMEOUT, AuthentikClient
+
+
+def _json_response(payload: dict, status_code: int = 200) -> Mock:
+    """A successful response whose body is payload, read through .content or .json()."""
+    response = Mock(status_code=status_code, content=orjson.dumps(payload))
+    response.json.return_value = payload
+    return response
 
 
 class TestAuthentikClient(unittest.TestCase):
@@ -24,6 +34,7 @@ class TestAuthentikClient(unittest.TestCase):
         self.assertIn(f"Bearer {self.mock_token}", self.client.headers["Authorization"])
         self.assertEqual(self.client.headers["Accept"], "application/json")
         self.assertEqual(self.client.headers["Content-Type"], "application/json")
+        self.assertEqual(self.client.session.headers["Authorization"], f"Bearer {self.mock_token}")
 
     def test_constructor_value_error(self):
         with self.assertRaisesRegex(ValueError, "Authentik base_url and token must be provided."):
@@ -35,7 +46,7 @@ class TestAuthentikClient(unittest.TestCase):
         with self.assertRaisesRegex(ValueError, "Authentik base_url and token must be provided."):
             AuthentikClient(base_url="fake", token="")
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_create_group_success(self, mock_post):
         mock_response = Mock(status_code=201)
         mock_response.json.return_value = {"pk": "group_id_123", "name": "test_project"}
@@ -43,10 +54,10 @@ class TestAuthentikClient(unittest.TestCase):
         result = self.client.create_group("test_project")
         expected_url = f"{self.mock_url}/api/v3/core/groups/"
         expected_payload = {"name": "test_project", "is_superuser": False}
-        mock_post.assert_called_once_with(expected_url, headers=self.client.headers, json=expected_payload)
+        mock_post.assert_called_once_with(expected_url, json=expected_payload, timeout=REQUEST_TIMEOUT)
         self.assertTrue(result)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_create_group_failure_http_error(self, mock_post):  # Renamed from api_error
         mock_response = Mock(status_code=400)  # Example: Bad Request
         mock_response.json.return_value = {"name": ["group with this name already exists."]}
@@ -55,7 +66,7 @@ class TestAuthentikClient(unittest.TestCase):
         result = self.client.create_group("test_project_fail")
         self.assertFalse(result)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_create_group_failure_request_exception(self, mock_post):
         mock_post.side_effect = requests.exceptions.RequestException("Connection error")
         result = self.client.create_group("test_project_exception")
@@ -65,8 +76,18 @@ class TestAuthentikClient(unittest.TestCase):
         client_with_slash = AuthentikClient(base_url="http://fake-authentik-url.com/", token=self.mock_token)
         self.assertEqual(client_with_slash.base_url, "http://fake-authentik-url.com")
 
+    @patch("urllib3.util.retry.time.sleep")  # Skip the retry backoff delays
+    @patch("urllib3.connectionpool.HTTPConnectionPool._make_request")
+    def test_create_group_is_not_resent_on_5xx(self, mock_make_request, mock_sleep):
+        # The group may have been created before the gateway failed: a resend would get "already exists"
+        mock_make_request.side_effect = lambda *args, **kwargs: HTTPResponse(
+            body=io.BytesIO(b"{}"), status=503, preload_content=False
+        )
+        self.assertFalse(self.client.create_group("Test Project"))
+        mock_make_request.assert_called_once()
+
     # Tests for get_groups_with_users
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_groups_with_users_success_no_pagination(self, mock_get):
         mock_response_data = {
             "results": [
@@ -86,8 +107,7 @@ class TestAuthentikClient(unittest.TestCase):
             ],
             "pagination": {"next": None},
         }
-        mock_response = Mock(status_code=200)
-        mock_response.json.return_value = mock_response_data
+        mock_response = _json_response(mock_response_data)
         mock_get.return_value = mock_response
 
         groups, email_map = self.client.get_groups_with_users()
@@ -99,11 +119,11 @@ class TestAuthentikClient(unittest.TestCase):
         self.assertEqual(email_map["b@b.com"], 2)
         self.assertEqual(email_map["c@c.com"], 3)
         mock_get.assert_called_once_with(
-            f"{self.mock_url}/api/v3/core/groups/?include_users=true",
-            headers=self.client.headers,
+            f"{self.mock_url}/api/v3/core/groups/?include_users=true&page_size={PAGE_SIZE}",
+            timeout=REQUEST_TIMEOUT,
         )
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_groups_with_users_success_with_pagination(self, mock_get):
         mock_response_page1_data = {
             "results": [
@@ -125,10 +145,8 @@ class TestAuthentikClient(unittest.TestCase):
             ],
             "pagination": {"next": None},
         }
-        mock_response_page1 = Mock(status_code=200)
-        mock_response_page1.json.return_value = mock_response_page1_data
-        mock_response_page2 = Mock(status_code=200)
-        mock_response_page2.json.return_value = mock_response_page2_data
+        mock_response_page1 = _json_response(mock_response_page1_data)
+        mock_response_page2 = _json_response(mock_response_page2_data)
 
         mock_get.side_effect = [mock_response_page1, mock_response_page2]
 
@@ -141,31 +159,60 @@ class TestAuthentikClient(unittest.TestCase):
         self.assertEqual(email_map["b@b.com"], 2)
         self.assertEqual(mock_get.call_count, 2)
         mock_get.assert_any_call(
-            f"{self.mock_url}/api/v3/core/groups/?include_users=true",
-            headers=self.client.headers,
+            f"{self.mock_url}/api/v3/core/groups/?include_users=true&page_size={PAGE_SIZE}",
+            timeout=REQUEST_TIMEOUT,
         )
         mock_get.assert_any_call(
             f"{self.mock_url}/api/v3/core/groups/?page=2&include_users=true",
-            headers=self.client.headers,
+            timeout=REQUEST_TIMEOUT,
         )
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
+    def test_get_groups_with_users_known_page_count(self, mock_get):
+        def get_page(url, params=None, timeout=None):
+            page = (params or {}).get("page", 1)
+            mock_response = _json_response(
+                {
+                    "results": [
+                        {
+                            "pk": f"g{page}",
+                            "name": f"Group {page}",
+                            "users_obj": [{"email": f"{page}@a.com", "pk": page}],
+                        }
+                    ],
+                    "pagination": {"next": page + 1 if page < 3 else 0, "total_pages": 3},
+                }
+            )
+            return mock_response
+
+        mock_get.side_effect = get_page
+
+        groups, email_map = self.client.get_groups_with_users()
+
+        # Pages 2 and 3 are requested by number, without following "next" from page to page
+        self.assertEqual([group["pk"] for group in groups], ["g1", "g2", "g3"])
+        self.assertEqual(email_map, {"1@a.com": 1, "2@a.com": 2, "3@a.com": 3})
+        self.assertEqual(mock_get.call_count, 3)
+        first_page_url = f"{self.mock_url}/api/v3/core/groups/?include_users=true&page_size={PAGE_SIZE}"
+        mock_get.assert_any_call(first_page_url, params={"page": 2}, timeout=REQUEST_TIMEOUT)
+        mock_get.assert_any_call(first_page_url, params={"page": 3}, timeout=REQUEST_TIMEOUT)
+
+    @patch("requests.Session.get")
     def test_get_groups_with_users_api_error(self, mock_get):
         mock_get.side_effect = requests.exceptions.RequestException("API error")
         groups, email_map = self.client.get_groups_with_users()
         self.assertEqual(groups, [])
         self.assertEqual(email_map, {})
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_groups_with_users_empty_response(self, mock_get):
-        mock_response = Mock(status_code=200)
-        mock_response.json.return_value = {"results": [], "pagination": {"next": None}}
+        mock_response = _json_response({"results": [], "pagination": {"next": None}})
         mock_get.return_value = mock_response
         groups, email_map = self.client.get_groups_with_users()
         self.assertEqual(groups, [])
         self.assertEqual(email_map, {})
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_groups_with_users_conflicting_email_pk(self, mock_get):
         mock_response_data = {
             "results": [
@@ -180,8 +227,7 @@ class TestAuthentikClient(unittest.TestCase):
             ],
             "pagination": {"next": None},
         }
-        mock_response = Mock(status_code=200)
-        mock_response.json.return_value = mock_response_data
+        mock_response = _json_response(mock_response_data)
         mock_get.return_value = mock_response
 
         with patch.object(logging, "warning") as mock_log_warning:
@@ -189,8 +235,25 @@ class TestAuthentikClient(unittest.TestCase):
             self.assertEqual(email_map["a@a.com"], 2)  # Uses the latest one
             mock_log_warning.assert_called_once()  # Check if warning was logged
 
+    @patch("requests.Session.get")
+    def test_get_groups_with_users_shared_member_is_not_a_conflict(self, mock_get):
+        mock_get.return_value = _json_response(
+            {
+                "results": [
+                    {"pk": "g1", "name": "Group 1", "users_obj": [{"email": "a@a.com", "pk": 1}]},
+                    {"pk": "g2", "name": "Group 2", "users_obj": [{"email": "a@a.com", "pk": 1}, {"pk": 3}]},
+                ],
+                "pagination": {"next": None},
+            }
+        )
+
+        with patch.object(logging, "warning") as mock_log_warning:
+            _, email_map = self.client.get_groups_with_users()
+        self.assertEqual(email_map, {"a@a.com": 1})
+        mock_log_warning.assert_not_called()
+
     # Tests for add_user_to_group
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_add_user_to_group_success(self, mock_post):
         mock_response = Mock(status_code=204)  # Or 200, depending on API
         mock_post.return_value = mock_response
@@ -198,9 +261,9 @@ class TestAuthentikClient(unittest.TestCase):
         self.assertTrue(result)
         expected_url = f"{self.mock_url}/api/v3/core/groups/group_pk_1/add_user/"
         expected_payload = {"pk": 123}
-        mock_post.assert_called_once_with(expected_url, headers=self.client.headers, json=expected_payload)
+        mock_post.assert_called_once_with(expected_url, json=expected_payload, timeout=REQUEST_TIMEOUT)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_add_user_to_group_already_member(self, mock_post):
         # Simulate user already member error (e.g., Authentik returns 400 with specific message)
         mock_err_response = Mock(status_code=400)
@@ -213,7 +276,7 @@ class TestAuthentikClient(unittest.TestCase):
         result = self.client.add_user_to_group("group_pk_1", 123)
         self.assertTrue(result)  # Should still be true if "already member" is handled as success
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_add_user_to_group_failure_http_error(self, mock_post):
         mock_err_response = Mock(status_code=500)
         mock_err_response.text = "Server Error"
@@ -222,18 +285,59 @@ class TestAuthentikClient(unittest.TestCase):
         result = self.client.add_user_to_group("group_pk_1", 123)
         self.assertFalse(result)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_add_user_to_group_failure_request_exception(self, mock_post):
         mock_post.side_effect = requests.exceptions.RequestException("Network error")
         result = self.client.add_user_to_group("group_pk_1", 123)
         self.assertFalse(result)
 
+    @patch("requests.Session.patch")
+    @patch("requests.Session.get")
+    def test_add_users_to_group_success(self, mock_get, mock_patch):
+        mock_get.return_value = Mock(status_code=200)
+        mock_get.return_value.json.return_value = {"pk": "group_pk_1", "users": [1, 2]}
+        mock_patch.return_value = Mock(status_code=200)
+
+        self.assertTrue(self.client.add_users_to_group("group_pk_1", [2, 3, 4]))
+
+        expected_url = f"{self.mock_url}/api/v3/core/groups/group_pk_1/"
+        mock_get.assert_called_once_with(expected_url, params={"include_users": "false"}, timeout=REQUEST_TIMEOUT)
+        mock_patch.assert_called_once_with(expected_url, json={"users": [1, 2, 3, 4]}, timeout=REQUEST_TIMEOUT)
+
+    @patch("requests.Session.patch")
+    @patch("requests.Session.get")
+    def test_add_users_to_group_failure_http_error(self, mock_get, mock_patch):
+        mock_get.return_value = Mock(status_code=200)
+        mock_get.return_value.json.return_value = {"pk": "group_pk_1", "users": []}
+        mock_err_response = Mock(status_code=400, text="Bad Request")
+        mock_err_response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=mock_err_response)
+        mock_patch.return_value = mock_err_response
+        self.assertFalse(self.client.add_users_to_group("group_pk_1", [1]))
+
+    @patch("requests.Session.patch")
+    @patch("requests.Session.get")
+    def test_add_users_to_group_merge_order(self, mock_get, mock_patch):
+        # Current members keep their order, new users follow in the given order, duplicates are dropped.
+        # The PATCH writes back the members read by the GET: a removal made in between would be undone.
+        mock_get.return_value = Mock(status_code=200)
+        mock_get.return_value.json.return_value = {"pk": "group_pk_1", "users": [5, 1, 3]}
+        mock_patch.return_value = Mock(status_code=200)
+
+        self.assertTrue(self.client.add_users_to_group("group_pk_1", [3, 2, 5, 4, 2]))
+
+        self.assertEqual(mock_patch.call_args.kwargs["json"], {"users": [5, 1, 3, 2, 4]})
+
+    @patch("requests.Session.get")
+    def test_add_users_to_group_nothing_to_add(self, mock_get):
+        self.assertTrue(self.client.add_users_to_group("group_pk_1", []))
+        mock_get.assert_not_called()
+
     def test_add_user_to_group_missing_pks(self):
         self.assertFalse(self.client.add_user_to_group(None, 123))
         self.assertFalse(self.client.add_user_to_group("group_pk_1", None))
 
     # Tests for remove_user_from_group
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_remove_user_from_group_success(self, mock_post):
         mock_response = Mock(status_code=204)  # Or 200, typically 204 for successful removal
         mock_post.return_value = mock_response
@@ -241,9 +345,9 @@ class TestAuthentikClient(unittest.TestCase):
         self.assertTrue(result)
         expected_url = f"{self.mock_url}/api/v3/core/groups/group_pk_1/remove_user/"
         expected_payload = {"pk": 123}
-        mock_post.assert_called_once_with(expected_url, headers=self.client.headers, json=expected_payload)
+        mock_post.assert_called_once_with(expected_url, json=expected_payload, timeout=REQUEST_TIMEOUT)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_remove_user_from_group_user_not_in_group(self, mock_post):
         # Simulate user not in group error (e.g., Authentik returns 400 or specific error)
         # For this test, we'll assume the client doesn't specifically handle "not in group" as success
@@ -257,7 +361,7 @@ class TestAuthentikClient(unittest.TestCase):
         result = self.client.remove_user_from_group("group_pk_1", 123)
         self.assertFalse(result)  # Default behavior for unhandled HTTPError
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_remove_user_from_group_failure_http_error(self, mock_post):
         mock_err_response = Mock(status_code=500)
         mock_err_response.text = "Server Error"
@@ -266,7 +370,7 @@ class TestAuthentikClient(unittest.TestCase):
         result = self.client.remove_user_from_group("group_pk_1", 123)
         self.assertFalse(result)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_remove_user_from_group_failure_request_exception(self, mock_post):
         mock_post.side_effect = requests.exceptions.RequestException("Network error")
         result = self.client.remove_user_from_group("group_pk_1", 123)
@@ -281,7 +385,7 @@ class TestAuthentikClient(unittest.TestCase):
             mock_log_error.assert_called_with("Group PK and User PK must be provided to remove user from group.")
 
     # Tests for get_all_users_data (previously get_all_users_emails)
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_all_users_data_success_no_pagination(self, mock_get):
         mock_response_data = {
             "results": [
@@ -302,8 +406,7 @@ class TestAuthentikClient(unittest.TestCase):
             ],
             "pagination": {"next": None},
         }
-        mock_response = Mock(status_code=200)
-        mock_response.json.return_value = mock_response_data
+        mock_response = _json_response(mock_response_data)
         mock_get.return_value = mock_response
 
         users_data = self.client.get_all_users_data()
@@ -327,10 +430,10 @@ class TestAuthentikClient(unittest.TestCase):
         self.assertIn(expected_user2_data, users_data)
         self.assertIn(expected_user3_data, users_data)
 
-        expected_url = f"{self.mock_url}/api/v3/core/users/"
-        mock_get.assert_called_once_with(expected_url, headers=self.client.headers)
+        expected_url = f"{self.mock_url}/api/v3/core/users/?page_size={PAGE_SIZE}"
+        mock_get.assert_called_once_with(expected_url, timeout=REQUEST_TIMEOUT)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_all_users_data_success_with_pagination(self, mock_get):
         mock_response_page1_data = {
             "results": [
@@ -352,10 +455,8 @@ class TestAuthentikClient(unittest.TestCase):
             ],
             "pagination": {"next": None},
         }
-        mock_response_page1 = Mock(status_code=200)
-        mock_response_page1.json.return_value = mock_response_page1_data
-        mock_response_page2 = Mock(status_code=200)
-        mock_response_page2.json.return_value = mock_response_page2_data
+        mock_response_page1 = _json_response(mock_response_page1_data)
+        mock_response_page2 = _json_response(mock_response_page2_data)
 
         mock_get.side_effect = [mock_response_page1, mock_response_page2]
 
@@ -374,35 +475,31 @@ class TestAuthentikClient(unittest.TestCase):
         self.assertIn(expected_user2_data, users_data)
 
         self.assertEqual(mock_get.call_count, 2)
-        mock_get.assert_any_call(f"{self.mock_url}/api/v3/core/users/", headers=self.client.headers)
-        mock_get.assert_any_call(f"{self.mock_url}/api/v3/core/users/?page=2", headers=self.client.headers)
+        mock_get.assert_any_call(f"{self.mock_url}/api/v3/core/users/?page_size={PAGE_SIZE}", timeout=REQUEST_TIMEOUT)
+        mock_get.assert_any_call(f"{self.mock_url}/api/v3/core/users/?page=2", timeout=REQUEST_TIMEOUT)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_all_users_data_api_error(self, mock_get):
         mock_get.side_effect = requests.exceptions.RequestException("API error")
         users_data = self.client.get_all_users_data()
         self.assertEqual(users_data, [])
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_all_users_data_json_decode_error(self, mock_get):
-        mock_response = Mock(status_code=200)
-        import json  # Ensure json is imported for JSONDecodeError
-
-        mock_response.json.side_effect = json.JSONDecodeError("JSON decode error", "doc", 0)
+        mock_response = Mock(status_code=200, content=b"not json")
         mock_get.return_value = mock_response
         users_data = self.client.get_all_users_data()
         self.assertEqual(users_data, [])
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_all_users_data_empty_response(self, mock_get):
         mock_response_data = {"results": [], "pagination": {"next": None}}
-        mock_response = Mock(status_code=200)
-        mock_response.json.return_value = mock_response_data
+        mock_response = _json_response(mock_response_data)
         mock_get.return_value = mock_response
         users_data = self.client.get_all_users_data()
         self.assertEqual(users_data, [])
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_all_users_data_user_without_email(self, mock_get):
         mock_response_data = {
             "results": [
@@ -414,8 +511,7 @@ class TestAuthentikClient(unittest.TestCase):
             ],
             "pagination": {"next": None},
         }
-        mock_response = Mock(status_code=200)
-        mock_response.json.return_value = mock_response_data
+        mock_response = _json_response(mock_response_data)
         mock_get.return_value = mock_response
 
         users_data = self.client.get_all_users_data()
@@ -428,7 +524,7 @@ class TestAuthentikClient(unittest.TestCase):
             self.assertNotEqual(user_data_dict.get("attributes", {}).get("ville"), "Inconnue")
 
     # Tests for get_all_users_pk_by_email
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_all_users_pk_by_email_success(self, mock_get):
         mock_response_data = {
             "results": [
@@ -438,8 +534,7 @@ class TestAuthentikClient(unittest.TestCase):
             ],
             "pagination": {"next": None},
         }
-        mock_response = Mock(status_code=200)
-        mock_response.json.return_value = mock_response_data
+        mock_response = _json_response(mock_response_data)
         mock_get.return_value = mock_response
 
         pk_map = self.client.get_all_users_pk_by_email()
@@ -449,12 +544,91 @@ class TestAuthentikClient(unittest.TestCase):
         self.assertEqual(pk_map["user2@example.com"], 2)  # Check lowercasing
         self.assertNotIn("user3_no_email", pk_map)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_all_users_pk_by_email_api_error(self, mock_get):
         mock_get.side_effect = requests.exceptions.RequestException("API error")
         pk_map = self.client.get_all_users_pk_by_email()
         self.assertEqual(pk_map, {})
 
+    @patch("requests.Session.get")
+    def test_get_all_users_pk_by_email_follows_next_page_number(self, mock_get):
+        mock_get.side_effect = [
+            _json_response({"results": [{"email": "user1@example.com", "pk": 1}], "pagination": {"next": 2}}),
+            _json_response({"results": [{"email": "user2@example.com", "pk": 2}], "pagination": {"next": 0}}),
+        ]
+
+        pk_map = self.client.get_all_users_pk_by_email()
+
+        self.assertEqual(pk_map, {"user1@example.com": 1, "user2@example.com": 2})
+        self.assertEqual(
+            mock_get.call_args_list[1].args[0],
+            f"{self.mock_url}/api/v3/core/users/?page_size={PAGE_SIZE}&page=2",
+        )
+
+    @patch("requests.Session.get")
+    def test_get_all_users_pk_by_email_known_page_count_error(self, mock_get):
+        first_page = _json_response(
+            {
+                "results": [{"email": "user1@example.com", "pk": 1}],
+                "pagination": {"next": 2, "total_pages": 2},
+            }
+        )
+        mock_get.side_effect = [first_page, requests.exceptions.RequestException("API error")]
+        self.assertEqual(self.client.get_all_users_pk_by_email(), {})
+
+    @patch("requests.Session.get")
+    def test_get_all_users_pk_by_email_is_cached(self, mock_get):
+        mock_response = _json_response(
+            {
+                "results": [{"email": "user1@example.com", "pk": 1}],
+                "pagination": {"next": None},
+            }
+        )
+        mock_get.return_value = mock_response
+
+        self.assertEqual(self.client.get_all_users_pk_by_email(), {"user1@example.com": 1})
+        self.assertEqual(self.client.get_all_users_pk_by_email(), {"user1@example.com": 1})
+        mock_get.assert_called_once()
+
+    @patch("requests.Session.get")
+    def test_cached_scans_are_not_altered_by_callers(self, mock_get):
+        mock_get.return_value = _json_response(
+            {
+                "results": [{"pk": "g1", "name": "Group 1", "users_obj": [{"email": "a@a.com", "pk": 1}]}],
+                "pagination": {"next": None},
+            }
+        )
+        groups, email_map = self.client.get_groups_with_users()
+        groups.pop()
+        email_map["b@b.com"] = 2
+        cached_groups, cached_email_map = self.client.get_groups_with_users()
+        cached_groups.clear()
+
+        groups, email_map = self.client.get_groups_with_users()
+        self.assertEqual([group["pk"] for group in groups], ["g1"])
+        self.assertEqual(email_map, {"a@a.com": 1})
+        mock_get.assert_called_once()
+
+    @patch("requests.Session.post")
+    @patch("requests.Session.get")
+    def test_get_groups_with_users_cache_dropped_after_membership_change(self, mock_get, mock_post):
+        mock_response = _json_response(
+            {
+                "results": [{"pk": "g1", "name": "Group 1", "users_obj": [{"email": "a@a.com", "pk": 1}]}],
+                "pagination": {"next": None},
+            }
+        )
+        mock_get.return_value = mock_response
+        mock_post.return_value = Mock(status_code=204)
+
+        self.client.get_groups_with_users()
+        self.client.get_groups_with_users()
+        self.assertEqual(mock_get.call_count, 1)
+
+        self.assertTrue(self.client.add_user_to_group("g1", 2))
+        self.client.get_groups_with_users()
+        self.assertEqual(mock_get.call_count, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,7 +2,7 @@ import asyncio
 import json
 import os  # Added import
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from app.bot import MartyBot
 from libraries.services.mattermost import slugify
@@ -562,6 +562,52 @@ class TestMartyBot(unittest.TestCase):
         await self.bot.websocket_handler.on_message(None, json.dumps(mock_message_data))
         self.bot.envoyer_message.assert_not_called()
 
+    def test_start_without_mattermost_client_does_not_listen(self):
+        self.bot.mattermost_api_client = None
+        with patch.object(self.bot.websocket_handler, "run") as mock_run:
+            self.bot.start()
+        mock_run.assert_not_called()
+
+    def test_websocket_stop_outside_listener_loop_hands_close_to_it(self):
+        handler = self.bot.websocket_handler
+        handler.websocket = MagicMock()
+        handler._ws_alive = True
+        handler._loop = MagicMock()
+        with patch("app.websocket_handler.asyncio.run_coroutine_threadsafe") as mock_submit:
+            handler.stop()
+        self.assertTrue(handler.shutdown_event.is_set())
+        mock_submit.assert_called_once_with(handler.websocket.close.return_value, handler._loop)
+
+    @async_test
+    async def test_websocket_run_sends_close_frame_on_shutdown(self):
+        handler = self.bot.websocket_handler
+        handler.websocket_url = "ws://fake-mattermost-url.com/api/v4/websocket"
+        websocket = AsyncMock()
+        waiting_for_message = asyncio.Event()
+
+        async def recv():
+            waiting_for_message.set()
+            await asyncio.Event().wait()  # No message ever arrives
+
+        websocket.recv.side_effect = recv
+        connection = MagicMock()
+        connection.__aenter__.return_value = websocket
+        with patch("app.websocket_handler.websockets.connect", return_value=connection):
+            listener = asyncio.create_task(handler.run())
+            await waiting_for_message.wait()
+            handler.shutdown_event.set()
+            await listener
+
+        websocket.close.assert_awaited_once_with(code=1000, reason="Bot shutting down")
+        self.assertFalse(handler._ws_alive)
+
+    def test_websocket_stop_without_connection_closes_nothing(self):
+        handler = self.bot.websocket_handler
+        handler.websocket = MagicMock()
+        handler.stop()
+        self.assertTrue(handler.shutdown_event.is_set())
+        handler.websocket.close.assert_not_called()
+
     def test_parse_command_from_mention_logic(self):
         self.assertEqual(self.bot._parse_command_from_mention("help"), ("help", None))
         self.assertEqual(self.bot._parse_command_from_mention("help   "), ("help", None))
@@ -706,6 +752,7 @@ class TestMartyBot(unittest.TestCase):
             with self.subTest(command=command_key):
                 self.bot.envoyer_message.reset_mock()
                 self.bot.mattermost_api_client.get_user_roles.reset_mock()
+                self.bot.user_right_manager._admin_cache.clear()
                 mock_differential_sync.reset_mock()
                 mock_sync_all_rights.reset_mock()
 
@@ -743,6 +790,7 @@ class TestMartyBot(unittest.TestCase):
             with self.subTest(command=command_key):
                 self.bot.envoyer_message.reset_mock()
                 self.bot.mattermost_api_client.get_user_roles.reset_mock()
+                self.bot.user_right_manager._admin_cache.clear()
                 mock_differential_sync.reset_mock()
                 mock_sync_all_rights.reset_mock()
 
@@ -777,6 +825,7 @@ class TestMartyBot(unittest.TestCase):
             with self.subTest(command=command_key):
                 self.bot.envoyer_message.reset_mock()
                 self.bot.mattermost_api_client.get_user_roles.reset_mock()
+                self.bot.user_right_manager._admin_cache.clear()
 
                 await self._send_test_message(f"@{self.mock_config.BOT_NAME} {command_key}", user_id=admin_user_id)
 
@@ -870,8 +919,8 @@ class TestSendEmailCommand(TestMartyBot):
         self.mock_config.BREVO_DEFAULT_SENDER_EMAIL = "marty.sender@example.com"
         self.mock_config.BREVO_DEFAULT_SENDER_NAME = "Marty Test Bot"
 
-    @patch("libraries.group_sync_services.slugify", wraps=slugify)
-    @patch("libraries.group_sync_services._map_mm_channel_to_entity_and_base_name")
+    @patch("app.user_right_manager.slugify", wraps=slugify)
+    @patch("app.user_right_manager._map_mm_channel_to_entity_and_base_name")
     def test_handle_send_email_success(self, mock_map_channel, mock_slugify_call):
         async def actual_test_logic():
             command_name = "send_email"
@@ -956,7 +1005,7 @@ class TestSendEmailCommand(TestMartyBot):
 
         asyncio.run(actual_test_logic())
 
-    @patch("libraries.group_sync_services._map_mm_channel_to_entity_and_base_name")
+    @patch("app.user_right_manager._map_mm_channel_to_entity_and_base_name")
     def test_handle_send_email_not_admin_channel(self, mock_map_channel):
         async def actual_test_logic():
             command_name = "send_email"
@@ -985,7 +1034,7 @@ class TestSendEmailCommand(TestMartyBot):
 
         asyncio.run(actual_test_logic())
 
-    @patch("libraries.group_sync_services._map_mm_channel_to_entity_and_base_name")
+    @patch("app.user_right_manager._map_mm_channel_to_entity_and_base_name")
     def test_handle_send_email_brevo_list_not_found(self, mock_map_channel):
         async def actual_test_logic():
             command_name = "send_email"
@@ -1029,7 +1078,7 @@ class TestSendEmailCommand(TestMartyBot):
 
         asyncio.run(actual_test_logic())
 
-    @patch("libraries.group_sync_services._map_mm_channel_to_entity_and_base_name")
+    @patch("app.user_right_manager._map_mm_channel_to_entity_and_base_name")
     def test_handle_send_email_no_recipients_in_list(self, mock_map_channel):
         async def actual_test_logic():
             command_name = "send_email"
@@ -1078,7 +1127,7 @@ class TestSendEmailCommand(TestMartyBot):
 
         asyncio.run(actual_test_logic())
 
-    @patch("libraries.group_sync_services._map_mm_channel_to_entity_and_base_name")
+    @patch("app.user_right_manager._map_mm_channel_to_entity_and_base_name")
     def test_handle_send_email_brevo_send_fails(self, mock_map_channel):
         async def actual_test_logic():
             command_name = "send_email"
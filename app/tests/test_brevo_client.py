@@ -1,3 +1,4 @@
+import io
 from unittest.mock import MagicMock, patch
 
 from clients.brevo_client import (  # Direct import assuming PYTHONPATH is correct or tests are run with pytest
@@ -5,6 +6,7 @@ from clients.brevo_client import (  # Direct import assuming PYTHONPATH is corre
 )
 import unittest
 import requests
+from urllib3.response import HTTPResponse
 
 # Ensure clients are importable by adding the project root to sys.path if necessary
 # This might be needed if tests are run from a different directory context.
@@ -59,7 +61,50 @@ class TestBrevoClient(unittest.TestCase):
         with self.assertRaises(ValueError):
             BrevoClient(api_url=FAKE_API_URL, api_key="")
 
-    @patch("requests.request")
+    def test_session_sends_api_key(self):
+        """Test that the API key is set once on the pooled session."""
+        self.assertEqual(self.client.session.headers["api-key"], FAKE_API_KEY)
+
+    @patch("urllib3.util.retry.time.sleep")  # Skip the retry backoff delays
+    @patch("urllib3.connectionpool.HTTPConnectionPool._make_request")
+    def test_post_endpoints_are_not_resent_on_5xx(self, mock_make_request, mock_sleep):
+        """Test that a 503 on a POST is not resent: the email may have been sent, the contact created."""
+        mock_make_request.side_effect = lambda *args, **kwargs: HTTPResponse(
+            body=io.BytesIO(b"{}"), status=503, preload_content=False
+        )
+        sent = self.client.send_transactional_email(
+            "Subject", "Hello", "sender@example.com", "Sender", [{"email": "recipient@example.com"}]
+        )
+        self.assertFalse(sent)
+        mock_make_request.assert_called_once()
+        email_retry = self.client.session.get_adapter(f"{FAKE_API_URL}/smtp/email").max_retries
+        self.assertEqual(email_retry.status_forcelist, (429,))
+        self.assertEqual(email_retry.read, 0)
+
+        for endpoint in ("contacts", "contacts/lists"):
+            mock_make_request.reset_mock()
+            status_code, _ = self.client._make_request("POST", endpoint, json_data={})
+            self.assertEqual(status_code, 503)
+            mock_make_request.assert_called_once()
+
+    @patch("urllib3.util.retry.time.sleep")  # Skip the retry backoff delays
+    @patch("urllib3.connectionpool.HTTPConnectionPool._make_request")
+    def test_get_lists_is_retried_on_5xx(self, mock_make_request, mock_sleep):
+        """Test that reads keep their 5xx retries."""
+        mock_make_request.side_effect = lambda *args, **kwargs: HTTPResponse(
+            body=io.BytesIO(b"{}"), status=503, preload_content=False
+        )
+        self.client._make_request("GET", "contacts/lists")
+        self.assertEqual(mock_make_request.call_count, 4)  # Original attempt + 3 retries
+
+    @patch("requests.Session.close")
+    def test_context_manager_closes_session(self, mock_close):
+        """Test that leaving the with block closes the session."""
+        with BrevoClient(api_url=FAKE_API_URL, api_key=FAKE_API_KEY) as client:
+            self.assertIsInstance(client, BrevoClient)
+        mock_close.assert_called_once()
+
+    @patch("requests.Session.request")
     def test_get_lists_by_name_found(self, mock_request):
         """Test retrieving a list by name when it exists."""
         list_name = "Existing List"
@@ -74,12 +119,11 @@ class TestBrevoClient(unittest.TestCase):
         mock_request.assert_called_once_with(
             "GET",
             f"{FAKE_API_URL}/contacts/lists",
-            headers=self.client.headers,
             json=None,
             params={"limit": 50, "offset": 0},
         )
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_get_lists_by_name_not_found(self, mock_request):
         """Test retrieving a list by name when it does not exist."""
         list_name = "Non Existing List"
@@ -93,7 +137,7 @@ class TestBrevoClient(unittest.TestCase):
         self.assertEqual(result, [])
         self.assertEqual(mock_request.call_count, 2)
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_get_lists_by_name_api_error(self, mock_request):
         """Test retrieving lists when API returns an error."""
         mock_request.return_value = mock_brevo_response(500, json_data={"error": "Server Error"})
@@ -119,7 +163,7 @@ class TestBrevoClient(unittest.TestCase):
         result = self.client.get_list_by_name("Unknown List")
         self.assertIsNone(result)
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_create_list_success(self, mock_request):
         """Test creating a new list successfully."""
         list_name = "New List"
@@ -142,13 +186,12 @@ class TestBrevoClient(unittest.TestCase):
         self.assertEqual(result["id"], created_list_id)
         self.assertEqual(result["name"], list_name)
 
-        # Check calls to requests.request
+        # Check calls to the session's request
         self.assertEqual(mock_request.call_count, 2)
         # First call (POST to create)
         mock_request.assert_any_call(
             "POST",
             f"{FAKE_API_URL}/contacts/lists",
-            headers=self.client.headers,
             json={"name": list_name, "folderId": folder_id},
             params=None,
         )
@@ -156,12 +199,11 @@ class TestBrevoClient(unittest.TestCase):
         mock_request.assert_any_call(
             "GET",
             f"{FAKE_API_URL}/contacts/lists/{created_list_id}",
-            headers=self.client.headers,
             json=None,
             params=None,
         )
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_create_list_already_exists(self, mock_request):
         """Test creating a list that already exists (duplicate parameter error)."""
         list_name = "Existing List Name"
@@ -197,7 +239,6 @@ class TestBrevoClient(unittest.TestCase):
         mock_request.assert_any_call(
             "POST",
             url,
-            headers=self.client.headers,
             json={"name": list_name, "folderId": 1},
             params=None,
         )
@@ -205,12 +246,11 @@ class TestBrevoClient(unittest.TestCase):
         mock_request.assert_any_call(
             "GET",
             url,
-            headers=self.client.headers,
             json=None,
             params={"limit": 50, "offset": 0},
         )
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_get_list_by_id_success(self, mock_request):
         """Test retrieving a list by ID successfully."""
         list_id = 303
@@ -224,12 +264,11 @@ class TestBrevoClient(unittest.TestCase):
         mock_request.assert_called_once_with(
             "GET",
             f"{FAKE_API_URL}/contacts/lists/{list_id}",
-            headers=self.client.headers,
             json=None,
             params=None,
         )
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_add_contact_to_list_created(self, mock_request):
         """Test adding a new contact to a list (contact created)."""
         email = "new.contact@example.com"
@@ -242,12 +281,11 @@ class TestBrevoClient(unittest.TestCase):
         mock_request.assert_called_once_with(
             "POST",
             f"{FAKE_API_URL}/contacts",
-            headers=self.client.headers,
             json=expected_payload,
             params=None,
         )
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_add_contact_to_list_updated(self, mock_request):
         """Test adding an existing contact to a list (contact updated)."""
         email = "existing.contact@example.com"
@@ -265,12 +303,11 @@ class TestBrevoClient(unittest.TestCase):
         mock_request.assert_called_once_with(
             "POST",
             f"{FAKE_API_URL}/contacts",
-            headers=self.client.headers,
             json=expected_payload,
             params=None,
         )
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_add_contact_to_list_failure(self, mock_request):
         """Test failure when adding a contact to a list."""
         email = "fail.contact@example.com"
@@ -282,7 +319,7 @@ class TestBrevoClient(unittest.TestCase):
         success = self.client.add_contact_to_list(email, list_id)
         self.assertFalse(success)
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_remove_contact_from_list_success(self, mock_request):
         """Test removing a contact from a list successfully."""
         email = "remove.contact@example.com"
@@ -296,12 +333,11 @@ class TestBrevoClient(unittest.TestCase):
         mock_request.assert_called_once_with(
             "PUT",
             f"{FAKE_API_URL}/contacts/{encoded_email}",
-            headers=self.client.headers,
             json=expected_payload,
             params=None,
         )
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_remove_contact_from_list_not_found(self, mock_request):
         """Test removing a contact that is not found."""
         email = "notfound.contact@example.com"
@@ -312,7 +348,7 @@ class TestBrevoClient(unittest.TestCase):
         success = self.client.remove_contact_from_list(email, list_id)
         self.assertFalse(success)  # Or True depending on desired outcome for "not found"
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_get_contacts_from_list_success(self, mock_request):
         """Test retrieving contacts from a list successfully."""
         list_id = 606
@@ -328,13 +364,12 @@ class TestBrevoClient(unittest.TestCase):
         mock_request.assert_called_once_with(
             "GET",
             f"{FAKE_API_URL}/contacts/lists/{list_id}/contacts",
-            headers=self.client.headers,
             json=None,
             # Default params for the new implementation (limit 500, offset 0, sort desc)
             params={"limit": 500, "offset": 0, "sort": "desc"},
         )
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_get_contacts_from_list_empty(self, mock_request):
         """Test retrieving contacts from an empty list."""
         list_id = 607
@@ -345,7 +380,7 @@ class TestBrevoClient(unittest.TestCase):
         self.assertIsNotNone(result)
         self.assertEqual(len(result), 0)
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_delete_list_success(self, mock_request):
         """Test deleting a list successfully."""
         list_id = 707
@@ -356,12 +391,11 @@ class TestBrevoClient(unittest.TestCase):
         mock_request.assert_called_once_with(
             "DELETE",
             f"{FAKE_API_URL}/contacts/lists/{list_id}",
-            headers=self.client.headers,
             json=None,
             params=None,
         )
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_delete_list_failure(self, mock_request):
         """Test failing to delete a list (e.g., not found or API error)."""
         list_id = 708
@@ -370,7 +404,7 @@ class TestBrevoClient(unittest.TestCase):
         success = self.client.delete_list(list_id)
         self.assertFalse(success)
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_send_transactional_email_success(self, mock_request):
         """Test sending a transactional email successfully."""
         subject = "Test Subject"
@@ -406,12 +440,11 @@ class TestBrevoClient(unittest.TestCase):
         mock_request.assert_called_once_with(
             "POST",
             f"{FAKE_API_URL}/smtp/email",
-            headers=self.client.headers,
             json=expected_payload,
             params=None,
         )
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_send_transactional_email_success_no_html(self, mock_request):
         """Test sending a transactional email successfully without HTML content."""
         subject = "Test Subject No HTML"
@@ -445,12 +478,11 @@ class TestBrevoClient(unittest.TestCase):
         mock_request.assert_called_once_with(
             "POST",
             f"{FAKE_API_URL}/smtp/email",
-            headers=self.client.headers,
             json=expected_payload,
             params=None,
         )
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_send_transactional_email_failure_api_error(self, mock_request):
         """Test failure when sending a transactional email due to API error."""
         mock_request.return_value = mock_brevo_response(400, json_data={"code": "api_error", "message": "Bad request"})
@@ -460,7 +492,7 @@ class TestBrevoClient(unittest.TestCase):
         )
         self.assertFalse(success)
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_send_transactional_email_missing_params(self, mock_request):
         """Test that sending fails if essential parameters are missing."""
         self.assertFalse(
@@ -475,7 +507,7 @@ class TestBrevoClient(unittest.TestCase):
         self.assertFalse(self.client.send_transactional_email("Subject", "Content", "s@e.com", "Sender", []))
         mock_request.assert_not_called()
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_get_folder_id_by_name_found(self, mock_request):
         """Test retrieving a folder ID by name when it exists."""
         folder_name = "My Test Folder"
@@ -491,12 +523,11 @@ class TestBrevoClient(unittest.TestCase):
         mock_request.assert_called_once_with(
             "GET",
             f"{FAKE_API_URL}/contacts/folders",
-            headers=self.client.headers,
             json=None,
             params={"limit": 50, "offset": 0, "sort": "desc"},
         )
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_get_folder_id_by_name_not_found(self, mock_request):
         """Test retrieving a folder ID by name when it does not exist."""
         folder_name = "Non Existent Folder"
@@ -509,7 +540,7 @@ class TestBrevoClient(unittest.TestCase):
         result = self.client.get_folder_id_by_name(folder_name)
         self.assertIsNone(result)
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_get_folder_id_by_name_pagination(self, mock_request):
         """Test retrieving a folder ID by name with pagination."""
         folder_name = "Target Folder Page 2"
@@ -536,14 +567,12 @@ class TestBrevoClient(unittest.TestCase):
         mock_request.assert_any_call(
             "GET",
             f"{FAKE_API_URL}/contacts/folders",
-            headers=self.client.headers,
             json=None,
             params={"limit": 50, "offset": 0, "sort": "desc"},
         )
         mock_request.assert_any_call(
             "GET",
             f"{FAKE_API_URL}/contacts/folders",
-            headers=self.client.headers,
             json=None,
             params={
                 "limit": 50,
@@ -552,15 +581,15 @@ class TestBrevoClient(unittest.TestCase):
             },  # Offset for second page
         )
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_get_folder_id_by_name_api_error(self, mock_request):
         """Test retrieving folder ID when API returns an error."""
         mock_request.return_value = mock_brevo_response(500, json_data={"error": "Server Error"})
         result = self.client.get_folder_id_by_name("Any Folder")
         self.assertIsNone(result)
 
-    @patch("requests.request")
-    # Removed the patch.object as it was not the correct approach here. We are testing the global requests.request.
+    @patch("requests.Session.request")
+    # Removed the patch.object as it was not the correct approach here. We are testing the session's request.
     def test_get_contacts_from_list_success_all_pages(self, mock_request_global):
         """Test retrieving all contacts from a list with pagination, reflecting internal limit."""
         list_id = 700
@@ -605,20 +634,18 @@ class TestBrevoClient(unittest.TestCase):
         mock_request_global.assert_any_call(
             "GET",
             f"{FAKE_API_URL}/contacts/lists/{list_id}/contacts",
-            headers=self.client.headers,  # self.client.headers is fine
             json=None,
             params={"limit": internal_limit, "offset": 0, "sort": "desc"},
         )
         mock_request_global.assert_any_call(
             "GET",
             f"{FAKE_API_URL}/contacts/lists/{list_id}/contacts",
-            headers=self.client.headers,
             json=None,
             params={"limit": internal_limit, "offset": internal_limit, "sort": "desc"},
         )
         # The third call for offset: internal_limit + 1 should not happen with this data.
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_get_contacts_from_list_single_page_less_than_limit(self, mock_request):
         """Test retrieving contacts when total is less than one page limit."""
         list_id = 701
@@ -633,12 +660,11 @@ class TestBrevoClient(unittest.TestCase):
         mock_request.assert_called_once_with(
             "GET",
             f"{FAKE_API_URL}/contacts/lists/{list_id}/contacts",
-            headers=self.client.headers,
             json=None,
             params={"limit": 500, "offset": 0, "sort": "desc"},
         )
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_get_contacts_from_list_empty_list_from_start(self, mock_request):
         """Test retrieving contacts from an initially empty list."""
         list_id = 702
@@ -650,7 +676,7 @@ class TestBrevoClient(unittest.TestCase):
         self.assertEqual(len(result_emails), 0)
         mock_request.assert_called_once()
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_get_contacts_from_list_api_error_during_pagination(self, mock_request):
         """Test API error during pagination when retrieving contacts."""
         list_id = 703
@@ -664,7 +690,7 @@ class TestBrevoClient(unittest.TestCase):
         self.assertIsNone(result_emails)  # Should return None on error
         self.assertEqual(mock_request.call_count, 2)
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_get_contacts_from_list_contact_without_email(self, mock_request):
         """Test that contacts without an email are skipped."""
         list_id = 704
@@ -682,7 +708,7 @@ class TestBrevoClient(unittest.TestCase):
         self.assertEqual(result_contacts[0]["email"], "user1@example.com")
         self.assertEqual(result_contacts[2]["email"], "user3@example.com")
 
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_get_contacts_from_list_with_limit_and_offset(self, mock_request):
         mock_response = mock_brevo_response(200, json_data={"contacts": [{"id": 1, "email": "test@example.com"}]})
         mock_request.return_value = mock_response
@@ -692,7 +718,6 @@ class TestBrevoClient(unittest.TestCase):
         mock_request.assert_called_with(
             "GET",
             f"{FAKE_API_URL}/contacts/lists/1/contacts",
-            headers=self.client.headers,
             json=None,
             params={"limit": 500, "offset": 0, "sort": "desc"},
         )
@@ -1,6 +1,6 @@
 import asyncio
 import unittest
-from unittest.mock import MagicMock, mock_open, patch
+from unittest.mock import MagicMock, Mock, mock_open, patch
 
 from clients.authentik_client import AuthentikClient
 from clients.brevo_client import BrevoClient
@@ -812,7 +812,7 @@ permissions:
 
         self.mock_vaultwarden_client.get_collection_by_name.return_value = "vw_coll_id_123"
         self.mock_vaultwarden_client._get_api_token.return_value = "fake_vw_api_token"
-        self.mock_vaultwarden_client.invite_user_to_collection.return_value = True
+        self.mock_vaultwarden_client.invite_users_to_collection.return_value = {"vw.user1@example.com": True}
         self.mock_mattermost_client.send_dm.return_value = True
 
         results = vaultwarden_service._sync_single_vaultwarden_collection_members(
@@ -824,8 +824,8 @@ permissions:
         )
 
         self.mock_vaultwarden_client.get_collection_by_name.assert_called_once_with(collection_name)
-        self.mock_vaultwarden_client.invite_user_to_collection.assert_called_once_with(
-            user_email="vw.user1@example.com",
+        self.mock_vaultwarden_client.invite_users_to_collection.assert_called_once_with(
+            user_emails=["vw.user1@example.com"],
             collection_id="vw_coll_id_123",
             organization_id=self.mock_vaultwarden_client.organization_id,
         )
@@ -860,7 +860,7 @@ permissions:
 
         self.mock_vaultwarden_client.get_collection_by_name.return_value = "vw_coll_id_dm_fail"
         self.mock_vaultwarden_client._get_api_token.return_value = "fake_vw_api_token"
-        self.mock_vaultwarden_client.invite_user_to_collection.return_value = True
+        self.mock_vaultwarden_client.invite_users_to_collection.return_value = {"vw.dm.fail@example.com": True}
         self.mock_mattermost_client.send_dm.return_value = False  # Simulate DM failure
 
         results = vaultwarden_service._sync_single_vaultwarden_collection_members(
@@ -894,7 +894,7 @@ permissions:
 
         self.mock_vaultwarden_client.get_collection_by_name.return_value = "vw_coll_id_dm_skip"
         self.mock_vaultwarden_client._get_api_token.return_value = "fake_vw_api_token"
-        self.mock_vaultwarden_client.invite_user_to_collection.return_value = True
+        self.mock_vaultwarden_client.invite_users_to_collection.return_value = {"vw.dm.skip@example.com": True}
 
         results = vaultwarden_service._sync_single_vaultwarden_collection_members(
             self.mock_vaultwarden_client,
@@ -925,7 +925,9 @@ permissions:
 
         self.mock_vaultwarden_client.get_collection_by_name.return_value = "vw_coll_id_invite_fail"
         self.mock_vaultwarden_client._get_api_token.return_value = "fake_vw_api_token"
-        self.mock_vaultwarden_client.invite_user_to_collection.return_value = False  # Simulate invite failure
+        self.mock_vaultwarden_client.invite_users_to_collection.return_value = {
+            "vw.invite.fail@example.com": False
+        }  # Simulate invite failure
 
         results = vaultwarden_service._sync_single_vaultwarden_collection_members(
             self.mock_vaultwarden_client,
@@ -1025,6 +1027,63 @@ class TestAuthentikService(unittest.TestCase):
             self.assertEqual(len(results), 1)
             self.assertEqual(results[0]["status"], "SUCCESS")
 
+    @patch("libraries.services.authentik.config")
+    def test_ensure_users_in_group_adds_missing_users_in_one_batch(self, mock_service_config):
+        mock_service_config.EXCLUDED_USERS = set()
+        mock_authentik_client = MagicMock(spec=AuthentikClient)
+        mock_authentik_client.add_users_to_group.return_value = True
+        service = AuthentikService(mock_authentik_client, None, None, None)
+        mm_users = [
+            {"username": "member", "email": "member@me.com"},
+            {"username": "new1", "email": "New1@me.com"},
+            {"username": "new2", "email": "new2@me.com"},
+            {"username": "unknown", "email": "unknown@me.com"},
+        ]
+        email_to_pk = {"member@me.com": 1, "new1@me.com": 2, "new2@me.com": 3}
+
+        results, targeted_pks = service._ensure_users_in_authentik_group(
+            mock_authentik_client, "pk1", "projet_Test1", mm_users, email_to_pk, "Test1", {1}
+        )
+
+        mock_authentik_client.add_users_to_group.assert_called_once_with("pk1", [2, 3])
+        mock_authentik_client.add_user_to_group.assert_not_called()
+        self.assertEqual(targeted_pks, {1, 2, 3})
+        self.assertEqual(
+            [result["action"] for result in results],
+            [
+                "USER_ALREADY_IN_AUTHENTIK_GROUP",
+                "USER_ADDED_TO_AUTHENTIK_GROUP",
+                "USER_ADDED_TO_AUTHENTIK_GROUP",
+                "SKIPPED_USER_NOT_IN_AUTHENTIK_FOR_ENSURE",
+            ],
+        )
+
+    @patch("libraries.services.authentik.config")
+    def test_ensure_users_in_group_falls_back_to_one_by_one_when_batch_fails(self, mock_service_config):
+        mock_service_config.EXCLUDED_USERS = set()
+        mock_authentik_client = MagicMock(spec=AuthentikClient)
+        mock_authentik_client.add_users_to_group.return_value = False
+        mock_authentik_client.add_user_to_group.side_effect = lambda group_pk, user_pk: user_pk != 3
+        service = AuthentikService(mock_authentik_client, None, None, None)
+        mm_users = [
+            {"username": "new1", "email": "new1@me.com"},
+            {"username": "bad", "email": "bad@me.com"},
+        ]
+        email_to_pk = {"new1@me.com": 2, "bad@me.com": 3}
+
+        results, _ = service._ensure_users_in_authentik_group(
+            mock_authentik_client, "pk1", "projet_Test1", mm_users, email_to_pk, "Test1", set()
+        )
+
+        mock_authentik_client.add_users_to_group.assert_called_once_with("pk1", [2, 3])
+        self.assertEqual(
+            [c.args for c in mock_authentik_client.add_user_to_group.call_args_list], [("pk1", 2), ("pk1", 3)]
+        )
+        self.assertEqual(
+            [result["action"] for result in results],
+            ["USER_ADDED_TO_AUTHENTIK_GROUP", "FAILED_TO_ADD_TO_AUTHENTIK_GROUP"],
+        )
+
 
 class TestVaultwardenService(unittest.TestCase):
     @async_test
@@ -1149,7 +1208,7 @@ class TestOutlineService(unittest.TestCase):
         )
 
         with patch.object(
-            service, "_remove_user_from_outline_collection", return_value={"status": "SUCCESS"}
+            service, "_remove_users_from_outline_collection", return_value=[{"status": "SUCCESS"}]
         ) as mock_remove_user, patch.object(
             service, "_ensure_users_in_outline_collection", return_value=([{"status": "SUCCESS"}], set())
         ) as mock_ensure_users:
@@ -1158,3 +1217,77 @@ class TestOutlineService(unittest.TestCase):
             mock_ensure_users.assert_called_once()
             self.assertEqual(len(results), 1)
             self.assertEqual(results[0]["status"], "SUCCESS")
+
+    @async_test
+    async def test_differential_sync_removes_users_in_one_batch(self):
+        mock_outline_client = MagicMock(spec=OutlineClient)
+        mock_mattermost_client = MagicMock(spec=MattermostClient)
+        mock_permissions_matrix = {"PROJET": {"outline": {"collection_name_pattern": "projet-{base_name}"}}}
+
+        mock_outline_client.list_collections.return_value = [{"id": "coll1", "name": "projet-Test1"}]
+        mock_outline_client.get_collection_members_with_details.return_value = [
+            {"id": "user-keep-id", "email": "keep@me.com"},
+            {"id": "user-gone-1", "email": "gone1@me.com"},
+            {"id": "user-gone-2", "email": "gone2@me.com"},
+        ]
+        mock_outline_client.remove_users_from_collection.return_value = {"user-gone-1": True, "user-gone-2": False}
+        from libraries.services.outline import OutlineService
+
+        service = OutlineService(mock_outline_client, mock_mattermost_client, mock_permissions_matrix, "test_team")
+        service.get_mm_users_for_entity = MagicMock(
+            return_value=({"keep@me.com": {"username": "keep_user"}}, [{"email": "keep@me.com"}], [])
+        )
+
+        results = await service.differential_sync({})
+
+        mock_outline_client.remove_users_from_collection.assert_called_once_with(
+            "coll1", ["user-gone-1", "user-gone-2"]
+        )
+        mock_outline_client.remove_user_from_collection.assert_not_called()
+        self.assertEqual([r["mm_user_email"] for r in results], ["gone1@me.com", "gone2@me.com"])
+        self.assertEqual([r["status"] for r in results], ["SUCCESS", "FAILURE"])
+
+    @patch("libraries.services.outline.config")
+    @patch("clients.mattermost_client.MattermostClient.send_dm")
+    def test_send_dm_if_user_not_in_outline(self, mock_send_dm, mock_config):
+        # Configure the mocks
+        mock_config.OUTLINE_URL = "http://fake-outline-url.com"
+        mock_send_dm.return_value = True
+
+        # Create a mock Mattermost client
+        mock_mattermost_client = Mock()
+        mock_mattermost_client.send_dm.return_value = True
+
+        # Create a mock Outline client
+        mock_outline_client = Mock()
+        mock_outline_client.get_user_by_email.return_value = None
+
+        # Call the method that should trigger the DM
+        from libraries.services.outline import OutlineService
+
+        outline_service = OutlineService(
+            client=mock_outline_client,
+            mattermost_client=mock_mattermost_client,
+            permissions_matrix={},
+            mm_team_id="test_team_id",
+        )
+        outline_service._ensure_users_in_outline_collection(
+            outline_client=mock_outline_client,
+            mattermost_client=mock_mattermost_client,
+            collection_id="some-collection-id",
+            collection_name="some-collection-name",
+            mm_users_for_permission={
+                "test@example.com": {
+                    "username": "testuser",
+                    "mm_user_id": "test_mm_user_id",
+                    "is_admin_channel_member": False,
+                }
+            },
+            default_permission="read",
+            admin_permission="read_write",
+            current_outline_member_ids=set(),
+            mm_channel_context_name="test-channel",
+        )
+
+        # Assert that send_dm was called
+        mock_mattermost_client.send_dm.assert_called_once()
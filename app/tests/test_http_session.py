@@ -0,0 +1,67 @@
+import io
+import unittest
+from unittest.mock import patch
+
+import requests
+import urllib3
+from urllib3.response import HTTPResponse
+
+from clients.http_session import (
+    RATE_LIMITED_RETRY_STATUS_FORCELIST,
+    RETRY_AFTER_MAX_SECONDS,
+    RETRY_ALLOWED_METHODS_WITH_POST,
+    build_session,
+)
+
+URL = "http://fake-api.example.com/items"
+
+
+def _raw_response(status: int, headers: dict | None = None) -> HTTPResponse:
+    """A urllib3 response as returned by the connection pool, before the Retry policy sees it."""
+    return HTTPResponse(body=io.BytesIO(b"{}"), status=status, headers=headers or {}, preload_content=False)
+
+
+@patch("urllib3.util.retry.time.sleep")  # Skip the retry backoff delays
+@patch("urllib3.connectionpool.HTTPConnectionPool._make_request")
+class TestBuildSession(unittest.TestCase):
+    def test_get_is_retried_on_5xx(self, mock_make_request, mock_sleep):
+        mock_make_request.side_effect = lambda *args, **kwargs: _raw_response(503)
+        response = build_session().get(URL)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(mock_make_request.call_count, 4)  # Original attempt + 3 retries
+
+    def test_post_is_not_resent_on_5xx(self, mock_make_request, mock_sleep):
+        # The server may have acted on the POST before failing: sending it again could do it twice
+        mock_make_request.side_effect = lambda *args, **kwargs: _raw_response(503)
+        response = build_session(status_forcelist=RATE_LIMITED_RETRY_STATUS_FORCELIST).post(URL, json={})
+        self.assertEqual(response.status_code, 503)
+        mock_make_request.assert_called_once()
+
+    def test_post_is_not_resent_after_read_error(self, mock_make_request, mock_sleep):
+        mock_make_request.side_effect = urllib3.exceptions.ProtocolError("Connection aborted")
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            build_session().post(URL, json={})
+        mock_make_request.assert_called_once()
+
+    def test_post_is_resent_on_429(self, mock_make_request, mock_sleep):
+        mock_make_request.side_effect = [_raw_response(429, {"Retry-After": "0"}), _raw_response(201)]
+        response = build_session(status_forcelist=RATE_LIMITED_RETRY_STATUS_FORCELIST).post(URL, json={})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(mock_make_request.call_count, 2)
+
+    def test_long_retry_after_is_clamped(self, mock_make_request, mock_sleep):
+        # An hour-long Retry-After would block the sync thread for an hour
+        mock_make_request.side_effect = [_raw_response(429, {"Retry-After": "3600"}), _raw_response(200)]
+        response = build_session(status_forcelist=RATE_LIMITED_RETRY_STATUS_FORCELIST).get(URL)
+        self.assertEqual(response.status_code, 200)
+        mock_sleep.assert_called_once_with(RETRY_AFTER_MAX_SECONDS)
+
+    def test_post_opted_in_is_retried_on_5xx(self, mock_make_request, mock_sleep):
+        mock_make_request.side_effect = [_raw_response(503), _raw_response(200)]
+        response = build_session(allowed_methods=RETRY_ALLOWED_METHODS_WITH_POST).post(URL, json={})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_make_request.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,11 @@
+import io
 import json  # Added import for json
 import unittest
 from unittest.mock import Mock, patch, MagicMock
 
+import pytest
 import requests
+from urllib3.response import HTTPResponse
 from clients.mattermost_client import MattermostClient
 from libraries.services.mattermost import slugify
 
@@ -24,40 +27,37 @@ def mock_mattermost_response(status_code, json_data=None, text_data=None, conten
 
 
 class TestMattermostClient(unittest.TestCase):
-    # Patch requests.get at the class level to affect setUp
-    @patch("requests.get")
-    def setUp(self, mock_requests_get_for_setup: Mock):  # Renamed arg
+    @pytest.fixture(autouse=True)
+    def _use_shared_client(self, mm_client):
+        # The client is built once per module (see conftest.py) instead of once per test. Restore the
+        # attributes some tests overwrite, so every test starts from the freshly built client's state.
+        mm_client.bot_user_id = "bot_user_id_setup"
+        mm_client.team_id = "fake_team_id"
+        mm_client.user_auth_token = None
+        mm_client.csrf_token = None
+        self.client = mm_client
+
+    def setUp(self):
         self.mock_url = "http://fake-mattermost-url.com"
         self.mock_token = "fake_mm_admin_token"
         self.mock_team_id = "fake_team_id"
 
-        # Configure the mock for the get_me call within MattermostClient.__init__
-        mock_setup_response = Mock(status_code=200)
-        mock_setup_response.json.return_value = {
-            "id": "bot_user_id_setup",
-            "username": "testbot_setup",
-        }
-        mock_requests_get_for_setup.return_value = mock_setup_response
-
-        try:
-            self.client = MattermostClient(base_url=self.mock_url, token=self.mock_token, team_id=self.mock_team_id)
-        except ValueError:
-            self.fail("Client instantiation failed in setUp")
-
-        # Verify bot_user_id was set during init
-        self.assertEqual(self.client.bot_user_id, "bot_user_id_setup")
-        # Ensure the mock was called for /users/me
-        mock_requests_get_for_setup.assert_called_once_with(
-            f"{self.mock_url}/api/v4/users/me", headers=self.client.headers
-        )
-        # Reset for other tests that might patch requests.get themselves or want a fresh mock
-        mock_requests_get_for_setup.reset_mock()
-
     def test_constructor_success(self):
         self.assertEqual(self.client.base_url, self.mock_url)
         self.assertEqual(self.client.token, self.mock_token)
         self.assertEqual(self.client.team_id, self.mock_team_id)
         self.assertIn(f"Bearer {self.mock_token}", self.client.headers["Authorization"])
+        self.assertEqual(self.client.session.headers["Authorization"], f"Bearer {self.mock_token}")
+
+    @patch("urllib3.util.retry.time.sleep")  # Skip the retry backoff delays
+    @patch("urllib3.connectionpool.HTTPConnectionPool._make_request")
+    def test_post_message_is_not_resent_on_5xx(self, mock_make_request, mock_sleep):
+        # The proxy may fail after Mattermost created the post: resending it would post the message twice
+        mock_make_request.side_effect = lambda *args, **kwargs: HTTPResponse(
+            body=io.BytesIO(b"{}"), status=503, preload_content=False
+        )
+        self.assertFalse(self.client.post_message("channel_id", "Hello"))
+        mock_make_request.assert_called_once()
 
     def test_constructor_value_error(self):
         with self.assertRaisesRegex(ValueError, "Mattermost base_url, token, and team_id must be provided."):
@@ -67,7 +67,8 @@ class TestMattermostClient(unittest.TestCase):
         with self.assertRaisesRegex(ValueError, "Mattermost base_url, token, and team_id must be provided."):
             MattermostClient(base_url="fake", token="fake", team_id=None)
 
-    def test_constructor_url_trailing_slash(self):
+    @patch("requests.Session.get")
+    def test_constructor_url_trailing_slash(self, mock_get):
         client_with_slash = MattermostClient(
             base_url="http://fake-mm.com/",
             token=self.mock_token,
@@ -75,7 +76,7 @@ class TestMattermostClient(unittest.TestCase):
         )
         self.assertEqual(client_with_slash.base_url, "http://fake-mm.com")
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_create_channel_success_default_team_id(self, mock_post_request):
         mock_response = Mock(status_code=201)
         mock_response.json.return_value = {
@@ -96,11 +97,11 @@ class TestMattermostClient(unittest.TestCase):
             "purpose": f"Channel for project {project_name}",
             "header": f"Project {project_name}",
         }
-        mock_post_request.assert_called_once_with(expected_api_url, headers=self.client.headers, json=expected_payload)
+        mock_post_request.assert_called_once_with(expected_api_url, json=expected_payload)
         self.assertIsNotNone(result)
         self.assertEqual(result["id"], "channel_id_123")
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_create_channel_success_override_team_id(self, mock_post_request):
         mock_response_data = {"id": "channel_id_456", "name": "another-project"}
         mock_response = Mock(status_code=201)
@@ -113,7 +114,7 @@ class TestMattermostClient(unittest.TestCase):
         _, kwargs = mock_post_request.call_args
         self.assertEqual(kwargs["json"]["team_id"], override_team_id)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     @patch.object(MattermostClient, "get_channel_by_name")  # Mock get_channel_by_name for exists case
     def test_create_channel_failure_http_error_exists(self, mock_get_channel_by_name, mock_post_request):
         project_name = "Existing Project"
@@ -140,7 +141,7 @@ class TestMattermostClient(unittest.TestCase):
         self.assertEqual(result["id"], "existing_channel_id")
         mock_get_channel_by_name.assert_called_once_with(self.mock_team_id, channel_name_slug)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_create_channel_failure_http_error_other(self, mock_post_request):
         mock_response = Mock(status_code=500)  # Some other server error
         mock_response.json.return_value = {
@@ -152,14 +153,14 @@ class TestMattermostClient(unittest.TestCase):
         result = self.client.create_channel("Test Project Fail Other")
         self.assertIsNone(result)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_create_channel_failure_request_exception(self, mock_post_request):
         mock_post_request.side_effect = requests.exceptions.RequestException("Connection timeout")
         result = self.client.create_channel("Test Project Exception")
         self.assertIsNone(result)
 
     # Tests for get_channel_by_name
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_channel_by_name_success(self, mock_get):
         channel_name = "test-channel"
         expected_channel_data = {
@@ -175,9 +176,9 @@ class TestMattermostClient(unittest.TestCase):
         channel = self.client.get_channel_by_name(self.mock_team_id, channel_name)
         self.assertEqual(channel, expected_channel_data)
         expected_url = f"{self.mock_url}/api/v4/teams/{self.mock_team_id}/channels/name/{channel_name}"
-        mock_get.assert_called_once_with(expected_url, headers=self.client.headers)
+        mock_get.assert_called_once_with(expected_url)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_channel_by_name_not_found(self, mock_get):
         channel_name = "non-existent-channel"
         mock_response = Mock(status_code=404)
@@ -187,14 +188,14 @@ class TestMattermostClient(unittest.TestCase):
         channel = self.client.get_channel_by_name(self.mock_team_id, channel_name)
         self.assertIsNone(channel)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_channel_by_name_api_error(self, mock_get):
         mock_get.side_effect = requests.exceptions.RequestException("API error")
         channel = self.client.get_channel_by_name(self.mock_team_id, "any-channel")
         self.assertIsNone(channel)
 
     # Tests for get_users_in_channel
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_users_in_channel_success_no_pagination(self, mock_get):
         channel_id = "chan_id_1"
         mock_users_data = [
@@ -208,9 +209,9 @@ class TestMattermostClient(unittest.TestCase):
         users = self.client.get_users_in_channel(channel_id)
         self.assertEqual(users, mock_users_data)
         expected_url = f"{self.mock_url}/api/v4/users?in_channel={channel_id}&page=0&per_page=200"
-        mock_get.assert_called_once_with(expected_url, headers=self.client.headers)
+        mock_get.assert_called_once_with(expected_url)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_users_in_channel_success_with_pagination(self, mock_get):
         channel_id = "chan_id_paginated"
         page1_users = [{"id": f"user{i}", "email": f"user{i}@test.com"} for i in range(200)]
@@ -229,20 +230,18 @@ class TestMattermostClient(unittest.TestCase):
         self.assertEqual(mock_get.call_count, 2)
         mock_get.assert_any_call(
             f"{self.mock_url}/api/v4/users?in_channel={channel_id}&page=0&per_page=200",
-            headers=self.client.headers,
         )
         mock_get.assert_any_call(
             f"{self.mock_url}/api/v4/users?in_channel={channel_id}&page=1&per_page=200",
-            headers=self.client.headers,
         )
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_users_in_channel_api_error(self, mock_get):
         mock_get.side_effect = requests.exceptions.RequestException("API error")
         users = self.client.get_users_in_channel("chan_id_err")
         self.assertEqual(users, [])
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_users_in_channel_empty(self, mock_get):
         mock_response = Mock(status_code=200)
         mock_response.json.return_value = []  # Empty list for first page
@@ -269,7 +268,7 @@ class TestMattermostClient(unittest.TestCase):
             "test-project-with-really-really-long-name-that-will-be-cut-off-a",
         )
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_me_success_initialization(self, mock_get_request):
         mock_response = Mock(status_code=200)
         expected_bot_details = {"id": "bot_user_id_123", "username": "mybot"}
@@ -282,14 +281,14 @@ class TestMattermostClient(unittest.TestCase):
 
         self.assertEqual(client.bot_user_id, "bot_user_id_123")
         expected_api_url = f"{self.mock_url}/api/v4/users/me"
-        mock_get_request.assert_called_once_with(expected_api_url, headers=client.headers)
+        mock_get_request.assert_called_once_with(expected_api_url)
 
         # Test direct call to get_me as well (will be second call)
         details = client.get_me()
         self.assertEqual(details, expected_bot_details)
         self.assertEqual(mock_get_request.call_count, 2)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_me_failure_initialization(self, mock_get_request):
         mock_http_error_response = Mock()
         mock_http_error_response.status_code = 401
@@ -310,7 +309,7 @@ class TestMattermostClient(unittest.TestCase):
         self.assertIsNone(details)
         self.assertEqual(mock_get_request.call_count, 2)  # Once in init, once direct
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_create_direct_channel_success(self, mock_post_request):
         # Ensure bot_user_id is set on the existing client for this test
         # In real usage, it's set during __init__
@@ -333,7 +332,7 @@ class TestMattermostClient(unittest.TestCase):
         self.assertEqual(dm_channel_id, "dm_channel_id_456")
         expected_api_url = f"{self.mock_url}/api/v4/channels/direct"
         expected_payload = [self.client.bot_user_id, other_user_id]
-        mock_post_request.assert_called_once_with(expected_api_url, headers=self.client.headers, json=expected_payload)
+        mock_post_request.assert_called_once_with(expected_api_url, json=expected_payload)
 
     def test_create_direct_channel_fail_no_bot_id(self):
         original_bot_id = self.client.bot_user_id
@@ -395,7 +394,7 @@ class TestMattermostClient(unittest.TestCase):
         mock_post_message_class.assert_called_once_with(channel_id=mock_dm_channel_id, message=dm_message)
 
     # Tests for add_user_to_channel
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_add_user_to_channel_success(self, mock_post_request):
         channel_id = "channel_id_for_add"
         user_id = "user_id_to_add"
@@ -407,9 +406,9 @@ class TestMattermostClient(unittest.TestCase):
         self.assertTrue(result)
         expected_api_url = f"{self.mock_url}/api/v4/channels/{channel_id}/members"
         expected_payload = {"user_id": user_id}
-        mock_post_request.assert_called_once_with(expected_api_url, headers=self.client.headers, json=expected_payload)
+        mock_post_request.assert_called_once_with(expected_api_url, json=expected_payload)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_add_user_to_channel_already_member(self, mock_post_request):
         channel_id = "channel_id_for_add"
         user_id = "user_id_already_member"
@@ -433,9 +432,9 @@ class TestMattermostClient(unittest.TestCase):
         self.assertTrue(result)  # Should be considered success
         expected_api_url = f"{self.mock_url}/api/v4/channels/{channel_id}/members"
         expected_payload = {"user_id": user_id}
-        mock_post_request.assert_called_once_with(expected_api_url, headers=self.client.headers, json=expected_payload)
+        mock_post_request.assert_called_once_with(expected_api_url, json=expected_payload)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_add_user_to_channel_failure_other_http_error(self, mock_post_request):
         channel_id = "channel_id_for_add"
         user_id = "user_id_http_fail"
@@ -456,7 +455,7 @@ class TestMattermostClient(unittest.TestCase):
         result = self.client.add_user_to_channel(channel_id, user_id)
         self.assertFalse(result)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_add_user_to_channel_failure_request_exception(self, mock_post_request):
         channel_id = "channel_id_for_add"
         user_id = "user_id_req_ex"
@@ -470,7 +469,7 @@ class TestMattermostClient(unittest.TestCase):
         self.assertFalse(self.client.add_user_to_channel("", ""))
 
     # Tests for get_channels_for_team
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_channels_for_team_success_mixed_public_private(self, mock_get_request):
         team_id = "team_with_mixed_channels"
         private_channels_data = [
@@ -521,11 +520,9 @@ class TestMattermostClient(unittest.TestCase):
         self.assertEqual(mock_get_request.call_count, 2)
         mock_get_request.assert_any_call(
             f"{self.mock_url}/api/v4/teams/{team_id}/channels/private",
-            headers=self.client.headers,
         )
         mock_get_request.assert_any_call(
             f"{self.mock_url}/api/v4/teams/{team_id}/channels",
-            headers=self.client.headers,
         )
 
         # Expected: p_chan_1, pub_chan_1, pub_chan_2, shared_A (deduplicated)  # noqa: E501
@@ -536,7 +533,7 @@ class TestMattermostClient(unittest.TestCase):
         self.assertIn("public_chan_2", channel_ids)
         self.assertIn("shared_chan_A", channel_ids)  # Check the shared one is present
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_channels_for_team_only_public(self, mock_get_request):
         team_id = "team_only_public"
         public_channels_data = [
@@ -564,7 +561,7 @@ class TestMattermostClient(unittest.TestCase):
         self.assertIn("pub_A", channel_ids)
         self.assertIn("pub_B", channel_ids)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_channels_for_team_only_private(self, mock_get_request):
         team_id = "team_only_private"
         private_channels_data = [
@@ -588,7 +585,7 @@ class TestMattermostClient(unittest.TestCase):
         self.assertIn("priv_X", channel_ids)
         self.assertIn("priv_Y", channel_ids)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_channels_for_team_no_channels(self, mock_get_request):
         team_id = "team_no_channels"
         mock_response_empty1 = Mock(status_code=200)
@@ -600,7 +597,7 @@ class TestMattermostClient(unittest.TestCase):
         channels = self.client.get_channels_for_team(team_id)
         self.assertEqual(len(channels), 0)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_channels_for_team_api_error_on_private(self, mock_get_request):
         team_id = "team_err_private"
         public_channels_data = [{"id": "pub_C", "name": "pub-c", "type": "O"}]
@@ -617,7 +614,7 @@ class TestMattermostClient(unittest.TestCase):
         self.assertEqual(len(channels), 1)  # Should still return public channels
         self.assertEqual(channels[0]["id"], "pub_C")
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_channels_for_team_api_error_on_public(self, mock_get_request):
         team_id = "team_err_public"
         private_channels_data = [{"id": "priv_Z", "name": "priv-z", "type": "P"}]
@@ -634,7 +631,7 @@ class TestMattermostClient(unittest.TestCase):
         self.assertEqual(len(channels), 1)  # Should still return private channels
         self.assertEqual(channels[0]["id"], "priv_Z")
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_channels_for_team_api_error_on_both(self, mock_get_request):
         team_id = "team_err_both"
 
@@ -655,7 +652,7 @@ class TestMattermostClient(unittest.TestCase):
         self.assertEqual(channels, [])
         self.client.team_id = original_team_id  # Restore
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_channels_for_team_permission_denied_private(self, mock_get_request):
         team_id = "team_permission_denied_private"
         public_channels_data = [{"id": "pub_D", "name": "pub-d", "type": "O"}]
@@ -677,7 +674,7 @@ class TestMattermostClient(unittest.TestCase):
         # Check logs (optional, requires log capture setup if you want to assert specific log messages)
         # For now, just ensuring the function doesn't crash and returns what it can.
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_channels_for_team_permission_denied_public(self, mock_get_request):
         team_id = "team_permission_denied_public"
         private_channels_data = [{"id": "priv_E", "name": "priv-e", "type": "P"}]
@@ -697,56 +694,8 @@ class TestMattermostClient(unittest.TestCase):
         self.assertEqual(len(channels), 1)  # Should still return private channels
         self.assertEqual(channels[0]["id"], "priv_E")
 
-    # Tests for get_user_roles
-    @patch("requests.get")
-    def test_get_user_roles_success_admin(self, mock_get_request):
-        user_id = "admin_user_id"
-        expected_roles_data = {"id": user_id, "roles": "system_user system_admin"}
-        mock_response = Mock(status_code=200)
-        mock_response.json.return_value = expected_roles_data
-        mock_get_request.return_value = mock_response
-
-        roles = self.client.get_user_roles(user_id)
-        self.assertEqual(roles, ["system_user", "system_admin"])
-        expected_url = f"{self.mock_url}/api/v4/users/{user_id}"
-        mock_get_request.assert_called_once_with(expected_url, headers=self.client.headers)
-
-    @patch("requests.get")
-    def test_get_user_roles_success_user_only(self, mock_get_request):
-        user_id = "normal_user_id"
-        expected_roles_data = {"id": user_id, "roles": "system_user"}
-        mock_response = Mock(status_code=200)
-        mock_response.json.return_value = expected_roles_data
-        mock_get_request.return_value = mock_response
-
-        roles = self.client.get_user_roles(user_id)
-        self.assertEqual(roles, ["system_user"])
-
-    @patch("requests.get")
-    def test_get_user_roles_success_no_roles_string(self, mock_get_request):
-        user_id = "user_with_no_roles_field"
-        # Simulate response where 'roles' field is missing or null
-        expected_roles_data = {
-            "id": user_id,
-            "username": "norolesuser",
-        }  # No 'roles' key
-        mock_response = Mock(status_code=200)
-        mock_response.json.return_value = expected_roles_data
-        mock_get_request.return_value = mock_response
-        roles = self.client.get_user_roles(user_id)
-        self.assertEqual(roles, [])
-
-    @patch("requests.get")
-    def test_get_user_roles_success_empty_roles_string(self, mock_get_request):
-        user_id = "user_with_empty_roles_field"
-        expected_roles_data = {"id": user_id, "roles": ""}  # Empty 'roles' string
-        mock_response = Mock(status_code=200)
-        mock_response.json.return_value = expected_roles_data
-        mock_get_request.return_value = mock_response
-        roles = self.client.get_user_roles(user_id)
-        self.assertEqual(roles, [])  # Should return empty list, not list with one empty string
-
-    @patch("requests.get")
+    # Tests for get_user_roles (success cases are parametrized in test_get_user_roles below)
+    @patch("requests.Session.get")
     def test_get_user_roles_user_not_found(self, mock_get_request):
         user_id = "non_existent_user_id"
         mock_response = Mock(status_code=404)
@@ -756,14 +705,14 @@ class TestMattermostClient(unittest.TestCase):
         roles = self.client.get_user_roles(user_id)
         self.assertEqual(roles, [])
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_user_roles_api_error(self, mock_get_request):
         user_id = "user_id_api_error"
         mock_get_request.side_effect = requests.exceptions.RequestException("API connection error")
         roles = self.client.get_user_roles(user_id)
         self.assertEqual(roles, [])
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_user_roles_json_decode_error(self, mock_get_request):
         user_id = "user_id_json_error"
         mock_response = Mock(status_code=200)
@@ -776,7 +725,7 @@ class TestMattermostClient(unittest.TestCase):
         roles = self.client.get_user_roles("")
         self.assertEqual(roles, [])
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_list_users_success(self, mock_get):
         page1_users = [{"id": f"user{i}", "email": f"user{i}@test.com"} for i in range(200)]
         page2_users = [{"id": "user200", "email": "user200@test.com"}]
@@ -794,20 +743,18 @@ class TestMattermostClient(unittest.TestCase):
         self.assertEqual(mock_get.call_count, 2)
         mock_get.assert_any_call(
             f"{self.mock_url}/api/v4/users?page=0&per_page=200",
-            headers=self.client.headers,
         )
         mock_get.assert_any_call(
             f"{self.mock_url}/api/v4/users?page=1&per_page=200",
-            headers=self.client.headers,
         )
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_list_users_http_error(self, mock_get):
         mock_get.side_effect = requests.exceptions.HTTPError(response=Mock(status_code=500, text="Server Error"))
         users = self.client.list_users()
         self.assertIsNone(users)
 
-    @patch("requests.delete")
+    @patch("requests.Session.delete")
     def test_delete_user_success(self, mock_delete):
         user_id = "user_to_delete"
         mock_response = Mock(status_code=200)
@@ -817,9 +764,9 @@ class TestMattermostClient(unittest.TestCase):
         success = self.client.delete_user(user_id)
         self.assertTrue(success)
         expected_url = f"{self.mock_url}/api/v4/users/{user_id}"
-        mock_delete.assert_called_once_with(expected_url, headers=self.client.headers)
+        mock_delete.assert_called_once_with(expected_url)
 
-    @patch("requests.delete")
+    @patch("requests.Session.delete")
     def test_delete_user_failure(self, mock_delete):
         user_id = "user_to_delete_fail"
         mock_response = Mock(status_code=200)
@@ -829,7 +776,7 @@ class TestMattermostClient(unittest.TestCase):
         success = self.client.delete_user(user_id)
         self.assertFalse(success)
 
-    @patch("requests.delete")
+    @patch("requests.Session.delete")
     def test_delete_user_http_error(self, mock_delete):
         user_id = "user_to_delete_http_error"
         mock_response = Mock(status_code=403)
@@ -843,9 +790,28 @@ class TestMattermostClient(unittest.TestCase):
         self.assertFalse(self.client.delete_user(""))
 
 
+@pytest.mark.parametrize(
+    "roles_value, expected",
+    [
+        ("system_user system_admin", ["system_user", "system_admin"]),
+        ("system_user", ["system_user"]),
+        ("", []),  # Empty 'roles' string must not yield [""]
+        (None, []),  # No 'roles' key at all
+    ],
+)
+def test_get_user_roles(mm_client, roles_value, expected):
+    user_id = "u"
+    user_data = {"id": user_id} if roles_value is None else {"id": user_id, "roles": roles_value}
+    with patch("requests.Session.get", return_value=mock_mattermost_response(200, user_data)) as mock_get:
+        roles = mm_client.get_user_roles(user_id)
+
+    assert roles == expected
+    mock_get.assert_called_once_with(f"{mm_client.base_url}/api/v4/users/{user_id}")
+
+
 class TestMattermostClientFocalboard(unittest.TestCase):
-    @patch("requests.post")
-    @patch("requests.get")
+    @patch("requests.post")  # _login() does not go through the client session
+    @patch("requests.Session.get")
     def setUp(self, mock_get, mock_post):
         # Mock get_me for __init__
         mock_get.return_value.status_code = 200
@@ -877,9 +843,9 @@ class TestMattermostClientFocalboard(unittest.TestCase):
         mock_get.reset_mock()
         mock_post.reset_mock()
 
-    @patch("requests.get")
-    @patch("requests.patch")
-    @patch("requests.post")
+    @patch("requests.Session.get")
+    @patch("requests.Session.patch")
+    @patch("requests.Session.post")
     def test_create_board_from_template_success(self, mock_post, mock_patch, mock_get):
         # Mock duplicate board call
         mock_post.return_value = mock_mattermost_response(
@@ -907,7 +873,7 @@ class TestMattermostClientFocalboard(unittest.TestCase):
             json={"title": self.mock_new_board_name, "channelId": "channel_id"},
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_create_board_from_template_duplicate_fails(self, mock_post):
         mock_post.side_effect = requests.exceptions.RequestException("API Error")
 
@@ -916,8 +882,8 @@ class TestMattermostClientFocalboard(unittest.TestCase):
         )
         self.assertIsNone(result)
 
-    @patch("requests.patch")
-    @patch("requests.post")
+    @patch("requests.Session.patch")
+    @patch("requests.Session.post")
     def test_create_board_from_template_rename_fails(self, mock_post, mock_patch):
         # Mock duplicate board call
         mock_post.return_value = mock_mattermost_response(
@@ -940,7 +906,7 @@ class TestMattermostClientFocalboard(unittest.TestCase):
         )
         self.assertIsNone(result)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_add_user_to_board_success(self, mock_post):
         mock_post.return_value = mock_mattermost_response(200)
 
@@ -2,7 +2,9 @@ import unittest
 from unittest.mock import MagicMock, patch
 
 # import os # Removed as it's unused in test logic, only in example main
+import pytest
 import requests
+import urllib3
 from clients.nocodb_client import NocoDBClient
 
 # Helper to load .env for local testing if NocoDBClient's main example is run
@@ -11,10 +13,15 @@ from clients.nocodb_client import NocoDBClient
 
 
 class TestNocoDBClient(unittest.TestCase):
+    @pytest.fixture(autouse=True)
+    def _use_shared_client(self, nocodb_client):
+        # The client is built once per module (see conftest.py) instead of once per test.
+        nocodb_client.invalidate_bases_cache()
+        self.client = nocodb_client
+
     def setUp(self):
         self.nocodb_url = "http://fake-nocodb.com"
         self.token = "fake-token"
-        self.client = NocoDBClient(nocodb_url=self.nocodb_url, token=self.token)
         self.base_id_test = "p_testbaseid"
         self.user_id_test = "us_testuserid"
         self.email_test = "test@example.com"
@@ -23,6 +30,7 @@ class TestNocoDBClient(unittest.TestCase):
         self.assertEqual(self.client.base_url, self.nocodb_url)
         self.assertIn("xc-token", self.client.headers)
         self.assertEqual(self.client.headers["xc-token"], self.token)
+        self.assertEqual(self.client.session.headers["xc-token"], self.token)
 
     def test_initialization_failure(self):
         with self.assertRaises(ValueError):
@@ -30,7 +38,7 @@ class TestNocoDBClient(unittest.TestCase):
         with self.assertRaises(ValueError):
             NocoDBClient(nocodb_url="http://fake.com", token="")
 
-    @patch("clients.nocodb_client.requests.request")
+    @patch("requests.Session.request")
     def test_make_request_success(self, mock_request):
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -40,9 +48,9 @@ class TestNocoDBClient(unittest.TestCase):
 
         response = self.client._make_request("get", "test_endpoint")
         self.assertEqual(response, {"data": "success"})
-        mock_request.assert_called_once()
+        mock_request.assert_called_once_with("get", f"{self.nocodb_url}/api/v1/db/meta/test_endpoint")
 
-    @patch("clients.nocodb_client.requests.request")
+    @patch("requests.Session.request")
     def test_make_request_http_error(self, mock_request):
         mock_http_error = requests.exceptions.HTTPError("HTTP Error")
         # Ensure the mock error has a response attribute for the logger
@@ -58,13 +66,21 @@ class TestNocoDBClient(unittest.TestCase):
         response = self.client._make_request("get", "test_endpoint")
         self.assertIsNone(response)
 
-    @patch("clients.nocodb_client.requests.request")
+    @patch("requests.Session.request")
     def test_make_request_request_exception(self, mock_request):
         mock_request.side_effect = requests.exceptions.RequestException("Request Failed")
         response = self.client._make_request("get", "test_endpoint")
         self.assertIsNone(response)
 
-    @patch("clients.nocodb_client.requests.request")
+    @patch("urllib3.util.retry.time.sleep")  # Skip the retry backoff delays
+    @patch("urllib3.connectionpool.HTTPConnectionPool._make_request")
+    def test_make_request_retries_connection_errors(self, mock_make_request, mock_sleep):
+        mock_make_request.side_effect = urllib3.exceptions.ProtocolError("Connection aborted")
+        response = self.client._make_request("get", "test_endpoint")
+        self.assertIsNone(response)
+        self.assertEqual(mock_make_request.call_count, 4)  # Original attempt + 3 retries
+
+    @patch("requests.Session.request")
     def test_make_request_json_decode_error(self, mock_request):
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -108,6 +124,41 @@ class TestNocoDBClient(unittest.TestCase):
         self.assertEqual(response["title"], base_title_to_find)
         mock_make_request.assert_called_once_with("get", "projects/")
 
+    @patch.object(NocoDBClient, "_make_request")
+    def test_list_bases_cached(self, mock_make_request):
+        mock_make_request.return_value = {"list": [{"id": self.base_id_test, "title": "Cached Base"}]}
+        first = self.client.list_bases()
+        second = self.client.list_bases()
+        self.assertEqual(first, second)
+        self.assertEqual(mock_make_request.call_count, 1)
+
+    @patch.object(NocoDBClient, "_make_request")
+    def test_list_bases_callers_cannot_alter_the_cache(self, mock_make_request):
+        mock_make_request.return_value = {"list": [{"id": self.base_id_test, "title": "Cached Base"}]}
+        self.client.list_bases()["list"].pop()
+        self.client.list_bases()["list"].append({"id": "p_other", "title": "Other Base"})
+        self.assertEqual(self.client.list_bases(), {"list": [{"id": self.base_id_test, "title": "Cached Base"}]})
+        self.assertEqual(mock_make_request.call_count, 1)
+
+    @patch.object(NocoDBClient, "_make_request")
+    def test_list_bases_failure_not_cached(self, mock_make_request):
+        mock_make_request.return_value = None
+        self.assertIsNone(self.client.list_bases())
+        self.assertIsNone(self.client.list_bases())
+        self.assertEqual(mock_make_request.call_count, 2)
+
+    @patch.object(NocoDBClient, "_make_request")
+    def test_create_base_invalidates_bases_cache(self, mock_make_request):
+        mock_make_request.side_effect = [
+            {"list": []},
+            {"id": "p_newbase", "title": "New Test Base"},
+            {"list": [{"id": "p_newbase", "title": "New Test Base"}]},
+        ]
+        self.assertIsNone(self.client.get_base_by_title("New Test Base"))
+        self.client.create_base("New Test Base")
+        self.assertEqual(self.client.get_base_by_title("New Test Base")["id"], "p_newbase")
+        self.assertEqual(mock_make_request.call_count, 3)
+
     @patch.object(NocoDBClient, "_make_request")
     def test_get_base_by_title_not_found(self, mock_make_request):
         mock_make_request.return_value = {"list": [{"id": "p_other", "title": "Other Base"}]}
@@ -1,23 +1,83 @@
+import io
+import json
+import threading
 import unittest
-from unittest.mock import Mock, patch
+from unittest.mock import patch
 
+import pytest
 import requests  # For requests.exceptions.RequestException
+import responses
+from urllib3.response import HTTPResponse
 from clients.outline_client import OutlineClient  # Import the class
 
+BASE_URL = "http://fake-outline-url.com"
+COLLECTIONS_LIST_URL = f"{BASE_URL}/api/collections.list"
+COLLECTIONS_CREATE_URL = f"{BASE_URL}/api/collections.create"
+COLLECTIONS_INFO_URL = f"{BASE_URL}/api/collections.info"
+COLLECTIONS_REMOVE_USER_URL = f"{BASE_URL}/api/collections.remove_user"
+USERS_LIST_URL = f"{BASE_URL}/api/users.list"
+USERS_DELETE_URL = f"{BASE_URL}/api/users.delete"
+
+# Response bodies shared across tests. They are built once at import time and must not be mutated.
+_EMPTY_PAGE = {"data": [], "pagination": {"offset": 0, "limit": 100, "total": 0}}
+_SUCCESS = {"success": True}
+_FAILURE = {"success": False}
+_CACHED_COLLECTION = {"data": {"id": "coll-1", "name": "Cached"}}
+_FOUND_COLLECTION_PAGE = {
+    "data": [{"id": "coll-2", "name": "Found"}],
+    "pagination": {"limit": 100, "offset": 0, "total": 1},
+}
+
+
+def _request_json(call) -> dict:
+    """Decodes the JSON payload of a call recorded by responses."""
+    return json.loads(call.request.body)
+
 
 class TestOutlineClient(unittest.TestCase):
+    @pytest.fixture(autouse=True)
+    def _use_client_fixture(self, outline_client):
+        # The client is built once per module (see conftest.py); only its lookup cache carries state.
+        outline_client.clear_cache()
+        self.client = outline_client
+
     def setUp(self):
-        self.mock_url = "http://fake-outline-url.com"
+        self.mock_url = BASE_URL
         self.mock_token = "fake_outline_token"
-        try:
-            self.client = OutlineClient(base_url=self.mock_url, token=self.mock_token)
-        except ValueError:
-            self.fail("Client instantiation failed in setUp")
 
     def test_constructor_success(self):
         self.assertEqual(self.client.base_url, self.mock_url)
         self.assertEqual(self.client.token, self.mock_token)
         self.assertIn(f"Bearer {self.mock_token}", self.client.headers["Authorization"])
+        self.assertEqual(self.client.session.headers["Authorization"], f"Bearer {self.mock_token}")
+
+    def test_session_retries_rate_limited_requests(self):
+        list_retry = self.client.session.get_adapter(COLLECTIONS_LIST_URL).max_retries
+        self.assertIn(429, list_retry.status_forcelist)
+        self.assertIn(503, list_retry.status_forcelist)
+        self.assertTrue(list_retry.respect_retry_after_header)
+        self.assertTrue(list_retry.is_retry("POST", 429))
+        self.assertTrue(list_retry.is_retry("POST", 503))  # Outline reads through POST
+
+        # Creating a collection twice would duplicate it: no retry after 5xx or read errors
+        create_retry = self.client.session.get_adapter(COLLECTIONS_CREATE_URL).max_retries
+        self.assertTrue(create_retry.is_retry("POST", 429))
+        self.assertFalse(create_retry.is_retry("POST", 503))
+        self.assertNotIn("POST", create_retry.allowed_methods)  # So read errors are not retried either
+
+    @patch("urllib3.util.retry.time.sleep")  # Skip the retry backoff delays
+    @patch("urllib3.connectionpool.HTTPConnectionPool._make_request")
+    def test_mutating_rpcs_are_not_resent_on_5xx(self, mock_make_request, mock_sleep):
+        # The change may have been made before the gateway failed: a resend would fail and report an error
+        mock_make_request.side_effect = lambda *args, **kwargs: HTTPResponse(
+            body=io.BytesIO(b"{}"), status=503, preload_content=False
+        )
+        self.assertFalse(self.client.delete_user("user-1"))
+        mock_make_request.assert_called_once()
+
+        mock_make_request.reset_mock()
+        self.assertFalse(self.client.remove_user_from_collection("coll-1", "user-1"))
+        mock_make_request.assert_called_once()
 
     def test_constructor_value_error(self):
         with self.assertRaises(ValueError) as cm:
@@ -28,116 +88,85 @@ class TestOutlineClient(unittest.TestCase):
             OutlineClient(base_url="fake", token=None)
         self.assertEqual(str(cm.exception), "Outline base_url and token must be provided.")
 
-    @patch("requests.post")
-    def test_create_group_success_collection_does_not_exist(self, mock_post_request):
-        # Mock for list_collections (first call)
-        mock_list_response = Mock()
-        mock_list_response.status_code = 200
-        mock_list_response.json.return_value = {
-            "data": [],
-            "pagination": {"offset": 0, "limit": 100, "total": 0},
-        }
-
-        # Mock for collections.create (second call)
+    @responses.activate
+    def test_create_group_success_collection_does_not_exist(self):
+        # list_collections (first call) finds nothing, collections.create (second call) succeeds
         project_name = "new_project"
         expected_collection_data = {"id": "collection_id_123", "name": project_name}
-        mock_create_response = Mock()
-        mock_create_response.status_code = 200
-        mock_create_response.json.return_value = {"data": expected_collection_data}
-
-        mock_post_request.side_effect = [mock_list_response, mock_create_response]
+        responses.add(responses.POST, COLLECTIONS_LIST_URL, json=_EMPTY_PAGE)
+        responses.add(responses.POST, COLLECTIONS_CREATE_URL, json={"data": expected_collection_data})
 
         result = self.client.create_group(project_name)
         self.assertEqual(result, expected_collection_data)
 
-        self.assertEqual(mock_post_request.call_count, 2)
-
-        list_call_args = mock_post_request.call_args_list[0]
-        self.assertEqual(list_call_args[0][0], f"{self.mock_url}/api/collections.list")
-
-        create_call_args = mock_post_request.call_args_list[1]
-        self.assertEqual(create_call_args[0][0], f"{self.mock_url}/api/collections.create")
-        self.assertEqual(create_call_args[1]["json"], {"name": project_name})
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(responses.calls[0].request.url, COLLECTIONS_LIST_URL)
+        self.assertEqual(responses.calls[1].request.url, COLLECTIONS_CREATE_URL)
+        self.assertEqual(_request_json(responses.calls[1]), {"name": project_name})
+        self.assertEqual(responses.calls[1].request.headers["Authorization"], f"Bearer {self.mock_token}")
 
-    @patch("requests.post")
-    def test_create_group_success_collection_already_exists(self, mock_post_request):
+    @responses.activate
+    def test_create_group_success_collection_already_exists(self):
         project_name = "existing_project"
         expected_existing_collection = {"id": "existing_id_456", "name": project_name}
-        mock_list_response = Mock()
-        mock_list_response.status_code = 200
-        mock_list_response.json.return_value = {
-            "data": [expected_existing_collection],
-            "pagination": {"offset": 0, "limit": 100, "total": 1},
-        }
-        mock_post_request.return_value = mock_list_response
+        responses.add(
+            responses.POST,
+            COLLECTIONS_LIST_URL,
+            json={
+                "data": [expected_existing_collection],
+                "pagination": {"offset": 0, "limit": 100, "total": 1},
+            },
+        )
 
         result = self.client.create_group(project_name)
         self.assertEqual(result, expected_existing_collection)
 
-        mock_post_request.assert_called_once()
-        list_call_args = mock_post_request.call_args_list[0]
-        self.assertEqual(list_call_args[0][0], f"{self.mock_url}/api/collections.list")
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(responses.calls[0].request.url, COLLECTIONS_LIST_URL)
 
-    @patch("requests.post")
-    def test_create_group_failure_during_list_check(self, mock_post_request):
+    @responses.activate
+    def test_create_group_failure_during_list_check(self):
         project_name = "project_list_fail"
-        mock_post_request.side_effect = requests.exceptions.RequestException(
-            f"Request failed while fetching Outline collections: {project_name}"
+        responses.add(
+            responses.POST,
+            COLLECTIONS_LIST_URL,
+            body=requests.exceptions.RequestException(
+                f"Request failed while fetching Outline collections: {project_name}"
+            ),
         )
 
         result = self.client.create_group(project_name)
         self.assertIsNone(result)
-        self.assertEqual(mock_post_request.call_count, 1)
-
-    @patch("requests.post")
-    def test_create_group_failure_during_actual_creation(self, mock_post_request):
-        mock_list_response = Mock()
-        mock_list_response.status_code = 200
-        mock_list_response.json.return_value = {
-            "data": [],
-            "pagination": {"offset": 0, "limit": 100, "total": 0},
-        }
-
-        mock_create_response = Mock()
-        mock_create_response.status_code = 403
-        mock_create_response.json.return_value = {"message": "Cannot create"}
-        # Simulate raise_for_status() for the failing call
-        http_error = requests.exceptions.HTTPError(response=mock_create_response)
-        mock_create_response.raise_for_status.side_effect = http_error
+        self.assertEqual(len(responses.calls), 1)
 
-        mock_post_request.side_effect = [mock_list_response, mock_create_response]
+    @responses.activate
+    def test_create_group_failure_during_actual_creation(self):
+        responses.add(responses.POST, COLLECTIONS_LIST_URL, json=_EMPTY_PAGE)
+        responses.add(responses.POST, COLLECTIONS_CREATE_URL, json={"message": "Cannot create"}, status=403)
 
         project_name = "project_create_fail"
         result = self.client.create_group(project_name)
         self.assertIsNone(result)
-        self.assertEqual(mock_post_request.call_count, 2)
-
-    @patch("requests.post")
-    def test_create_group_failure_unexpected_response_data_in_create(self, mock_post_request):
-        mock_list_response = Mock()
-        mock_list_response.status_code = 200
-        mock_list_response.json.return_value = {
-            "data": [],
-            "pagination": {"offset": 0, "limit": 100, "total": 0},
-        }
-
-        mock_create_response = Mock()
-        mock_create_response.status_code = 200
-        mock_create_response.json.return_value = {"data": None}  # Malformed: 'data' is None, not a dict with 'id'
+        self.assertEqual(len(responses.calls), 2)
 
-        mock_post_request.side_effect = [mock_list_response, mock_create_response]
+    @responses.activate
+    def test_create_group_failure_unexpected_response_data_in_create(self):
+        responses.add(responses.POST, COLLECTIONS_LIST_URL, json=_EMPTY_PAGE)
+        # Malformed create response: 'data' is None, not a dict with 'id'
+        responses.add(responses.POST, COLLECTIONS_CREATE_URL, json={"data": None})
 
         project_name = "test_project_malformed_success_create"
         result = self.client.create_group(project_name)
         self.assertIsNone(result)
-        self.assertEqual(mock_post_request.call_count, 2)
+        self.assertEqual(len(responses.calls), 2)
 
-    @patch("requests.post")
-    def test_list_collections_success_find_by_name(self, mock_post):
+    @responses.activate
+    def test_list_collections_success_find_by_name(self):
         # Test finding a single collection by name
-        mock_post.return_value = Mock(
-            status_code=200,
-            json=lambda: {
+        responses.add(
+            responses.POST,
+            COLLECTIONS_LIST_URL,
+            json={
                 "data": [{"id": "coll-2", "name": "Test Collection"}],
                 "pagination": {"limit": 100, "offset": 0, "total": 1},
             },
@@ -145,51 +174,66 @@ class TestOutlineClient(unittest.TestCase):
         collection = self.client.list_collections(name="Test Collection")
         self.assertIsNotNone(collection)
         self.assertEqual(collection["id"], "coll-2")
-        self.assertEqual(mock_post.call_count, 1)
-
-    @patch("requests.post")
-    def test_list_collections_success_get_all(self, mock_post):
-        # Test listing all collections with pagination
-        mock_post.side_effect = [
-            Mock(
-                status_code=200,
-                json=lambda: {
-                    "data": [
-                        {"id": "coll-1", "name": "First"},
-                        {"id": "coll-2", "name": "Second"},
-                    ],
-                    "pagination": {"limit": 2, "offset": 0, "total": 3},
-                },
-            ),
-            Mock(
-                status_code=200,
-                json=lambda: {
-                    "data": [{"id": "coll-3", "name": "Third"}],
-                    "pagination": {"limit": 2, "offset": 2, "total": 3},
-                },
-            ),
-        ]
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_list_collections_by_name_checks_more_pages_only_when_ambiguous(self):
+        # The query matches 3 collections, 2 per page, and the exact name is on the second page
+        responses.add(
+            responses.POST,
+            COLLECTIONS_LIST_URL,
+            json={
+                "data": [{"id": "coll-1", "name": "Docs Archive"}, {"id": "coll-2", "name": "Old Docs"}],
+                "pagination": {"limit": 2, "offset": 0, "total": 3},
+            },
+        )
+        responses.add(
+            responses.POST,
+            COLLECTIONS_LIST_URL,
+            json={"data": [{"id": "coll-3", "name": "Docs"}], "pagination": {"limit": 2, "offset": 2, "total": 3}},
+        )
+        collection = self.client.list_collections(name="Docs")
+        self.assertEqual(collection["id"], "coll-3")
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(_request_json(responses.calls[1]), {"query": "Docs", "limit": 2, "offset": 2})
+
+    @responses.activate
+    def test_list_collections_success_get_all(self):
+        # Test listing all collections with pagination; registrations for a URL are served in order
+        responses.add(
+            responses.POST,
+            COLLECTIONS_LIST_URL,
+            json={
+                "data": [
+                    {"id": "coll-1", "name": "First"},
+                    {"id": "coll-2", "name": "Second"},
+                ],
+                "pagination": {"limit": 2, "offset": 0, "total": 3},
+            },
+        )
+        responses.add(
+            responses.POST,
+            COLLECTIONS_LIST_URL,
+            json={
+                "data": [{"id": "coll-3", "name": "Third"}],
+                "pagination": {"limit": 2, "offset": 2, "total": 3},
+            },
+        )
         collections = self.client.list_collections()
         self.assertIsInstance(collections, list)
         self.assertEqual(len(collections), 3)
         self.assertEqual(collections[2]["name"], "Third")
-        self.assertEqual(mock_post.call_count, 2)
-
-    @patch("requests.post")
-    def test_list_collections_not_found(self, mock_post):
-        mock_post.return_value = Mock(
-            status_code=200,
-            json=lambda: {
-                "data": [],
-                "pagination": {"limit": 25, "offset": 0, "total": 0},
-            },
-        )
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_list_collections_not_found(self):
+        responses.add(responses.POST, COLLECTIONS_LIST_URL, json=_EMPTY_PAGE)
         collection = self.client.list_collections(name="Non-Existent Collection")
         self.assertEqual(collection, [])
 
-    @patch("requests.post")
-    def test_list_collections_http_error(self, mock_post):
-        mock_post.side_effect = requests.exceptions.HTTPError(response=Mock(status_code=500, text="Server Error"))
+    @responses.activate
+    def test_list_collections_http_error(self):
+        responses.add(responses.POST, COLLECTIONS_LIST_URL, body="Server Error", status=500)
         collection = self.client.list_collections(name="Any Collection")
         self.assertIsNone(collection)
 
@@ -197,150 +241,251 @@ class TestOutlineClient(unittest.TestCase):
         client_with_slash = OutlineClient(base_url="http://fake-outline-url.com/", token=self.mock_token)
         self.assertEqual(client_with_slash.base_url, "http://fake-outline-url.com")
 
-    @patch("requests.post")
-    def test_get_collection_details_success(self, mock_post_request):
-        mock_response = Mock()
-        mock_response.status_code = 200
+    @responses.activate
+    def test_get_collection_details_success(self):
         expected_details = {
             "id": "coll_id_1",
             "name": "Test Collection",
             "urlId": "test-coll",
         }
-        mock_response.json.return_value = {"data": expected_details}
-        mock_post_request.return_value = mock_response
+        responses.add(responses.POST, COLLECTIONS_INFO_URL, json={"data": expected_details})
 
         collection_id = "coll_id_1"
         details = self.client.get_collection_details(collection_id)
 
         self.assertEqual(details, expected_details)
-        expected_api_url = f"{self.mock_url}/api/collections.info"
-        expected_payload = {"id": collection_id}
-        mock_post_request.assert_called_once_with(expected_api_url, headers=self.client.headers, json=expected_payload)
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(_request_json(responses.calls[0]), {"id": collection_id})
+
+    @responses.activate
+    def test_get_collection_details_cached(self):
+        responses.add(responses.POST, COLLECTIONS_INFO_URL, json=_CACHED_COLLECTION)
+        responses.add(responses.POST, COLLECTIONS_REMOVE_USER_URL, json=_SUCCESS)
+        first = self.client.get_collection_details("coll-1")
+        second = self.client.get_collection_details("coll-1")
+        self.assertEqual(first, second)
+        self.assertEqual(len(responses.calls), 1)
+
+        # A successful membership change drops the cached details
+        self.assertTrue(self.client.remove_user_from_collection("coll-1", "user-1"))
+        self.client.get_collection_details("coll-1")
+        self.assertEqual(len(responses.calls), 3)
+
+    @responses.activate
+    def test_list_collections_by_name_caches_hits_only(self):
+        responses.add(responses.POST, COLLECTIONS_LIST_URL, json=_EMPTY_PAGE)
+        self.assertEqual(self.client.list_collections(name="Missing"), [])
+        self.assertEqual(self.client.list_collections(name="Missing"), [])
+        self.assertEqual(len(responses.calls), 2)
+
+        responses.replace(responses.POST, COLLECTIONS_LIST_URL, json=_FOUND_COLLECTION_PAGE)
+        self.assertEqual(self.client.list_collections(name="Found")["id"], "coll-2")
+        self.assertEqual(self.client.list_collections(name="Found")["id"], "coll-2")
+        self.assertEqual(len(responses.calls), 3)
+
+        self.client.clear_cache()
+        self.client.list_collections(name="Found")
+        self.assertEqual(len(responses.calls), 4)
 
     # Tests for remove_user_from_collection
-    @patch("requests.post")
-    def test_remove_user_from_collection_success_true(self, mock_post):
-        mock_response = Mock(status_code=200)
-        mock_response.json.return_value = {"success": True}
-        mock_post.return_value = mock_response
+    @responses.activate
+    def test_remove_user_from_collection_success_true(self):
+        responses.add(responses.POST, COLLECTIONS_REMOVE_USER_URL, json=_SUCCESS)
 
         result = self.client.remove_user_from_collection("coll_id_1", "user_id_1")
         self.assertTrue(result)
-        expected_url = f"{self.mock_url}/api/collections.remove_user"
-        expected_payload = {"id": "coll_id_1", "userId": "user_id_1"}
-        mock_post.assert_called_once_with(expected_url, headers=self.client.headers, json=expected_payload)
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(_request_json(responses.calls[0]), {"id": "coll_id_1", "userId": "user_id_1"})
 
-    @patch("requests.post")
-    def test_remove_user_from_collection_success_204_no_content(self, mock_post):
-        mock_response = Mock(status_code=204)
-        mock_post.return_value = mock_response
+    @responses.activate
+    def test_remove_user_from_collection_success_204_no_content(self):
+        responses.add(responses.POST, COLLECTIONS_REMOVE_USER_URL, status=204)
 
         result = self.client.remove_user_from_collection("coll_id_1", "user_id_1")
         self.assertTrue(result)
-        expected_url = f"{self.mock_url}/api/collections.remove_user"
-        expected_payload = {"id": "coll_id_1", "userId": "user_id_1"}
-        mock_post.assert_called_once_with(expected_url, headers=self.client.headers, json=expected_payload)
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(_request_json(responses.calls[0]), {"id": "coll_id_1", "userId": "user_id_1"})
 
-    @patch("requests.post")
-    def test_remove_user_from_collection_failure_false(self, mock_post):
-        mock_response = Mock(status_code=200)
-        mock_response.json.return_value = {"success": False}
-        mock_post.return_value = mock_response
+    @responses.activate
+    def test_remove_user_from_collection_failure_false(self):
+        responses.add(responses.POST, COLLECTIONS_REMOVE_USER_URL, json=_FAILURE)
 
         result = self.client.remove_user_from_collection("coll_id_1", "user_id_1")
         self.assertFalse(result)
 
-    @patch("requests.post")
-    def test_remove_user_from_collection_failure_http_error(self, mock_post):
-        mock_err_response = Mock(status_code=403)
-        mock_err_response.text = "Forbidden action"
-        mock_err_response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=mock_err_response)
-        mock_post.return_value = mock_err_response
+    @responses.activate
+    def test_remove_user_from_collection_failure_http_error(self):
+        responses.add(responses.POST, COLLECTIONS_REMOVE_USER_URL, body="Forbidden action", status=403)
 
         result = self.client.remove_user_from_collection("coll_id_1", "user_id_1")
         self.assertFalse(result)
 
-    @patch("requests.post")
-    def test_remove_user_from_collection_failure_request_exception(self, mock_post):
-        mock_post.side_effect = requests.exceptions.RequestException("Network issue")
+    @responses.activate
+    def test_remove_user_from_collection_failure_request_exception(self):
+        responses.add(
+            responses.POST,
+            COLLECTIONS_REMOVE_USER_URL,
+            body=requests.exceptions.RequestException("Network issue"),
+        )
         result = self.client.remove_user_from_collection("coll_id_1", "user_id_1")
         self.assertFalse(result)
 
+    @patch.object(OutlineClient, "remove_user_from_collection")
+    def test_remove_users_from_collection_batch(self, mock_remove_user):
+        mock_remove_user.side_effect = lambda collection_id, user_id: user_id != "user-fail"
+        result = self.client.remove_users_from_collection("coll-1", ["user-1", "user-fail", "user-2"])
+        self.assertEqual(result, {"user-1": True, "user-fail": False, "user-2": True})
+        self.assertEqual(mock_remove_user.call_count, 3)
+        for user_id in ["user-1", "user-fail", "user-2"]:
+            mock_remove_user.assert_any_call("coll-1", user_id)
+
+    @patch.object(OutlineClient, "remove_user_from_collection")
+    def test_remove_users_from_collection_empty(self, mock_remove_user):
+        self.assertEqual(self.client.remove_users_from_collection("coll-1", []), {})
+        mock_remove_user.assert_not_called()
+
     def test_remove_user_from_collection_missing_ids(self):
         self.assertFalse(self.client.remove_user_from_collection(None, "user_id_1"))
         self.assertFalse(self.client.remove_user_from_collection("coll_id_1", None))
         self.assertFalse(self.client.remove_user_from_collection("", "user_id_1"))
         self.assertFalse(self.client.remove_user_from_collection("coll_id_1", ""))
 
-    @patch("requests.post")
-    def test_list_users_success(self, mock_post):
+    @responses.activate
+    def test_list_users_success(self):
         # Test listing all users with pagination
-        mock_post.side_effect = [
-            Mock(
-                status_code=200,
-                json=lambda: {
-                    "data": [
-                        {"id": "user-1", "name": "User One"},
-                        {"id": "user-2", "name": "User Two"},
-                    ],
-                    "pagination": {"limit": 2, "offset": 0, "total": 3},
-                },
-            ),
-            Mock(
-                status_code=200,
-                json=lambda: {
-                    "data": [{"id": "user-3", "name": "User Three"}],
-                    "pagination": {"limit": 2, "offset": 2, "total": 3},
-                },
-            ),
-        ]
+        responses.add(
+            responses.POST,
+            USERS_LIST_URL,
+            json={
+                "data": [
+                    {"id": "user-1", "name": "User One"},
+                    {"id": "user-2", "name": "User Two"},
+                ],
+                "pagination": {"limit": 2, "offset": 0, "total": 3},
+            },
+        )
+        responses.add(
+            responses.POST,
+            USERS_LIST_URL,
+            json={
+                "data": [{"id": "user-3", "name": "User Three"}],
+                "pagination": {"limit": 2, "offset": 2, "total": 3},
+            },
+        )
         users = self.client.list_users()
         self.assertIsInstance(users, list)
         self.assertEqual(len(users), 3)
         self.assertEqual(users[2]["name"], "User Three")
-        self.assertEqual(mock_post.call_count, 2)
-
-    @patch("requests.post")
-    def test_list_users_http_error(self, mock_post):
-        mock_post.side_effect = requests.exceptions.HTTPError(response=Mock(status_code=500, text="Server Error"))
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_list_collections_concurrent_pages_keep_order(self):
+        all_items = [{"id": f"coll-{i}", "name": f"Collection {i}"} for i in range(7)]
+
+        def page_by_offset(request):
+            offset = json.loads(request.body)["offset"]
+            body = {
+                "data": all_items[offset : offset + 2],
+                "pagination": {"limit": 2, "offset": offset, "total": len(all_items)},
+            }
+            return 200, {}, json.dumps(body)
+
+        responses.add_callback(
+            responses.POST, COLLECTIONS_LIST_URL, callback=page_by_offset, content_type="application/json"
+        )
+        collections = self.client.list_collections()
+        self.assertEqual(collections, all_items)
+        self.assertEqual(len(responses.calls), 4)
+        offsets = sorted(_request_json(call)["offset"] for call in responses.calls)
+        self.assertEqual(offsets, [0, 2, 4, 6])
+
+    @responses.activate
+    def test_list_users_without_total_walks_pages(self):
+        responses.add(responses.POST, USERS_LIST_URL, json={"data": [{"id": "user-1"}, {"id": "user-2"}]})
+        responses.add(responses.POST, USERS_LIST_URL, json={"data": [{"id": "user-3"}]})
+        responses.add(responses.POST, USERS_LIST_URL, json={"data": []})
+        users = self.client.list_users()
+        self.assertEqual([u["id"] for u in users], ["user-1", "user-2", "user-3"])
+        self.assertEqual(len(responses.calls), 3)
+
+    @responses.activate
+    def test_iter_users_prefetches_next_page(self):
+        second_page_requested = threading.Event()
+
+        def page_by_offset(request):
+            offset = json.loads(request.body)["offset"]
+            if offset == 0:
+                body = {"data": [{"id": "user-1"}, {"id": "user-2"}], "pagination": {"total": 3}}
+            else:
+                second_page_requested.set()
+                body = {"data": [{"id": "user-3"}], "pagination": {"total": 3}}
+            return 200, {}, json.dumps(body)
+
+        responses.add_callback(
+            responses.POST, USERS_LIST_URL, callback=page_by_offset, content_type="application/json"
+        )
+        users = self.client.iter_users(limit=2)
+        self.assertEqual(next(users)["id"], "user-1")
+        # The second page is fetched while the caller still works on the first one
+        self.assertTrue(second_page_requested.wait(timeout=5))
+
+        self.assertEqual([u["id"] for u in users], ["user-2", "user-3"])
+        self.assertEqual(len(responses.calls), 2)  # The total is reached, no trailing empty page
+        self.assertEqual(sorted(_request_json(call)["offset"] for call in responses.calls), [0, 2])
+
+    @responses.activate
+    def test_iter_users_short_page_restarts_prefetch_at_its_end(self):
+        # The server returns fewer users than requested: the page requested ahead at offset 3 is discarded
+        pages = {0: [{"id": "user-1"}, {"id": "user-2"}], 2: [{"id": "user-3"}, {"id": "user-4"}]}
+
+        def page_by_offset(request):
+            offset = json.loads(request.body)["offset"]
+            return 200, {}, json.dumps({"data": pages.get(offset, []), "pagination": {"total": 4}})
+
+        responses.add_callback(
+            responses.POST, USERS_LIST_URL, callback=page_by_offset, content_type="application/json"
+        )
+        users = list(self.client.iter_users(limit=3))
+        self.assertEqual([u["id"] for u in users], ["user-1", "user-2", "user-3", "user-4"])
+
+    @responses.activate
+    def test_iter_collections_raises_on_http_error(self):
+        responses.add(responses.POST, COLLECTIONS_LIST_URL, body="Server Error", status=500)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            list(self.client.iter_collections())
+
+    @responses.activate
+    def test_list_users_http_error(self):
+        responses.add(responses.POST, USERS_LIST_URL, body="Server Error", status=500)
         users = self.client.list_users()
         self.assertIsNone(users)
 
-    @patch("requests.post")
-    def test_delete_user_success(self, mock_post):
-        mock_response = Mock(status_code=200)
-        mock_response.json.return_value = {"success": True}
-        mock_post.return_value = mock_response
+    @responses.activate
+    def test_delete_user_success(self):
+        responses.add(responses.POST, USERS_DELETE_URL, json=_SUCCESS)
 
         result = self.client.delete_user("user_id_1")
         self.assertTrue(result)
-        expected_url = f"{self.mock_url}/api/users.delete"
-        expected_payload = {"id": "user_id_1"}
-        mock_post.assert_called_once_with(expected_url, headers=self.client.headers, json=expected_payload)
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(_request_json(responses.calls[0]), {"id": "user_id_1"})
 
-    @patch("requests.post")
-    def test_delete_user_success_204(self, mock_post):
-        mock_response = Mock(status_code=204)
-        mock_post.return_value = mock_response
+    @responses.activate
+    def test_delete_user_success_204(self):
+        responses.add(responses.POST, USERS_DELETE_URL, status=204)
 
         result = self.client.delete_user("user_id_1")
         self.assertTrue(result)
 
-    @patch("requests.post")
-    def test_delete_user_failure(self, mock_post):
-        mock_response = Mock(status_code=200)
-        mock_response.json.return_value = {"success": False}
-        mock_post.return_value = mock_response
+    @responses.activate
+    def test_delete_user_failure(self):
+        responses.add(responses.POST, USERS_DELETE_URL, json=_FAILURE)
 
         result = self.client.delete_user("user_id_1")
         self.assertFalse(result)
 
-    @patch("requests.post")
-    def test_delete_user_http_error(self, mock_post):
-        mock_err_response = Mock(status_code=403)
-        mock_err_response.text = "Forbidden action"
-        mock_err_response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=mock_err_response)
-        mock_post.return_value = mock_err_response
+    @responses.activate
+    def test_delete_user_http_error(self):
+        responses.add(responses.POST, USERS_DELETE_URL, body="Forbidden action", status=403)
 
         result = self.client.delete_user("user_id_1")
         self.assertFalse(result)
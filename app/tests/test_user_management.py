@@ -1,14 +1,14 @@
 import unittest
 from unittest.mock import patch
 
-from libraries.user_management import remove_inactive_users
+from libraries.user_management import remove_inactive_outline_users, remove_inactive_users
 
 
+@patch("libraries.user_management.remove_inactive_outline_users")
+@patch("libraries.user_management.remove_inactive_nocodb_users")
+@patch("libraries.user_management.remove_inactive_mattermost_users")
 class TestUserManagement(unittest.TestCase):
 
-    @patch("libraries.user_management.remove_inactive_outline_users")
-    @patch("libraries.user_management.remove_inactive_nocodb_users")
-    @patch("libraries.user_management.remove_inactive_mattermost_users")
     def test_remove_inactive_users_calls_correct_functions(
         self, mock_remove_mattermost, mock_remove_nocodb, mock_remove_outline
     ):
@@ -20,9 +20,6 @@ class TestUserManagement(unittest.TestCase):
         mock_remove_nocodb.assert_called_once_with({"user1@example.com"})
         mock_remove_mattermost.assert_called_once_with({"user1@example.com"})
 
-    @patch("libraries.user_management.remove_inactive_outline_users")
-    @patch("libraries.user_management.remove_inactive_nocodb_users")
-    @patch("libraries.user_management.remove_inactive_mattermost_users")
     def test_remove_inactive_users_single_service(
         self, mock_remove_mattermost, mock_remove_nocodb, mock_remove_outline
     ):
@@ -35,5 +32,22 @@ class TestUserManagement(unittest.TestCase):
         mock_remove_mattermost.assert_not_called()
 
 
-if __name__ == "__main__":
-    unittest.main()
+class TestRemoveInactiveOutlineUsers(unittest.TestCase):
+
+    @patch.dict("os.environ", {"OUTLINE_URL": "http://fake-outline-url.com", "OUTLINE_TOKEN": "fake_token"})
+    @patch("libraries.user_management.OutlineClient")
+    def test_remove_inactive_outline_users_streams_users(self, mock_outline_client_class):
+        mock_client = mock_outline_client_class.return_value
+        mock_client.iter_users.return_value = iter(
+            [
+                {"id": "outline-1", "email": "User1@example.com"},
+                {"id": "outline-2", "email": "gone@example.com"},
+                {"id": "outline-3"},
+            ]
+        )
+        mock_client.delete_user.return_value = True
+
+        remove_inactive_outline_users({"user1@example.com"})
+
+        mock_client.list_users.assert_not_called()
+        mock_client.delete_user.assert_called_once_with("outline-2")
@@ -2,7 +2,7 @@ from unittest.mock import MagicMock
 
 import pytest
 
-from app.user_right_manager import UserRightManager
+from app.user_right_manager import UserRightManager, _expected_admin_slug
 
 
 @pytest.fixture
@@ -28,42 +28,62 @@ async def test_is_admin_false(mock_bot):
 
 
 @pytest.mark.asyncio
-async def test_is_channel_admin_true(mock_bot):
-    mock_bot.mattermost_api_client.get_channel_by_id.return_value = {
-        "name": "projet-test-admin",
-        "display_name": "Projet Test Admin",
-    }
-    mock_bot.mattermost_api_client.get_users_in_channel.return_value = [{"id": "user_id"}]
-    mock_bot.config.PERMISSIONS_MATRIX = {
-        "projet": {"admin": {"mattermost_channel_name_pattern": "projet-{base_name}-admin"}}
-    }
+async def test_is_admin_reuses_roles(mock_bot):
+    mock_bot.mattermost_api_client.get_user_roles.return_value = ["system_user", "system_admin"]
     user_right_manager = UserRightManager(mock_bot)
-    assert await user_right_manager.is_channel_admin("user_id", "channel_id") is True
+
+    assert await user_right_manager.is_admin("user_id") is True
+    assert await user_right_manager.is_admin("user_id") is True
+    mock_bot.mattermost_api_client.get_user_roles.assert_called_once_with("user_id")
 
 
 @pytest.mark.asyncio
-async def test_is_channel_admin_false_not_admin_channel(mock_bot):
+async def test_is_admin_does_not_cache_failed_lookup(mock_bot):
+    mock_bot.mattermost_api_client.get_user_roles.side_effect = [[], ["system_admin"]]
+    user_right_manager = UserRightManager(mock_bot)
+
+    assert await user_right_manager.is_admin("user_id") is False
+    assert await user_right_manager.is_admin("user_id") is True
+
+
+@pytest.mark.parametrize(
+    "channel_name, display_name, channel_users, expected",
+    [
+        ("projet-test-admin", "Projet Test Admin", [{"id": "user_id"}], True),
+        ("projet-test", "Projet Test", [{"id": "user_id"}], False),  # Not an admin channel
+        ("projet-test-admin", "Projet Test Admin", [{"id": "other_user_id"}], False),  # Not a member
+    ],
+    ids=["admin_channel_member", "not_admin_channel", "not_member"],
+)
+@pytest.mark.asyncio
+async def test_is_channel_admin(mock_bot, permissions_matrix, channel_name, display_name, channel_users, expected):
     mock_bot.mattermost_api_client.get_channel_by_id.return_value = {
-        "name": "projet-test",
-        "display_name": "Projet Test",
-    }
-    mock_bot.mattermost_api_client.get_users_in_channel.return_value = [{"id": "user_id"}]
-    mock_bot.config.PERMISSIONS_MATRIX = {
-        "projet": {"admin": {"mattermost_channel_name_pattern": "projet-{base_name}-admin"}}
+        "name": channel_name,
+        "display_name": display_name,
     }
+    mock_bot.mattermost_api_client.get_users_in_channel.return_value = channel_users
+    mock_bot.config.PERMISSIONS_MATRIX = permissions_matrix
     user_right_manager = UserRightManager(mock_bot)
-    assert await user_right_manager.is_channel_admin("user_id", "channel_id") is False
+    assert await user_right_manager.is_channel_admin("user_id", "channel_id") is expected
+
+
+def test_expected_admin_slug_is_memoized():
+    _expected_admin_slug.cache_clear()
+    assert _expected_admin_slug("Projet {base_name} Admin", "Test") == "projet-test-admin"
+    assert _expected_admin_slug("Projet {base_name} Admin", "Test") == "projet-test-admin"
+    assert _expected_admin_slug.cache_info().hits == 1
 
 
 @pytest.mark.asyncio
-async def test_is_channel_admin_false_not_member(mock_bot):
+async def test_is_channel_admin_reuses_channel_members(mock_bot, permissions_matrix):
     mock_bot.mattermost_api_client.get_channel_by_id.return_value = {
         "name": "projet-test-admin",
         "display_name": "Projet Test Admin",
     }
-    mock_bot.mattermost_api_client.get_users_in_channel.return_value = [{"id": "other_user_id"}]
-    mock_bot.config.PERMISSIONS_MATRIX = {
-        "projet": {"admin": {"mattermost_channel_name_pattern": "projet-{base_name}-admin"}}
-    }
+    mock_bot.mattermost_api_client.get_users_in_channel.return_value = [{"id": "user_id"}]
+    mock_bot.config.PERMISSIONS_MATRIX = permissions_matrix
     user_right_manager = UserRightManager(mock_bot)
-    assert await user_right_manager.is_channel_admin("user_id", "channel_id") is False
+
+    assert await user_right_manager.is_channel_admin("user_id", "channel_id") is True
+    assert await user_right_manager.is_channel_admin("other_user_id", "channel_id") is False
+    mock_bot.mattermost_api_client.get_users_in_channel.assert_called_once_with("channel_id")
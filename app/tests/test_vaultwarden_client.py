@@ -1,419 +1,501 @@
+import copy
 import json
+import logging
 import os
-import unittest
+import threading
+from types import SimpleNamespace
 from unittest.mock import MagicMock, call, patch
 
+import pytest
 import requests
 from clients.vaultwarden_client import VaultwardenClient
 
+ORGANIZATION_ID = "test-org-id"
+SERVER_URL = "https://test.vaultwarden.com"
+API_USERNAME = "test_api_user@example.com"
+API_PASSWORD = "test_api_password"
 
-class TestVaultwardenClient(unittest.TestCase):
-    def setUp(self):
-        self.organization_id = "test-org-id"
-        self.server_url = "https://test.vaultwarden.com"
-
-        self.env_patcher_bw_password = patch.dict(os.environ, {"BW_PASSWORD": "testpassword"})
-        self.env_patcher_bw_session = patch.dict(os.environ, {"BW_SESSION": ""})
-
-        self.mock_bw_password_env = self.env_patcher_bw_password.start()
-        self.mock_bw_session_env = self.env_patcher_bw_session.start()
-
-        self.api_username = "test_api_user@example.com"
-        self.api_password = "test_api_password"
-
-        self.client = VaultwardenClient(
-            organization_id=self.organization_id,
-            server_url=self.server_url,
-            api_username=self.api_username,
-            api_password=self.api_password,
-        )
-
-    def tearDown(self):
-        self.env_patcher_bw_password.stop()
-        self.env_patcher_bw_session.stop()
-        if "BW_SESSION" in os.environ:
-            del os.environ["BW_SESSION"]
-
-    def test_initialization_success(self):
-        client = VaultwardenClient(
-            organization_id=self.organization_id,
-            server_url=self.server_url,
-            api_username=self.api_username,
-            api_password=self.api_password,
-        )
-        self.assertEqual(client.organization_id, self.organization_id)
-        self.assertEqual(client.server_url, self.server_url)
-        self.assertEqual(client.bw_session, "")
-
-    def test_initialization_missing_org_id(self):
-        with self.assertRaises(ValueError) as context:
-            VaultwardenClient(organization_id="", server_url=self.server_url)
-        self.assertIn("Vaultwarden organization_id must be provided", str(context.exception))
-
-    @patch("clients.vaultwarden_client.VaultwardenClient._run_bw_command")
-    def test_ensure_server_configuration_already_set(self, mock_run_bw_command):
-        mock_run_bw_command.return_value = (0, self.server_url, "")
-        client = self.client
-        self.assertTrue(client._ensure_server_configuration())
-        mock_run_bw_command.assert_called_once_with(["config", "server"], custom_env=unittest.mock.ANY)
-        self.assertEqual(mock_run_bw_command.call_count, 1)
-
-    @patch("clients.vaultwarden_client.VaultwardenClient._run_bw_command")
-    def test_ensure_server_configuration_needs_set(self, mock_run_bw_command):
-        mock_run_bw_command.side_effect = [
-            (0, "https://otherserver.com", ""),
-            (0, "", ""),
-        ]
-        client = self.client
-        self.assertTrue(client._ensure_server_configuration())
-        expected_calls = [
-            call(["config", "server"], custom_env=unittest.mock.ANY),
-            call(["config", "server", self.server_url], custom_env=unittest.mock.ANY),
-        ]
-        mock_run_bw_command.assert_has_calls(expected_calls)
-        self.assertEqual(mock_run_bw_command.call_count, 2)
-
-    @patch("subprocess.run")
-    def test_ensure_server_configuration_handles_bw_not_found(self, mock_subprocess_run):
-        mock_subprocess_run.side_effect = FileNotFoundError("bw not found simulation")
-        client = self.client
-        with self.assertRaises(FileNotFoundError):
-            client._ensure_server_configuration()
-        mock_subprocess_run.assert_called_once()
-
-    @patch.object(VaultwardenClient, "_run_bw_command")
-    def test_get_cli_status_unlocked(self, mock_run_bw):
-        mock_run_bw.return_value = (0, json.dumps({"status": "unlocked"}), "")
-        status = self.client._get_cli_status()
-        self.assertEqual(status, "unlocked")
-        mock_run_bw.assert_called_once_with(["status", "--raw"], custom_env=unittest.mock.ANY)
-
-    # ... (other CLI status tests remain the same) ...
-    @patch.object(VaultwardenClient, "_run_bw_command")
-    def test_get_cli_status_locked(self, mock_run_bw):
-        mock_run_bw.return_value = (0, json.dumps({"status": "locked"}), "")
-        status = self.client._get_cli_status()
-        self.assertEqual(status, "locked")
-
-    @patch.object(VaultwardenClient, "_run_bw_command")
-    def test_get_cli_status_unauthenticated(self, mock_run_bw):
-        mock_run_bw.return_value = (0, json.dumps({"status": "unauthenticated"}), "")
-        status = self.client._get_cli_status()
-        self.assertEqual(status, "unauthenticated")
-
-    @patch.object(VaultwardenClient, "_run_bw_command")
-    def test_get_cli_status_error_rc(self, mock_run_bw):
-        mock_run_bw.return_value = (1, "", "Some CLI error")
-        status = self.client._get_cli_status()
-        self.assertEqual(status, "error")
-
-    @patch.object(VaultwardenClient, "_run_bw_command")
-    def test_get_cli_status_error_json(self, mock_run_bw):
-        mock_run_bw.return_value = (0, "Invalid JSON", "")
-        status = self.client._get_cli_status()
-        self.assertEqual(status, "error")
-
-    @patch.object(VaultwardenClient, "_get_cli_status")
-    @patch.object(VaultwardenClient, "_run_bw_command")
-    def test_get_session_status_unauthenticated(self, mock_run_bw, mock_get_cli_status):
-        mock_get_cli_status.return_value = "unauthenticated"
-        session = self.client._get_session()
-        self.assertIsNone(session)
-        mock_run_bw.assert_not_called()
-
-    @patch.object(VaultwardenClient, "_get_cli_status")
-    @patch.object(VaultwardenClient, "_run_bw_command")
-    def test_get_session_status_locked_unlock_success(self, mock_run_bw, mock_get_cli_status):
-        mock_get_cli_status.return_value = "locked"
-        expected_session_key = "new_session_key_from_unlock"
-        mock_run_bw.return_value = (0, f"{expected_session_key}\n", "")
-        session = self.client._get_session()
-        self.assertEqual(session, expected_session_key)
-
-    @patch.object(VaultwardenClient, "_get_cli_status")
-    @patch.object(VaultwardenClient, "_run_bw_command")
-    def test_get_session_status_locked_unlock_fail_no_password(self, mock_run_bw, mock_get_cli_status):
-        mock_get_cli_status.return_value = "locked"
-        with patch.dict(os.environ, {"BW_PASSWORD": ""}):
-            session = self.client._get_session()
-            self.assertIsNone(session)
-            mock_run_bw.assert_not_called()
-
-    @patch.object(VaultwardenClient, "_get_cli_status")
-    @patch.object(VaultwardenClient, "_run_bw_command")
-    def test_get_session_status_unlocked_existing_valid_session(self, mock_run_bw, mock_get_cli_status):
-        mock_get_cli_status.return_value = "unlocked"
-        self.client.bw_session = "valid_existing_session"
-        mock_run_bw.return_value = (0, "", "")
-        session = self.client._get_session()
-        self.assertEqual(session, "valid_existing_session")
-
-    @patch.object(VaultwardenClient, "_get_cli_status")
-    @patch.object(VaultwardenClient, "_run_bw_command")
-    def test_get_session_status_unlocked_existing_invalid_session_then_unlock(self, mock_run_bw, mock_get_cli_status):
-        mock_get_cli_status.return_value = "unlocked"
-        self.client.bw_session = "invalid_session"
-        expected_new_key = "freshly_unlocked_key"
-        mock_run_bw.side_effect = [
-            (1, "", "session invalid error"),
-            (0, f"{expected_new_key}\n", ""),
-        ]
-        session = self.client._get_session()
-        self.assertEqual(session, expected_new_key)
-
-    # ... (other _get_session, _sync_vault, create_collection, get_collection_by_name tests remain largely the same) ...
-    @patch.object(VaultwardenClient, "_run_bw_command")
-    def test_sync_vault_success_with_session(self, mock_run_bw):
-        self.client.bw_session = "fake_session_key"
-        mock_run_bw.return_value = (0, "Synced!", "")
-        self.assertTrue(self.client._sync_vault())
-
-    @patch.object(VaultwardenClient, "_run_bw_command")
-    def test_sync_vault_fail_no_session(self, mock_run_bw):
-        self.client.bw_session = None
-        self.assertFalse(self.client._sync_vault())
-
-    @patch.object(VaultwardenClient, "_run_bw_command")
-    def test_sync_vault_fail_cli_error_clears_session(self, mock_run_bw):
-        self.client.bw_session = "fake_session_key"
-        os.environ["BW_SESSION"] = "fake_session_key"
-        mock_run_bw.return_value = (1, "", "invalid session token")
-        self.assertFalse(self.client._sync_vault())
-        self.assertIsNone(self.client.bw_session)
-
-    @patch.object(VaultwardenClient, "_get_session")
-    @patch.object(VaultwardenClient, "_sync_vault")
-    @patch.object(VaultwardenClient, "_run_bw_command")
-    def test_create_collection_success(self, mock_run_bw, mock_sync_vault, mock_get_session):
-        mock_get_session.return_value = "fake_session_for_create"
-        mock_sync_vault.return_value = True
-        mock_run_bw.side_effect = [
-            (0, "encoded", ""),
-            (0, json.dumps({"id": "id"}), ""),
-        ]
-        self.assertIsNotNone(self.client.create_collection("New Coll"))
-
-    @patch.object(VaultwardenClient, "_get_session", return_value=None)
-    def test_create_collection_fail_no_session(self, mock_get_session):
-        self.assertIsNone(self.client.create_collection("No Session Collection"))
-
-    @patch.object(VaultwardenClient, "_get_session", return_value="fake_session")
-    @patch.object(VaultwardenClient, "_sync_vault", return_value=False)
-    @patch.object(VaultwardenClient, "_run_bw_command")
-    def test_create_collection_sync_fail_still_attempts(self, mock_run_bw, mock_sync_vault, mock_get_session):
-        mock_run_bw.side_effect = [
-            (0, "encoded", ""),
-            (0, json.dumps({"id": "id"}), ""),
-        ]
-        self.assertIsNotNone(self.client.create_collection("Sync Fail"))
-
-    @patch.object(VaultwardenClient, "_get_session", return_value="fake_session")
-    @patch.object(VaultwardenClient, "_sync_vault", return_value=True)
-    @patch.object(VaultwardenClient, "_run_bw_command")
-    def test_create_collection_already_exists_finds_it(self, mock_run_bw, mock_sync, mock_get_session):
-        mock_run_bw.side_effect = [
-            (0, "encoded_payload", ""),
-            (1, "", "already exists"),
-            (
-                0,
-                json.dumps(
-                    [
-                        {
-                            "id": "existing-uuid",
-                            "name": "Existing",
-                            "organizationId": self.organization_id,
-                        }
-                    ]
-                ),
-                "",
-            ),
-        ]
-        self.assertEqual(self.client.create_collection("Existing"), "existing-uuid")
-
-    @patch.object(VaultwardenClient, "_get_session", return_value="fake_session")
-    @patch.object(VaultwardenClient, "_sync_vault", return_value=True)
-    @patch.object(VaultwardenClient, "_run_bw_command")
-    def test_get_collection_by_name_found(self, mock_run_bw, mock_sync_vault, mock_get_session):
-        mock_run_bw.return_value = (
-            0,
-            json.dumps(
-                [
-                    {
-                        "name": "Target",
-                        "id": "target-uuid",
-                        "organizationId": self.organization_id,
-                    }
-                ]
-            ),
-            "",
-        )
-        self.assertEqual(self.client.get_collection_by_name("Target"), "target-uuid")
-
-    @patch.object(VaultwardenClient, "_get_session", return_value="fake_session")
-    @patch.object(VaultwardenClient, "_run_bw_command")
-    def test_get_collection_by_name_not_found(self, mock_run_bw, mock_get_session):
-        with patch.object(self.client, "_sync_vault", return_value=True):
-            mock_run_bw.return_value = (0, json.dumps([]), "")
-            self.assertIsNone(self.client.get_collection_by_name("NonExistent"))
-
-    # --- Tests for new API methods ---
-    @patch("requests.post")
-    def test_get_api_token_caching_and_expiry(self, mock_post):
-        from datetime import datetime, timedelta
-
-        # First call, should fetch token
-        expected_token = "sample_access_token_1"
-        mock_response = MagicMock()
-        mock_response.json.return_value = {"access_token": expected_token, "expires_in": 3600}
-        mock_response.raise_for_status = MagicMock()
-        mock_post.return_value = mock_response
-
-        token = self.client._get_api_token()
-        self.assertEqual(token, expected_token)
-        mock_post.assert_called_once()
-        self.assertIsNotNone(self.client.api_token)
-        self.assertIsNotNone(self.client.api_token_expires_at)
-
-        # Second call, should use cache
-        token2 = self.client._get_api_token()
-        self.assertEqual(token2, expected_token)
-        mock_post.assert_called_once()  # Should not be called again
-
-        # Force expire the token
-        self.client.api_token_expires_at = datetime.now() - timedelta(seconds=1)
-
-        # Third call, should fetch a new token
-        expected_token_2 = "sample_access_token_2"
-        mock_response.json.return_value = {"access_token": expected_token_2, "expires_in": 3600}
-        token3 = self.client._get_api_token()
-        self.assertEqual(token3, expected_token_2)
-        self.assertEqual(mock_post.call_count, 2)
-
-    @patch("requests.post")
-    def test_get_api_token_http_error(self, mock_post):
-        mock_http_error = requests.exceptions.HTTPError("API error")
-        mock_error_response = MagicMock()
-        mock_error_response.text = "Detailed API error"
-        mock_http_error.response = mock_error_response
-        mock_response_obj = MagicMock()
-        mock_response_obj.raise_for_status.side_effect = mock_http_error
-        mock_post.return_value = mock_response_obj
-        self.assertIsNone(self.client._get_api_token())
-
-    @patch("requests.post")
-    def test_get_api_token_request_exception(self, mock_post):
-        mock_post.side_effect = requests.exceptions.RequestException("Network error")
-        self.assertIsNone(self.client._get_api_token())
-
-    def test_get_api_token_no_credentials(self):
-        client_no_creds = VaultwardenClient(organization_id=self.organization_id, server_url=self.server_url)
-        self.assertIsNone(client_no_creds._get_api_token())
-
-    def test_get_api_token_no_server_url(self):
-        client_no_url = VaultwardenClient(organization_id=self.organization_id, api_username="u", api_password="p")
-        self.assertIsNone(client_no_url._get_api_token())
-
-    @patch("clients.vaultwarden_client.VaultwardenClient._request_with_token_refresh")
-    def test_invite_user_to_collection_success(self, mock_request):
-        mock_request.return_value = MagicMock(status_code=200)
-        self.assertTrue(self.client.invite_user_to_collection("u@e.com", "cid", self.organization_id))
-
-    @patch("clients.vaultwarden_client.VaultwardenClient._request_with_token_refresh")
-    def test_invite_user_to_collection_http_error(self, mock_request):
-        mock_http_error = requests.exceptions.HTTPError("Invite error")
-        mock_error_response = MagicMock()
-        mock_error_response.text = "Detailed invite error"
-        mock_error_response.status_code = 400
-        mock_http_error.response = mock_error_response
-        mock_request.side_effect = mock_http_error
-        self.assertFalse(self.client.invite_user_to_collection("u@e.com", "cid", self.organization_id))
-
-    def test_invite_user_to_collection_no_server_url(self):
-        client_no_url = VaultwardenClient(organization_id=self.organization_id, api_username="u", api_password="p")
-        self.assertFalse(client_no_url.invite_user_to_collection("u@e.com", "cid", "oid"))
-
-    @patch("clients.vaultwarden_client.VaultwardenClient._request_with_token_refresh")
-    def test_invite_user_to_collection_already_member_is_success(self, mock_request):
-        user_email = "already_member@example.com"
-        collection_id = "coll_already_in"
-
-        mock_http_error_model = requests.exceptions.HTTPError("Simulated 400 Error")
-        mock_error_response_model = MagicMock()
-        mock_error_response_model.status_code = 400
-        mock_error_response_model.json.return_value = {
-            "errorModel": {"message": f"{user_email} is already a member of this collection."}
-        }
-        mock_http_error_model.response = mock_error_response_model
-        mock_request.side_effect = mock_http_error_model
-
-        with self.assertLogs(level="WARNING") as log:
-            success = self.client.invite_user_to_collection(user_email, collection_id, self.organization_id)
-            self.assertTrue(success, "Should return True if user already a member (errorModel case)")
-            self.assertTrue(any("already a member" in record.getMessage() for record in log.records))
-
-    @patch("requests.request")
-    @patch("clients.vaultwarden_client.VaultwardenClient._get_api_token")
-    def test_request_with_token_refresh_handles_401(self, mock_get_token, mock_request):
-        # First call fails with 401, second call succeeds
-        mock_get_token.side_effect = ["token1", "token2"]
-        mock_response_401 = MagicMock()
-        mock_response_401.raise_for_status.side_effect = requests.exceptions.HTTPError(
-            response=MagicMock(status_code=401)
-        )
-        mock_response_200 = MagicMock(status_code=200)
-        mock_request.side_effect = [mock_response_401, mock_response_200]
-
-        response = self.client._request_with_token_refresh("get", "http://test.com/api")
-        self.assertEqual(response, mock_response_200)
-        self.assertEqual(mock_get_token.call_count, 2)
-        self.assertEqual(mock_request.call_count, 2)
-        self.assertIsNone(self.client.api_token)  # Token should be invalidated
-        self.assertIsNone(self.client.api_token_expires_at)
-
-    @patch("clients.vaultwarden_client.VaultwardenClient._request_with_token_refresh")
-    def test_get_collections_details_success(self, mock_request):
-        mock_response = MagicMock()
-        mock_response.json.return_value = {"data": [{"id": "1", "name": "test"}]}
-        mock_request.return_value = mock_response
-        result = self.client.get_collections_details()
-        self.assertEqual(result, [{"id": "1", "name": "test"}])
-
-    @patch("clients.vaultwarden_client.VaultwardenClient._request_with_token_refresh")
-    def test_update_collection_success(self, mock_request):
-        mock_request.return_value = MagicMock(status_code=200)
-        result = self.client.update_collection("1", {"name": "test"})
-        self.assertTrue(result)
-
-    @patch("clients.vaultwarden_client.VaultwardenClient._request_with_token_refresh")
-    def test_list_users_success(self, mock_request):
-        mock_response = MagicMock()
-        mock_response.json.return_value = {"data": [{"id": "1", "name": "test"}]}
-        mock_request.return_value = mock_response
-        result = self.client.list_users()
-        self.assertEqual(result, [{"id": "1", "name": "test"}])
-
-    @patch("clients.vaultwarden_client.VaultwardenClient._get_api_token", return_value=None)
-    def test_list_users_no_token(self, mock_get_token):
-        result = self.client.list_users()
-        self.assertIsNone(result)
-
-    @patch("clients.vaultwarden_client.VaultwardenClient._request_with_token_refresh")
-    def test_delete_user_success(self, mock_request):
-        mock_request.return_value = MagicMock(status_code=200)
-        result = self.client.delete_user("1")
-        self.assertTrue(result)
-
-    @patch("clients.vaultwarden_client.VaultwardenClient._get_api_token", return_value=None)
-    def test_delete_user_no_token(self, mock_get_token):
-        result = self.client.delete_user("1")
-        self.assertFalse(result)
-
-    @patch("clients.vaultwarden_client.VaultwardenClient._request_with_token_refresh")
-    def test_delete_user_http_error(self, mock_request):
-        mock_request.side_effect = requests.exceptions.RequestException("API error")
-        result = self.client.delete_user("1")
-        self.assertFalse(result)
-
-
-if __name__ == "__main__":
-    unittest.main()
+# Serialized bw CLI outputs, built once at import time.
+_CREATED_COLLECTION_JSON = json.dumps({"id": "id"})
+_EXISTING_COLLECTIONS_JSON = json.dumps(
+    [{"id": "existing-uuid", "name": "Existing", "organizationId": ORGANIZATION_ID}]
+)
+_TARGET_COLLECTIONS_JSON = json.dumps([{"name": "Target", "id": "target-uuid", "organizationId": ORGANIZATION_ID}])
+_NO_COLLECTIONS_JSON = json.dumps([])
+
+_ALREADY_MEMBER_BODY = {
+    "errorModel": {"message": "already_member@example.com is already a member of this collection."}
+}
+
+
+def _http_error(status_code: int, body: dict) -> requests.exceptions.HTTPError:
+    """An HTTPError as raised by _request_with_token_refresh, carrying a response with the given JSON body."""
+    response = MagicMock(status_code=status_code, text=json.dumps(body))
+    response.json.return_value = body
+    error = requests.exceptions.HTTPError(f"Simulated {status_code} Error")
+    error.response = response
+    return error
+
+
+def _response(
+    status_code: int = 200, json_body: dict | None = None, error: Exception | None = None
+) -> SimpleNamespace:
+    """
+    A plain stand-in for a requests.Response, much lighter than a MagicMock.
+    raise_for_status() raises error when one is given.
+    """
+
+    def raise_for_status():
+        if error is not None:
+            raise error
+
+    return SimpleNamespace(status_code=status_code, json=lambda: json_body, raise_for_status=raise_for_status)
+
+
+def _cli_env() -> dict:
+    """The environment the client passes to its config and status commands: the process's, minus BW_SESSION."""
+    env = dict(os.environ)
+    env.pop("BW_SESSION")
+    return env
+
+
+@pytest.fixture(autouse=True)
+def _bw_env(monkeypatch):
+    # monkeypatch only tracks these two keys and restores them after the test, even if the client rewrote them
+    monkeypatch.setenv("BW_PASSWORD", "testpassword")
+    monkeypatch.setenv("BW_SESSION", "")
+
+
+@pytest.fixture(scope="session")
+def _template_client():
+    return VaultwardenClient(
+        organization_id=ORGANIZATION_ID,
+        server_url=SERVER_URL,
+        api_username=API_USERNAME,
+        api_password=API_PASSWORD,
+    )
+
+
+@pytest.fixture
+def client(_template_client):
+    """A shallow copy of the session's VaultwardenClient: tests may mutate its session and token state."""
+    client = copy.copy(_template_client)
+    client.bw_session = ""
+    return client
+
+
+# The private helpers are mocked on the test's own copy of the client rather than patched on the class:
+# an instance attribute needs no restoring, since the copy is dropped once the test is over.
+@pytest.fixture
+def mock_run_bw(client):
+    client._run_bw_command = MagicMock()
+    return client._run_bw_command
+
+
+@pytest.fixture
+def mock_get_cli_status(client):
+    client._get_cli_status = MagicMock()
+    return client._get_cli_status
+
+
+@pytest.fixture
+def mock_get_session(client):
+    client._get_session = MagicMock()
+    return client._get_session
+
+
+@pytest.fixture
+def mock_sync_vault(client):
+    client._sync_vault = MagicMock()
+    return client._sync_vault
+
+
+@pytest.fixture
+def mock_get_api_token(client):
+    client._get_api_token = MagicMock()
+    return client._get_api_token
+
+
+@pytest.fixture
+def mock_request(client):
+    client._request_with_token_refresh = MagicMock()
+    return client._request_with_token_refresh
+
+
+def test_initialization_success():
+    client = VaultwardenClient(
+        organization_id=ORGANIZATION_ID,
+        server_url=SERVER_URL,
+        api_username=API_USERNAME,
+        api_password=API_PASSWORD,
+    )
+    assert client.organization_id == ORGANIZATION_ID
+    assert client.server_url == SERVER_URL
+    assert client.api_username == API_USERNAME
+    assert client.api_password == API_PASSWORD
+    assert client.bw_session == ""  # Read from the BW_SESSION variable set by _bw_env
+    assert client.api_token is None
+
+
+def test_initialization_missing_org_id():
+    with pytest.raises(ValueError, match="Vaultwarden organization_id must be provided"):
+        VaultwardenClient(organization_id="", server_url=SERVER_URL)
+
+
+def test_ensure_server_configuration_already_set(client, mock_run_bw):
+    mock_run_bw.return_value = (0, SERVER_URL, "")
+    assert client._ensure_server_configuration()
+    mock_run_bw.assert_called_once_with(["config", "server"], custom_env=_cli_env())
+    assert mock_run_bw.call_count == 1
+
+
+def test_ensure_server_configuration_needs_set(client, mock_run_bw):
+    mock_run_bw.side_effect = [
+        (0, "https://otherserver.com", ""),
+        (0, "", ""),
+    ]
+    assert client._ensure_server_configuration()
+    expected_calls = [
+        call(["config", "server"], custom_env=_cli_env()),
+        call(["config", "server", SERVER_URL], custom_env=_cli_env()),
+    ]
+    mock_run_bw.assert_has_calls(expected_calls)
+    assert mock_run_bw.call_count == 2
+
+
+@patch("clients.vaultwarden_client.subprocess.run")
+def test_ensure_server_configuration_handles_bw_not_found(mock_subprocess_run, client):
+    mock_subprocess_run.side_effect = FileNotFoundError("bw not found simulation")
+    with pytest.raises(FileNotFoundError):
+        client._ensure_server_configuration()
+    mock_subprocess_run.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "rc, stdout, expected",
+    [
+        (0, json.dumps({"status": "unlocked"}), "unlocked"),
+        (0, json.dumps({"status": "locked"}), "locked"),
+        (0, json.dumps({"status": "unauthenticated"}), "unauthenticated"),
+        (1, "", "error"),
+        (0, "Invalid JSON", "error"),
+    ],
+    ids=["unlocked", "locked", "unauthenticated", "error_rc", "error_json"],
+)
+def test_get_cli_status(client, mock_run_bw, rc, stdout, expected):
+    mock_run_bw.return_value = (rc, stdout, "Some CLI error" if rc else "")
+    assert client._get_cli_status() == expected
+    mock_run_bw.assert_called_once_with(["status", "--raw"], custom_env=_cli_env())
+
+
+def test_get_session_status_unauthenticated(client, mock_run_bw, mock_get_cli_status):
+    mock_get_cli_status.return_value = "unauthenticated"
+    session = client._get_session()
+    assert session is None
+    mock_run_bw.assert_not_called()
+
+
+def test_get_session_status_locked_unlock_success(client, mock_run_bw, mock_get_cli_status):
+    mock_get_cli_status.return_value = "locked"
+    expected_session_key = "new_session_key_from_unlock"
+    mock_run_bw.return_value = (0, f"{expected_session_key}\n", "")
+    session = client._get_session()
+    assert session == expected_session_key
+
+
+def test_get_session_status_locked_unlock_fail_no_password(client, mock_run_bw, mock_get_cli_status, monkeypatch):
+    mock_get_cli_status.return_value = "locked"
+    monkeypatch.setenv("BW_PASSWORD", "")
+    session = client._get_session()
+    assert session is None
+    mock_run_bw.assert_not_called()
+
+
+def test_get_session_status_unlocked_existing_valid_session(client, mock_run_bw, mock_get_cli_status):
+    mock_get_cli_status.return_value = "unlocked"
+    client.bw_session = "valid_existing_session"
+    mock_run_bw.return_value = (0, "", "")
+    session = client._get_session()
+    assert session == "valid_existing_session"
+
+
+def test_get_session_status_unlocked_existing_invalid_session_then_unlock(client, mock_run_bw, mock_get_cli_status):
+    mock_get_cli_status.return_value = "unlocked"
+    client.bw_session = "invalid_session"
+    expected_new_key = "freshly_unlocked_key"
+    mock_run_bw.side_effect = [
+        (1, "", "session invalid error"),
+        (0, f"{expected_new_key}\n", ""),
+    ]
+    session = client._get_session()
+    assert session == expected_new_key
+
+
+# ... (other _get_session, _sync_vault, create_collection, get_collection_by_name tests remain largely the same) ...
+def test_sync_vault_success_with_session(client, mock_run_bw):
+    client.bw_session = "fake_session_key"
+    mock_run_bw.return_value = (0, "Synced!", "")
+    assert client._sync_vault()
+
+
+def test_sync_vault_fail_no_session(client, mock_run_bw):
+    client.bw_session = None
+    assert not client._sync_vault()
+
+
+def test_sync_vault_fail_cli_error_clears_session(client, mock_run_bw, monkeypatch):
+    client.bw_session = "fake_session_key"
+    monkeypatch.setenv("BW_SESSION", "fake_session_key")
+    mock_run_bw.return_value = (1, "", "invalid session token")
+    assert not client._sync_vault()
+    assert client.bw_session is None
+
+
+def test_create_collection_success(client, mock_run_bw, mock_get_session):
+    mock_get_session.return_value = "fake_session_for_create"
+    client.bw_session = "fake_session_for_create"
+    # The real _sync_vault runs first and goes through the mocked CLI as well
+    mock_run_bw.side_effect = [
+        (0, "Synced!", ""),
+        (0, "encoded", ""),
+        (0, _CREATED_COLLECTION_JSON, ""),
+    ]
+    assert client.create_collection("New Coll") == "id"
+    assert mock_run_bw.call_args_list[0] == call(["sync"])
+
+
+def test_create_collection_fail_no_session(client, mock_get_session):
+    mock_get_session.return_value = None
+    assert client.create_collection("No Session Collection") is None
+
+
+def test_create_collection_sync_fail_still_attempts(client, mock_run_bw, mock_get_session):
+    mock_get_session.return_value = "fake_session"
+    client.bw_session = "fake_session"
+    mock_run_bw.side_effect = [
+        (1, "", "Sync failed"),
+        (0, "encoded", ""),
+        (0, _CREATED_COLLECTION_JSON, ""),
+    ]
+    assert client.create_collection("Sync Fail") == "id"
+    assert mock_run_bw.call_count == 3
+
+
+def test_create_collection_already_exists_finds_it(client, mock_run_bw, mock_sync_vault, mock_get_session):
+    mock_sync_vault.return_value = True
+    mock_get_session.return_value = "fake_session"
+    mock_run_bw.side_effect = [
+        (0, "encoded_payload", ""),
+        (1, "", "already exists"),
+        (0, _EXISTING_COLLECTIONS_JSON, ""),
+    ]
+    assert client.create_collection("Existing") == "existing-uuid"
+
+
+def test_get_collection_by_name_found(client, mock_run_bw, mock_sync_vault, mock_get_session):
+    mock_sync_vault.return_value = True
+    mock_get_session.return_value = "fake_session"
+    mock_run_bw.return_value = (0, _TARGET_COLLECTIONS_JSON, "")
+    assert client.get_collection_by_name("Target") == "target-uuid"
+
+
+def test_get_collection_by_name_not_found(client, mock_run_bw, mock_sync_vault, mock_get_session):
+    mock_get_session.return_value = "fake_session"
+    mock_sync_vault.return_value = True
+    mock_run_bw.return_value = (0, _NO_COLLECTIONS_JSON, "")
+    assert client.get_collection_by_name("NonExistent") is None
+
+
+# --- Tests for new API methods ---
+@patch("clients.vaultwarden_client.requests.Session.post")
+def test_get_api_token_caching_and_expiry(mock_post, client):
+    from datetime import datetime, timedelta
+
+    # First call, should fetch token
+    expected_token = "sample_access_token_1"
+    mock_post.return_value = _response(json_body={"access_token": expected_token, "expires_in": 3600})
+
+    token = client._get_api_token()
+    assert token == expected_token
+    mock_post.assert_called_once()
+    assert client.api_token is not None
+    assert client.api_token_expires_at is not None
+
+    # Second call, should use cache
+    token2 = client._get_api_token()
+    assert token2 == expected_token
+    mock_post.assert_called_once()  # Should not be called again
+
+    # Force expire the token
+    client.api_token_expires_at = datetime.now() - timedelta(seconds=1)
+
+    # Third call, should fetch a new token
+    expected_token_2 = "sample_access_token_2"
+    mock_post.return_value = _response(json_body={"access_token": expected_token_2, "expires_in": 3600})
+    token3 = client._get_api_token()
+    assert token3 == expected_token_2
+    assert mock_post.call_count == 2
+
+
+@patch("clients.vaultwarden_client.requests.Session.post")
+def test_get_api_token_http_error(mock_post, client):
+    mock_post.return_value = _response(400, error=_http_error(400, {"error": "Detailed API error"}))
+    assert client._get_api_token() is None
+
+
+@patch("clients.vaultwarden_client.requests.Session.post")
+def test_get_api_token_request_exception(mock_post, client):
+    mock_post.side_effect = requests.exceptions.RequestException("Network error")
+    assert client._get_api_token() is None
+
+
+def test_get_api_token_no_credentials(client):
+    client.api_username = None
+    client.api_password = None
+    assert client._get_api_token() is None
+
+
+def test_get_api_token_no_server_url(client):
+    client.server_url = None
+    assert client._get_api_token() is None
+
+
+def test_invite_user_to_collection_success(client, mock_request):
+    mock_request.return_value = _response()
+    assert client.invite_user_to_collection("u@e.com", "cid", ORGANIZATION_ID)
+
+
+def test_invite_user_to_collection_http_error(client, mock_request):
+    mock_request.side_effect = _http_error(400, {"message": "Detailed invite error"})
+    assert not client.invite_user_to_collection("u@e.com", "cid", ORGANIZATION_ID)
+
+
+def test_invite_user_to_collection_no_server_url(client):
+    client.server_url = None
+    assert not client.invite_user_to_collection("u@e.com", "cid", "oid")
+
+
+# The 400 errors are built once, when the module is collected; each case only raises and reads its own.
+@pytest.mark.parametrize(
+    "error, expected_success",
+    [
+        (_http_error(400, _ALREADY_MEMBER_BODY), True),
+        (_http_error(400, {"ValidationErrors": {"Emails": ["User already invited."]}}), True),
+        (_http_error(400, {"errorModel": {"message": "Collection not found."}}), False),
+    ],
+    ids=["error_model", "validation_errors", "other_bad_request"],
+)
+def test_invite_user_to_collection_already_member_is_success(client, mock_request, caplog, error, expected_success):
+    mock_request.side_effect = error
+
+    caplog.set_level(logging.WARNING)
+    success = client.invite_user_to_collection("already_member@example.com", "coll_already_in", ORGANIZATION_ID)
+    assert success is expected_success
+    assert any("already a member" in record.getMessage() for record in caplog.records) is expected_success
+
+
+def test_invite_users_to_collection_batch(client, mock_get_api_token):
+    emails = ["a@e.com", "fail@e.com", "b@e.com"]
+    # Every invitation waits for the other two: the batch only completes if they are in flight together.
+    barrier = threading.Barrier(len(emails), timeout=5)
+
+    def invite(user_email, collection_id, organization_id):
+        barrier.wait()
+        return user_email != "fail@e.com"
+
+    client.invite_user_to_collection = MagicMock(side_effect=invite)
+    result = client.invite_users_to_collection(emails, "cid", ORGANIZATION_ID)
+    assert result == {"a@e.com": True, "fail@e.com": False, "b@e.com": True}
+    mock_get_api_token.assert_called_once()
+    for email in emails:
+        client.invite_user_to_collection.assert_any_call(email, "cid", ORGANIZATION_ID)
+
+
+def test_invite_users_to_collection_empty(client, mock_get_api_token):
+    client.invite_user_to_collection = MagicMock()
+    assert client.invite_users_to_collection([], "cid", ORGANIZATION_ID) == {}
+    client.invite_user_to_collection.assert_not_called()
+    mock_get_api_token.assert_not_called()
+
+
+@patch("clients.vaultwarden_client.requests.Session.request")
+def test_request_with_token_refresh_handles_401(mock_http_request, client, mock_get_api_token):
+    # First call fails with 401, second call succeeds
+    mock_get_api_token.side_effect = ["token1", "token2"]
+    mock_response_401 = _response(401, error=_http_error(401, {}))
+    mock_response_200 = _response()
+    mock_http_request.side_effect = [mock_response_401, mock_response_200]
+
+    response = client._request_with_token_refresh("get", "http://test.com/api")
+    assert response == mock_response_200
+    assert mock_get_api_token.call_count == 2
+    assert mock_http_request.call_count == 2
+    assert client.api_token is None  # Token should be invalidated
+    assert client.api_token_expires_at is None
+
+
+@patch("clients.vaultwarden_client.requests.Session.post")
+@patch("clients.vaultwarden_client.requests.Session.request")
+def test_concurrent_401s_refresh_token_once(mock_http_request, mock_post, client):
+    from datetime import datetime, timedelta
+
+    client.api_token = "revoked_token"
+    client.api_token_expires_at = datetime.now() + timedelta(hours=1)
+    mock_post.return_value = _response(json_body={"access_token": "new_token", "expires_in": 3600})
+    workers = 4
+    # Every request is rejected with the revoked token before any of them refreshes it.
+    barrier = threading.Barrier(workers, timeout=5)
+
+    def request(method, url, headers=None, **kwargs):
+        if headers["Authorization"] == "Bearer revoked_token":
+            barrier.wait()
+            return _response(401, error=_http_error(401, {}))
+        return _response()
+
+    mock_http_request.side_effect = request
+    threads = [
+        threading.Thread(target=client._request_with_token_refresh, args=("get", "http://test.com/api"))
+        for _ in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    mock_post.assert_called_once()
+    assert client.api_token == "new_token"
+    assert mock_http_request.call_count == 2 * workers
+
+
+@pytest.mark.parametrize(
+    "method, args, verb, body, expected",
+    [
+        ("get_collections_details", (), "get", {"data": [{"id": "1", "name": "test"}]}, [{"id": "1", "name": "test"}]),
+        ("update_collection", ("1", {"name": "test"}), "put", None, True),
+        ("list_users", (), "get", {"data": [{"id": "1", "name": "test"}]}, [{"id": "1", "name": "test"}]),
+        ("delete_user", ("1",), "delete", None, True),
+    ],
+    ids=["get_collections_details", "update_collection", "list_users", "delete_user"],
+)
+def test_api_method_success(client, mock_request, method, args, verb, body, expected):
+    mock_request.return_value = _response(json_body=body)
+    assert getattr(client, method)(*args) == expected
+    assert mock_request.call_args.args[0] == verb
+
+
+def test_list_users_no_token(client, mock_get_api_token):
+    mock_get_api_token.return_value = None
+    result = client.list_users()
+    assert result is None
+
+
+def test_delete_user_no_token(client, mock_get_api_token):
+    mock_get_api_token.return_value = None
+    result = client.delete_user("1")
+    assert not result
+
+
+def test_delete_user_http_error(client, mock_request):
+    mock_request.side_effect = requests.exceptions.RequestException("API error")
+    result = client.delete_user("1")
+    assert not result
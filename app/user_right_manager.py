@@ -1,37 +1,86 @@
 import asyncio
+import functools
 import logging
+from datetime import datetime, timedelta
 from typing import TYPE_CHECKING
 
+from libraries.services.mattermost import _map_mm_channel_to_entity_and_base_name, slugify
+
 if TYPE_CHECKING:
     from app.bot import MartyBot
 
+# Channel member IDs are reused for a few seconds, so a burst of admin-gated commands shares one fetch.
+CHANNEL_MEMBERS_CACHE_TTL_SECONDS = 5
+CHANNEL_MEMBERS_CACHE_MAX_ENTRIES = 1024
+# System admin status changes rarely, while admins tend to send several gated commands in a row.
+ADMIN_CACHE_TTL_SECONDS = 30
+ADMIN_CACHE_MAX_ENTRIES = 1024
+
+
+@functools.lru_cache(maxsize=4096)
+def _expected_admin_slug(admin_pattern: str, base_name: str) -> str:
+    """
+    Slug of the admin channel that admin_pattern gives for base_name.
+    Pure string formatting and slugifying, memoized so repeated permission checks on a channel are a lookup.
+    """
+    return slugify(admin_pattern.format(base_name=base_name))
+
 
 class UserRightManager:
     def __init__(self, bot: "MartyBot"):
         self.bot = bot
+        # channel_id -> (expires_at, IDs of the channel's members)
+        self._channel_members_cache: dict[str, tuple[datetime, frozenset[str]]] = {}
+        # user_id -> (expires_at, whether the user is a system admin)
+        self._admin_cache: dict[str, tuple[datetime, bool]] = {}
 
     async def is_admin(self, user_id: str) -> bool:
-        if not self.bot.mattermost_api_client or not user_id:
-            logging.error("Mattermost API client or user_id not available for permission check.")
+        # The Mattermost client is checked once in MartyBot.start(); only the user varies per call.
+        if not user_id:
+            logging.error("user_id not available for permission check.")
             return False
+        entry = self._admin_cache.get(user_id)
+        if entry is not None and datetime.now() < entry[0]:
+            return entry[1]
+
         user_roles = await asyncio.to_thread(self.bot.mattermost_api_client.get_user_roles, user_id)
-        return "system_admin" in user_roles
+        is_admin = "system_admin" in user_roles
+        # get_user_roles returns [] on errors, which is not worth remembering.
+        if user_roles:
+            if len(self._admin_cache) >= ADMIN_CACHE_MAX_ENTRIES:
+                self._admin_cache.clear()
+            expires_at = datetime.now() + timedelta(seconds=ADMIN_CACHE_TTL_SECONDS)
+            self._admin_cache[user_id] = (expires_at, is_admin)
+        return is_admin
+
+    async def _get_channel_member_ids(self, channel_id: str) -> frozenset[str]:
+        """Returns the IDs of the channel's members, fetched at most once per CHANNEL_MEMBERS_CACHE_TTL_SECONDS."""
+        entry = self._channel_members_cache.get(channel_id)
+        if entry is not None and datetime.now() < entry[0]:
+            return entry[1]
+
+        channel_members = await asyncio.to_thread(self.bot.mattermost_api_client.get_users_in_channel, channel_id)
+        member_ids = frozenset(member["id"] for member in channel_members if "id" in member)
+        # get_users_in_channel returns [] on errors, which is not worth remembering.
+        if member_ids:
+            if len(self._channel_members_cache) >= CHANNEL_MEMBERS_CACHE_MAX_ENTRIES:
+                self._channel_members_cache.clear()
+            expires_at = datetime.now() + timedelta(seconds=CHANNEL_MEMBERS_CACHE_TTL_SECONDS)
+            self._channel_members_cache[channel_id] = (expires_at, member_ids)
+        return member_ids
 
     async def is_channel_admin(self, user_id: str, channel_id: str) -> bool:
-        current_channel_info = await asyncio.to_thread(self.bot.mattermost_api_client.get_channel_by_id, channel_id)
+        # Both lookups are independent Mattermost calls: run them side by side rather than one after the other.
+        current_channel_info, member_ids = await asyncio.gather(
+            asyncio.to_thread(self.bot.mattermost_api_client.get_channel_by_id, channel_id),
+            self._get_channel_member_ids(channel_id),
+        )
         if not current_channel_info:
             return False
-
-        channel_members = await asyncio.to_thread(self.bot.mattermost_api_client.get_users_in_channel, channel_id)
-        if not any(member.get("id") == user_id for member in channel_members):
+        if user_id not in member_ids:
             return False
 
         admin_channel_name_slug = current_channel_info.get("name")
-        from libraries.group_sync_services import (
-            _map_mm_channel_to_entity_and_base_name,
-            slugify,
-        )
-
         for e_key, e_conf in self.bot.config.PERMISSIONS_MATRIX.items():
             admin_cfg = e_conf.get("admin")
             if admin_cfg:
@@ -43,7 +92,7 @@ class UserRightManager:
                         {e_key: e_conf},
                     )
                     if temp_entity_key == e_key and temp_base_name:
-                        expected_admin_channel_slug = slugify(admin_pattern.format(base_name=temp_base_name))
+                        expected_admin_channel_slug = _expected_admin_slug(admin_pattern, temp_base_name)
                         if admin_channel_name_slug == expected_admin_channel_slug:
                             return True
         return False
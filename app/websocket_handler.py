@@ -2,8 +2,11 @@ import asyncio
 import json
 import logging
 
+import orjson
 import websockets
 
+logger = logging.getLogger(__name__)
+
 
 class WebsocketHandler:
     def __init__(self, bot):
@@ -13,105 +16,152 @@ class WebsocketHandler:
         self.MAX_RECONNECT_ATTEMPTS = 5
         self.INITIAL_RECONNECT_DELAY = 5
         self.MAX_RECONNECT_DELAY = 60
+        # Built once so reconnect attempts reuse it; run() refuses to start when the URL is not configured.
+        self.websocket_url = None
+        if bot.config.MATTERMOST_URL:
+            self.websocket_url = f"{bot.config.MATTERMOST_URL.replace('http', 'ws', 1).rstrip('/')}/api/v4/websocket"
+        # Serialized authentication challenge, built on the first connection and resent on reconnects.
+        self._auth_payload = None
+        # Whether self.websocket is the live connection of run(), and the loop run() listens on: stop() may be
+        # called from another thread, where it must hand the close over to that loop.
+        self._ws_alive = False
+        self._loop = None
+        # Event type -> coroutine taking the decoded event; anything else is only logged at debug level.
+        self._handlers = {
+            "posted": self._handle_posted,
+            "hello": self._log_hello,
+        }
+
+    async def _handle_posted(self, data):
+        logger.debug("WebSocket << 'posted' event 'data' field raw content: %s", data.get("data"))
+        await self.bot._handle_message_event(data)
+
+    async def _log_hello(self, data):
+        logger.info("WebSocket << Received 'hello' event: %s", data)
 
     async def on_message(self, ws, message_str):
-        logging.debug(f"WebSocket << Raw incoming message: {message_str}")
+        logger.debug("WebSocket << Raw incoming message: %s", message_str)
         try:
-            data = json.loads(message_str)
-            logging.debug(
-                f"WebSocket << Event received: Type='{data.get('event')}', Seq='{data.get('seq')}', DataKeys='{list(data.get('data', {}).keys()) if data.get('data') else None}'"
-            )
+            data = orjson.loads(message_str)
+            # Every event goes through here: only build the key list when debug records are actually emitted.
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "WebSocket << Event received: Type='%s', Seq='%s', DataKeys='%s'",
+                    data.get("event"),
+                    data.get("seq"),
+                    list(data["data"]) if data.get("data") else None,
+                )
             event_type = data.get("event")
 
-            if event_type == "posted":
-                logging.debug(f"WebSocket << 'posted' event 'data' field raw content: {data.get('data')}")
-                await self.bot._handle_message_event(data)
-            elif event_type == "hello":
-                logging.info(f"WebSocket << Received 'hello' event: {data}")
+            handler = self._handlers.get(event_type)
+            if handler is not None:
+                await handler(data)
             elif event_type:
-                logging.debug(f"WebSocket << Received unhandled event type '{event_type}': {data}")
-        except json.JSONDecodeError:
-            logging.error(f"Error decoding JSON message: {message_str}")
+                logger.debug("WebSocket << Received unhandled event type '%s': %s", event_type, data)
+        except orjson.JSONDecodeError:
+            logger.error("Error decoding JSON message: %s", message_str)
         except Exception as e:
-            logging.error(
-                f"Error in on_message: {e}. Original message: {message_str}",
-                exc_info=True,
-            )
+            logger.error("Error in on_message: %s. Original message: %s", e, message_str, exc_info=True)
 
     async def on_error(self, ws, error):
-        logging.error(f"WebSocket Error: {error}")
+        logger.error("WebSocket Error: %s", error)
 
     async def on_close(self, ws, close_status_code, close_msg):
-        logging.info(f"WebSocket closed with code: {close_status_code}, message: {close_msg}")
+        logger.info("WebSocket closed with code: %s, message: %s", close_status_code, close_msg)
 
     async def on_open(self, ws):
-        logging.info("WebSocket connection opened.")
+        logger.info("WebSocket connection opened.")
         if not self.bot.config.BOT_TOKEN:
-            logging.error("BOT_TOKEN not configured for bot instance. Cannot send authentication challenge.")
+            logger.error("BOT_TOKEN not configured for bot instance. Cannot send authentication challenge.")
             await ws.close()
             return
-        auth_data = {
-            "seq": 1,
-            "action": "authentication_challenge",
-            "data": {"token": self.bot.config.BOT_TOKEN},
-        }
+        if self._auth_payload is None:
+            auth_data = {
+                "seq": 1,
+                "action": "authentication_challenge",
+                "data": {"token": self.bot.config.BOT_TOKEN},
+            }
+            self._auth_payload = json.dumps(auth_data)
         try:
-            await ws.send(json.dumps(auth_data))
-            logging.info(
-                f"Sent authentication challenge for bot token starting with: {str(self.bot.config.BOT_TOKEN)[:4]}..."
+            await ws.send(self._auth_payload)
+            logger.info(
+                "Sent authentication challenge for bot token starting with: %s...", str(self.bot.config.BOT_TOKEN)[:4]
             )
         except Exception as e:
-            logging.error(f"Error sending authentication challenge: {e}")
+            logger.error("Error sending authentication challenge: %s", e)
 
     async def run(self):
-        if not self.bot.config.MATTERMOST_URL or not self.bot.config.BOT_TOKEN:
-            logging.error("Mattermost URL or Bot Token not configured for bot instance. Cannot start WebSocket.")
+        if not self.websocket_url or not self.bot.config.BOT_TOKEN:
+            logger.error("Mattermost URL or Bot Token not configured for bot instance. Cannot start WebSocket.")
             return
 
-        websocket_url = f"{self.bot.config.MATTERMOST_URL.replace('http', 'ws', 1).rstrip('/')}/api/v4/websocket"
+        self._loop = asyncio.get_running_loop()
         reconnect_attempts = 0
         current_delay = self.INITIAL_RECONNECT_DELAY
 
         while not self.shutdown_event.is_set():
             try:
-                logging.info(
-                    f"Attempting to connect to WebSocket: {websocket_url} (Attempt: {reconnect_attempts + 1})"
+                logger.info(
+                    "Attempting to connect to WebSocket: %s (Attempt: %d)", self.websocket_url, reconnect_attempts + 1
                 )
                 async with websockets.connect(
-                    websocket_url,
+                    self.websocket_url,
                     ping_interval=60,
                     ping_timeout=30,
                 ) as self.websocket:
-                    logging.info(f"Successfully connected to WebSocket: {websocket_url}")
+                    logger.info("Successfully connected to WebSocket: %s", self.websocket_url)
                     await self.on_open(self.websocket)
                     reconnect_attempts = 0
                     current_delay = self.INITIAL_RECONNECT_DELAY
-                    while not self.shutdown_event.is_set():
-                        try:
-                            message_str = await asyncio.wait_for(self.websocket.recv(), timeout=1.0)
-                            if message_str:
-                                await self.on_message(self.websocket, message_str)
-                        except asyncio.TimeoutError:
-                            if self.shutdown_event.is_set():
-                                logging.debug("Shutdown event set during recv timeout, breaking inner loop.")
-                                break
-                            continue
-                        except websockets.exceptions.ConnectionClosedOK as e:
-                            logging.info(f"WebSocket connection closed normally by server (ClosedOK): {e}")
-                            await self.on_close(self.websocket, e.code, e.reason)
-                            break
-                        except websockets.exceptions.ConnectionClosedError as e:
-                            logging.warning(
-                                f"WebSocket connection closed with error: {e}. Code: {e.code}, Reason: {e.reason}"
+                    # Wait for the next message or for shutdown, whichever comes first, instead of polling.
+                    shutdown_waiter = asyncio.create_task(self.shutdown_event.wait())
+                    recv_task = None
+                    self._ws_alive = True
+                    try:
+                        while not self.shutdown_event.is_set():
+                            recv_task = asyncio.create_task(self.websocket.recv())
+                            done, _ = await asyncio.wait(
+                                {recv_task, shutdown_waiter}, return_when=asyncio.FIRST_COMPLETED
                             )
-                            await self.on_close(self.websocket, e.code, e.reason)
-                            break
-                        except Exception as e:
-                            logging.error(f"Error during WebSocket recv: {e}", exc_info=True)
-                            await self.on_error(self.websocket, e)
-                            break
+                            if recv_task not in done:
+                                recv_task.cancel()
+                                logger.debug("Shutdown event set while waiting for a message, breaking inner loop.")
+                                break
+                            try:
+                                message_str = recv_task.result()
+                                if message_str:
+                                    await self.on_message(self.websocket, message_str)
+                            except websockets.exceptions.ConnectionClosedOK as e:
+                                logger.info("WebSocket connection closed normally by server (ClosedOK): %s", e)
+                                await self.on_close(self.websocket, e.code, e.reason)
+                                break
+                            except websockets.exceptions.ConnectionClosedError as e:
+                                logger.warning(
+                                    "WebSocket connection closed with error: %s. Code: %s, Reason: %s",
+                                    e,
+                                    e.code,
+                                    e.reason,
+                                )
+                                await self.on_close(self.websocket, e.code, e.reason)
+                                break
+                            except Exception as e:
+                                logger.error("Error during WebSocket recv: %s", e, exc_info=True)
+                                await self.on_error(self.websocket, e)
+                                break
+                    finally:
+                        shutdown_waiter.cancel()
+                        if recv_task is not None:
+                            recv_task.cancel()
+                        if self.shutdown_event.is_set():
+                            # Say goodbye to the server before the connection is marked dead.
+                            logger.info("Closing WebSocket connection (if still open)...")
+                            try:
+                                await self.websocket.close(code=1000, reason="Bot shutting down")
+                            except Exception as e:
+                                logger.error("Error during final WebSocket close: %s", e)
+                        self._ws_alive = False
                 if self.shutdown_event.is_set():
-                    logging.info("Shutdown event set, breaking outer connection loop.")
+                    logger.info("Shutdown event set, breaking outer connection loop.")
                     break
             except (
                 websockets.exceptions.InvalidURI,
@@ -119,40 +169,40 @@ class WebsocketHandler:
                 ConnectionRefusedError,
                 OSError,
             ) as e:
-                logging.error(f"Failed to connect to WebSocket: {e}")
+                logger.error("Failed to connect to WebSocket: %s", e)
             except Exception as e:
-                logging.error(
-                    f"Unexpected error during WebSocket connection attempt: {e}",
-                    exc_info=True,
-                )
+                logger.error("Unexpected error during WebSocket connection attempt: %s", e, exc_info=True)
 
             if not self.shutdown_event.is_set():
                 reconnect_attempts += 1
                 if reconnect_attempts >= self.MAX_RECONNECT_ATTEMPTS:
-                    logging.error(f"Exceeded max reconnect attempts ({self.MAX_RECONNECT_ATTEMPTS}). Stopping bot.")
+                    logger.error("Exceeded max reconnect attempts (%d). Stopping bot.", self.MAX_RECONNECT_ATTEMPTS)
                     self.shutdown_event.set()
                     break
-                logging.info(f"Reconnecting in {current_delay} seconds...")
+                logger.info("Reconnecting in %s seconds...", current_delay)
                 try:
                     await asyncio.wait_for(self.shutdown_event.wait(), timeout=current_delay)
                     if self.shutdown_event.is_set():
-                        logging.info("Shutdown initiated during reconnect delay.")
+                        logger.info("Shutdown initiated during reconnect delay.")
                         break
                 except asyncio.TimeoutError:
                     pass
                 current_delay = min(current_delay * 2, self.MAX_RECONNECT_DELAY)
 
-        logging.info("MartyBot WebSocket listener stopped.")
-        if self.websocket and self.websocket.open:
-            logging.info("Closing WebSocket connection finally (if still open)...")
-            try:
-                await self.websocket.close(code=1000, reason="Bot shutting down")
-            except Exception as e:
-                logging.error(f"Error during final WebSocket close: {e}")
+        logger.info("MartyBot WebSocket listener stopped.")
 
     def stop(self):
-        logging.info("Shutdown requested. Setting shutdown event.")
+        logger.info("Shutdown requested. Setting shutdown event.")
         self.shutdown_event.set()
-        if self.websocket and self.websocket.open:
-            logging.info("Requesting WebSocket close from _request_shutdown (scheduling task).")
+        if not self._ws_alive:
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            logger.info("Requesting WebSocket close from _request_shutdown (scheduling task).")
             asyncio.create_task(self.websocket.close(code=1000, reason="Bot shutdown"))
+        else:
+            logger.info("Requesting WebSocket close from _request_shutdown (handing it to the listener loop).")
+            asyncio.run_coroutine_threadsafe(self.websocket.close(code=1000, reason="Bot shutdown"), self._loop)
@@ -1,10 +1,28 @@
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from enum import Enum
 from typing import List, Dict, Tuple, Any
+from urllib.parse import parse_qsl, urlencode, urlsplit
 
+import orjson
 import requests
 
+from clients.http_session import RATE_LIMITED_RETRY_STATUS_FORCELIST, build_session
+
+# (connect, read) timeouts of every Authentik request, so a stalled server cannot hang a sync forever.
+REQUEST_TIMEOUT = (5, 30)
+# Items requested per page of the groups/users lists, far above Authentik's default, to cut round-trips.
+# A server enforcing a lower maximum returns smaller pages and reports total_pages accordingly.
+PAGE_SIZE = 500
+# Full group/user scans are reused for this long: a sync pass asks for the same maps once per entity.
+SCAN_CACHE_TTL_SECONDS = 60
+
+# List pages are parsed with orjson, which is noticeably faster than the stdlib json module on large pages.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so the existing except clauses still apply.
+_loads = orjson.loads
+
 
 class AuthentikAction(Enum):
     USER_ADDED_TO_GROUP = "USER_ADDED_TO_AUTHENTIK_GROUP"
@@ -28,6 +46,93 @@ class AuthentikClient:
             "Accept": "application/json",
             "Content-Type": "application/json",  # Common for POST, harmless for GET
         }
+        # Pooled keep-alive connections shared by every call, so paginated scans and per-user
+        # group updates do not open a new connection per request.
+        # Authentik rate-limits its API: 429 responses are retried after their Retry-After delay.
+        # POSTs keep the default idempotent-only policy: they are resent on a 429 only, never after a 5xx or
+        # a read error. A create_group retried after Authentik already created the group would get a 400
+        # "already exists" and report a failure for a group that exists.
+        # Headers are set once on the session instead of being merged into every request.
+        self.session = build_session(backoff_factor=0.3, status_forcelist=RATE_LIMITED_RETRY_STATUS_FORCELIST)
+        self.session.headers.update(self.headers)
+        # Group endpoint URLs, built once: add/remove run once per member during a sync.
+        self._groups_url = f"{self.base_url}/api/v3/core/groups/"
+        self._group_detail_tmpl = self._groups_url + "{}/"
+        self._add_user_tmpl = self._groups_url + "{}/add_user/"
+        self._remove_user_tmpl = self._groups_url + "{}/remove_user/"
+        # Pages after the first one of the groups/users lists are fetched with this many threads.
+        self._pagination_workers = 8
+        # Scan name (e.g. "groups_with_users") -> (expires_at, result of that scan)
+        self._scan_cache: dict[str, tuple[datetime, Any]] = {}
+
+    @staticmethod
+    def _copy_scan(result: Any) -> Any:
+        """
+        A shallow copy of a scan result (a list, a dict, or a tuple of them), so a caller that appends to or pops
+        from it does not alter the cached result. The groups and users inside are shared and must not be mutated.
+        """
+        if isinstance(result, tuple):
+            return tuple(AuthentikClient._copy_scan(part) for part in result)
+        if isinstance(result, (list, dict)):
+            return result.copy()
+        return result
+
+    def _get_cached_scan(self, key: str) -> Any:
+        """Returns a copy of the cached result of the scan named key, or None if it is missing or expired."""
+        entry = self._scan_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if datetime.now() >= expires_at:
+            del self._scan_cache[key]
+            return None
+        return self._copy_scan(result)
+
+    def _cache_scan(self, key: str, result: Any) -> None:
+        """Caches a copy of the result of the scan named key for SCAN_CACHE_TTL_SECONDS."""
+        self._scan_cache[key] = (datetime.now() + timedelta(seconds=SCAN_CACHE_TTL_SECONDS), self._copy_scan(result))
+
+    def clear_cache(self, key: str | None = None) -> None:
+        """Drops the cached result of the scan named key, or of every scan if key is None."""
+        if key is None:
+            self._scan_cache.clear()
+        else:
+            self._scan_cache.pop(key, None)
+
+    @staticmethod
+    def _next_page_url(current_url: str, next_page: Any) -> str | None:
+        """
+        Resolves the "next" field of a pagination block into the URL of the next page.
+        Authentik reports the next page number (0 on the last page); a full URL is used as is.
+        :return: The next page URL, or None when there is no next page.
+        """
+        if not next_page:
+            return None
+        if isinstance(next_page, str) and not next_page.isdigit():
+            return next_page
+        parts = urlsplit(current_url)
+        query = dict(parse_qsl(parts.query))
+        query["page"] = str(next_page)
+        return parts._replace(query=urlencode(query)).geturl()
+
+    def _fetch_remaining_pages(self, url: str, total_pages: int) -> list[dict]:
+        """
+        Fetches pages 2 to total_pages of a paginated list endpoint concurrently.
+        :param url: The URL of the first page; the page number is sent as a query parameter.
+        :param total_pages: The number of pages announced by the first page's pagination block.
+        :return: The results of the remaining pages, in page order.
+        HTTP and JSON errors are propagated to the caller.
+        """
+        pages = range(2, total_pages + 1)
+
+        def fetch_page(page: int) -> list[dict]:
+            response = self.session.get(url, params={"page": page}, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            return _loads(response.content).get("results", [])
+
+        logging.debug(f"Fetching {len(pages)} more page(s) from {url} concurrently.")
+        with ThreadPoolExecutor(max_workers=min(self._pagination_workers, len(pages))) as executor:
+            return [item for page_items in executor.map(fetch_page, pages) for item in page_items]
 
     def create_group(self, project_name: str) -> bool:
         """
@@ -35,20 +140,21 @@ class AuthentikClient:
         :param project_name: The name of the project/group to create.
         :return: True if successful, False otherwise.
         """
-        # Note: Uses self.headers which now includes Content-Type by default
-        api_url = f"{self.base_url}/api/v3/core/groups/"
+        # Note: The session sends self.headers, which include Content-Type by default
+        api_url = self._groups_url
         payload = {
             "name": project_name,
             "is_superuser": False,
         }
 
         try:
-            response = requests.post(api_url, headers=self.headers, json=payload)
+            response = self.session.post(api_url, json=payload, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()  # Check for HTTP errors
             # If successful (201 Created), log and return True
             logging.info(
                 f"Authentik group '{project_name}' created successfully. Group ID: {response.json().get('pk')}"
             )
+            self.clear_cache("groups_with_users")
             return response.json()  # Return the created group object
         except requests.exceptions.HTTPError as e:
             # Log specific HTTP errors, e.g. if group already exists (often a 400 or 409)
@@ -73,17 +179,22 @@ class AuthentikClient:
         Returns a tuple: (list_of_group_objects, dict_email_to_user_pk).
         Each group object in the list should at least contain 'pk', 'name', and 'users' (list of user PKs).
         The dict_email_to_user_pk maps user email to their Authentik user PK.
+        Non-empty results are cached for SCAN_CACHE_TTL_SECONDS, and dropped when this client changes a group.
         """
         if not self.base_url or not self.token:  # Should be caught by __init__ but good practice
             logging.error("Authentik client not configured (URL or Token missing).")
             return [], {}
 
+        cached = self._get_cached_scan("groups_with_users")
+        if cached is not None:
+            logging.debug("Using cached Authentik groups (with users).")
+            return cached
+
         all_groups = []
         email_to_user_pk_map = {}
 
-        current_url = (
-            f"{self.base_url}/api/v3/core/groups/?include_users=true"  # Assuming include_users provides users_obj
-        )
+        # Assuming include_users provides users_obj
+        current_url = f"{self._groups_url}?include_users=true&page_size={PAGE_SIZE}"
         logging.info(f"Fetching Authentik groups (with users) from initial URL: {current_url}")
 
         page_count = 0
@@ -91,31 +202,42 @@ class AuthentikClient:
             page_count += 1
             logging.debug(f"Fetching group page {page_count} from {current_url}")
             try:
-                response = requests.get(current_url, headers=self.headers)
+                response = self.session.get(current_url, timeout=REQUEST_TIMEOUT)
                 response.raise_for_status()
-                data = response.json()
+                data = _loads(response.content)
 
                 page_groups = data.get("results", [])
+                pagination = data.get("pagination", {})
+                total_pages = pagination.get("total_pages")
+                if page_count == 1 and isinstance(total_pages, int) and total_pages > 1:
+                    # The page count is known: fetch all the other pages at once instead of following "next".
+                    page_groups = page_groups + self._fetch_remaining_pages(current_url, total_pages)
+                    page_count = total_pages
+                    next_url = None
+                else:
+                    next_url = pagination.get("next")
                 all_groups.extend(page_groups)
 
-                # Process users from this page of groups
-                for group in page_groups:
-                    # Assuming users_obj is directly available or via an endpoint per group
-                    # The prompt implies 'users_obj' is part of the group details when fetched correctly.
-                    # If not, this part would need adjustment (e.g. fetch users per group)
-                    users_obj = group.get("users_obj", [])
-                    for user in users_obj:
-                        email = user.get("email")
-                        pk = user.get("pk")
-                        if email and pk is not None:
-                            if email in email_to_user_pk_map and email_to_user_pk_map[email] != pk:
-                                logging.warning(
-                                    f"User email {email} has conflicting PKs: "
-                                    f"{email_to_user_pk_map[email]} vs {pk}. Using the latest one encountered."
-                                )
-                            email_to_user_pk_map[email] = pk
-
-                current_url = data.get("pagination", {}).get("next")
+                # Process users from this page of groups.
+                # The prompt implies 'users_obj' is part of the group details when fetched correctly.
+                # If not, this part would need adjustment (e.g. fetch users per group)
+                page_pairs = [
+                    (user.get("email"), user.get("pk"))
+                    for group in page_groups
+                    for user in group.get("users_obj", [])
+                    if user.get("email") and user.get("pk") is not None
+                ]
+                for email, pk in page_pairs:
+                    # One probe per user; the map is only rewritten on the rare conflicting PK.
+                    previous_pk = email_to_user_pk_map.setdefault(email, pk)
+                    if previous_pk != pk:
+                        logging.warning(
+                            f"User email {email} has conflicting PKs: "
+                            f"{previous_pk} vs {pk}. Using the latest one encountered."
+                        )
+                        email_to_user_pk_map[email] = pk
+
+                current_url = self._next_page_url(current_url, next_url)
                 if current_url:
                     logging.debug(f"Next page for groups: {current_url}")
 
@@ -131,6 +253,8 @@ class AuthentikClient:
             f"Fetched {len(all_groups)} groups, {len(email_to_user_pk_map)} user email-PK mappings "
             f"from Authentik over {page_count} pages."
         )
+        if all_groups:
+            self._cache_scan("groups_with_users", (all_groups, email_to_user_pk_map))
         return all_groups, email_to_user_pk_map
 
     def add_user_to_group(self, group_pk, user_pk):
@@ -146,18 +270,19 @@ class AuthentikClient:
         # This is an example, the actual endpoint might differ.
         # The prompt had /add_user/ which is often a POST with payload {"pk": user_pk}
         # Let's use the example from the prompt: POST to /api/v3/core/groups/{group_pk}/add_user/
-        url = f"{self.base_url}/api/v3/core/groups/{group_pk}/add_user/"
+        url = self._add_user_tmpl.format(group_pk)
         payload = {"pk": user_pk}
 
-        # self.headers already includes Content-Type: application/json and Authorization
+        # The session already sends Content-Type: application/json and Authorization
         logging.info(f"Adding user PK {user_pk} to Authentik group PK {group_pk} at {url}")
         try:
-            response = requests.post(url, headers=self.headers, json=payload)
+            response = self.session.post(url, json=payload, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
 
             # Typically 204 No Content or 200 OK for this kind of operation
             if 200 <= response.status_code < 300:
                 logging.info(f"Successfully added/ensured user PK {user_pk} in group PK {group_pk}.")
+                self.clear_cache("groups_with_users")
                 return True
             else:
                 # Should be caught by raise_for_status, but as a fallback
@@ -190,6 +315,50 @@ class AuthentikClient:
             logging.error(f"Request exception adding user PK {user_pk} to group PK {group_pk}: {e}")
             return False
 
+    def add_users_to_group(self, group_pk: str, user_pks: list[int]) -> bool:
+        """
+        Adds several users to an Authentik group with two requests instead of one per user: the group's current
+        members are read, then the group is PATCHed with those members plus user_pks.
+        Prefer it to add_user_to_group when a sync adds more than one user to the same group.
+        This is a read-modify-write of the whole member list: any membership change made between the read and
+        the PATCH (e.g. by a concurrent sync) is lost. A user removed in between is added back, and a user
+        added in between is removed again.
+        :return: True if the users are now members of the group, False otherwise.
+        """
+        if not self.base_url or not self.token:
+            logging.error("Authentik client not configured.")
+            return False
+        if not group_pk:
+            logging.error("Group PK must be provided to add users to group.")
+            return False
+        if not user_pks:
+            return True
+
+        url = self._group_detail_tmpl.format(group_pk)
+        logging.info(f"Adding {len(user_pks)} user(s) to Authentik group PK {group_pk} at {url}")
+        try:
+            # Read the members right before writing them back, to keep the window in which a concurrent
+            # membership change is overwritten by the PATCH as short as possible (see the docstring).
+            response = self.session.get(url, params={"include_users": "false"}, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            current_user_pks = response.json().get("users", [])
+            members = list(dict.fromkeys([*current_user_pks, *user_pks]))
+
+            response = self.session.patch(url, json={"users": members}, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            logging.info(f"Successfully added user PKs {list(user_pks)} to group PK {group_pk}.")
+            self.clear_cache("groups_with_users")
+            return True
+        except requests.exceptions.HTTPError as e:
+            logging.error(
+                f"HTTP error adding user PKs {list(user_pks)} to group PK {group_pk}: "
+                f"{e.response.status_code} - {e.response.text}"
+            )
+            return False
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Request exception adding user PKs {list(user_pks)} to group PK {group_pk}: {e}")
+            return False
+
     def remove_user_from_group(self, group_pk: str, user_pk: int) -> bool:
         """Removes a user from an Authentik group."""
         if not self.base_url or not self.token:
@@ -199,17 +368,18 @@ class AuthentikClient:
             logging.error("Group PK and User PK must be provided to remove user from group.")
             return False
 
-        url = f"{self.base_url}/api/v3/core/groups/{group_pk}/remove_user/"
+        url = self._remove_user_tmpl.format(group_pk)
         payload = {"pk": user_pk}
 
         logging.info(f"Removing user PK {user_pk} from Authentik group PK {group_pk} at {url}")
         try:
-            response = requests.post(url, headers=self.headers, json=payload)
+            response = self.session.post(url, json=payload, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()  # Raises for 4xx/5xx responses
 
             # Typically 204 No Content or 200 OK for this kind of operation
             if 200 <= response.status_code < 300:
                 logging.info(f"Successfully removed user PK {user_pk} from group PK {group_pk}.")
+                self.clear_cache("groups_with_users")
                 return True
             else:
                 # This case might be redundant if raise_for_status() is effective
@@ -240,13 +410,19 @@ class AuthentikClient:
         Returns a list of dictionaries, each containing user's 'email' and 'attributes'.
         Example: [{'email': 'user@example.com', 'attributes': {'attr1': 'value1'}}]
         Returns an empty list if an error occurs or no users are found.
+        Non-empty results are cached for SCAN_CACHE_TTL_SECONDS.
         """
         if not self.base_url or not self.token:
             logging.error("Authentik client not configured (URL or Token missing).")
             return []
 
+        cached = self._get_cached_scan("users_data")
+        if cached is not None:
+            logging.debug("Using cached Authentik users data.")
+            return cached
+
         all_users_data = []
-        current_url = f"{self.base_url}/api/v3/core/users/"
+        current_url = f"{self.base_url}/api/v3/core/users/?page_size={PAGE_SIZE}"
         logging.info(f"Fetching Authentik users data from initial URL: {current_url}")
 
         page_count = 0
@@ -254,18 +430,27 @@ class AuthentikClient:
             page_count += 1
             logging.debug(f"Fetching user data page {page_count} from {current_url}")
             try:
-                response = requests.get(current_url, headers=self.headers)
+                response = self.session.get(current_url, timeout=REQUEST_TIMEOUT)
                 response.raise_for_status()
-                data = response.json()
+                data = _loads(response.content)
 
                 page_users = data.get("results", [])
-                for user in page_users:
-                    email = user.get("email")
-                    attributes = user.get("attributes", {})  # Default to empty dict if no attributes
-                    if email:  # Only include users with an email
-                        all_users_data.append({"email": email, "attributes": attributes})
+                pagination = data.get("pagination", {})
+                total_pages = pagination.get("total_pages")
+                if page_count == 1 and isinstance(total_pages, int) and total_pages > 1:
+                    page_users = page_users + self._fetch_remaining_pages(current_url, total_pages)
+                    page_count = total_pages
+                    next_url = None
+                else:
+                    next_url = pagination.get("next")
+                # Only include users with an email; attributes default to an empty dict
+                all_users_data.extend(
+                    {"email": user["email"], "attributes": user.get("attributes", {})}
+                    for user in page_users
+                    if user.get("email")
+                )
 
-                current_url = data.get("pagination", {}).get("next")
+                current_url = self._next_page_url(current_url, next_url)
                 if current_url:
                     logging.debug(f"Next page for users data: {current_url}")
 
@@ -277,19 +462,27 @@ class AuthentikClient:
                 return []  # Return empty list on error
 
         logging.info(f"Fetched data for {len(all_users_data)} users from Authentik over {page_count} pages.")
+        if all_users_data:
+            self._cache_scan("users_data", all_users_data)
         return all_users_data
 
     def get_all_users_pk_by_email(self) -> dict[str, int]:
         """
         Fetches all users from Authentik and returns a dictionary
         mapping their email address to their primary key (pk).
+        Non-empty results are cached for SCAN_CACHE_TTL_SECONDS.
         """
         if not self.base_url or not self.token:
             logging.error("Authentik client not configured (URL or Token missing).")
             return {}
 
+        cached = self._get_cached_scan("users_pk_by_email")
+        if cached is not None:
+            logging.debug("Using cached Authentik email-to-PK map.")
+            return cached
+
         email_to_pk_map = {}
-        current_url = f"{self.base_url}/api/v3/core/users/"
+        current_url = f"{self.base_url}/api/v3/core/users/?page_size={PAGE_SIZE}"
         logging.info(f"Fetching all Authentik users to build email-to-PK map from {current_url}")
 
         page_count = 0
@@ -297,23 +490,27 @@ class AuthentikClient:
             page_count += 1
             logging.debug(f"Fetching user page {page_count} from {current_url}")
             try:
-                response = requests.get(current_url, headers=self.headers)
+                response = self.session.get(current_url, timeout=REQUEST_TIMEOUT)
                 response.raise_for_status()
-                data = response.json()
+                data = _loads(response.content)
 
                 page_users = data.get("results", [])
-                for user in page_users:
-                    email = user.get("email")
-                    pk = user.get("pk")
-                    if email and pk is not None:
-                        # Emails in Authentik should be unique. If not, this will overwrite.
-                        email_to_pk_map[email.lower()] = pk
-
-                next_page = data.get("pagination", {}).get("next")
-                if next_page:
-                    current_url = f"{self.base_url}/api/v3/core/users/?page={next_page}&path=users"
+                pagination = data.get("pagination", {})
+                total_pages = pagination.get("total_pages")
+                if page_count == 1 and isinstance(total_pages, int) and total_pages > 1:
+                    page_users = page_users + self._fetch_remaining_pages(current_url, total_pages)
+                    page_count = total_pages
+                    next_page = None
                 else:
-                    current_url = None
+                    next_page = pagination.get("next")
+                # Emails in Authentik should be unique. If not, the last user seen wins.
+                email_to_pk_map.update(
+                    (user["email"].lower(), user["pk"])
+                    for user in page_users
+                    if user.get("email") and user.get("pk") is not None
+                )
+
+                current_url = self._next_page_url(current_url, next_page)
 
             except requests.exceptions.RequestException as e:
                 logging.error(f"Error fetching Authentik users from {current_url}: {e}")
@@ -323,6 +520,8 @@ class AuthentikClient:
                 return {}
 
         logging.info(f"Built email-to-PK map for {len(email_to_pk_map)} users from Authentik.")
+        if email_to_pk_map:
+            self._cache_scan("users_pk_by_email", email_to_pk_map)
         return email_to_pk_map
 
 
@@ -4,6 +4,8 @@ from typing import Optional
 
 import requests
 
+from clients.http_session import RATE_LIMITED_RETRY_STATUS_FORCELIST, build_retry_adapter, build_session
+
 
 class BrevoAction(Enum):
     CONTACT_ADDED = "USER_ENSURED_IN_BREVO_LIST"
@@ -25,14 +27,47 @@ class BrevoClient:
             "api-key": self.api_key,
             "content-type": "application/json",
         }
+        # Pooled keep-alive connections shared by every call, so paginated list and contact scans
+        # do not pay a new TCP/TLS handshake per request. Brevo rate-limits its API: 429 responses
+        # are retried after their Retry-After delay.
+        self.session = build_session(
+            pool_connections=4,
+            pool_maxsize=20,
+            backoff_factor=0.3,
+            status_forcelist=RATE_LIMITED_RETRY_STATUS_FORCELIST,
+        )
+        # POSTs that create something (contacts, contacts/lists) keep the default idempotent-only policy:
+        # they are resent on a 429 only, never after a read error or a 5xx that might follow the creation.
+        # smtp/email gets its own 429-only adapter on top, so a slow gateway can never send an email twice
+        # even if the session later opts in to POST retries. contacts and contacts/lists are not mounted:
+        # their prefixes also cover the GET/PUT/DELETE endpoints, which must keep their 5xx retries.
+        self.session.mount(
+            f"{self.api_url}/smtp/email",
+            build_retry_adapter(
+                pool_connections=4, pool_maxsize=20, backoff_factor=0.3, status_forcelist=(429,), read_retries=0
+            ),
+        )
+        self.session.headers.update(self.headers)
         logging.info("BrevoClient initialized.")
 
+    def close(self):
+        """
+        Closes the pooled connections to the Brevo API.
+        """
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def _make_request(self, method: str, endpoint: str, json_data=None, params=None) -> tuple[int, dict | list | None]:
         """Helper function to make HTTP requests to Brevo API."""
         url = f"{self.api_url}/{endpoint.lstrip('/')}"
         logging.debug(f"Brevo API >> Request: {method.upper()} {url}, Params: {params}, JSON: {json_data}")
         try:
-            response = requests.request(method, url, headers=self.headers, json=json_data, params=params)
+            response = self.session.request(method, url, json=json_data, params=params)
             logging.debug(f"Brevo API << Response: Status={response.status_code}, Content='{response.text[:200]}...'")
             response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
             if response.status_code == 204:  # No content
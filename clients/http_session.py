@@ -0,0 +1,93 @@
+import logging
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUS_FORCELIST = (502, 503, 504)
+# For APIs that rate-limit: 429 responses are retried too, waiting for their Retry-After header.
+RATE_LIMITED_RETRY_STATUS_FORCELIST = (429,) + RETRY_STATUS_FORCELIST
+# Only idempotent methods are resent after a read error or a 5xx, since the server may already have acted on
+# the first attempt. POST is resent on a 429 only, which the server rejected without processing it.
+RETRY_ALLOWED_METHODS = ("GET", "PATCH", "PUT", "DELETE")
+# For APIs whose POST endpoints are reads or otherwise idempotent (e.g. Outline's RPC API), to opt in explicitly.
+RETRY_ALLOWED_METHODS_WITH_POST = RETRY_ALLOWED_METHODS + ("POST",)
+# Longest Retry-After delay honoured before a retry: a server asking for more (e.g. an hour) would otherwise
+# block the calling sync thread for that long. Longer delays are clamped to this bound.
+RETRY_AFTER_MAX_SECONDS = 60
+
+
+class _RateLimitAwareRetry(Retry):
+    """
+    A Retry that also resends methods outside allowed_methods on a 429 of the status_forcelist, and waits at
+    most RETRY_AFTER_MAX_SECONDS for a Retry-After delay.
+    """
+
+    def parse_retry_after(self, retry_after: str) -> float:
+        seconds = super().parse_retry_after(retry_after)
+        if seconds > RETRY_AFTER_MAX_SECONDS:
+            logging.warning(f"Server asked to retry after {seconds:.0f}s; waiting {RETRY_AFTER_MAX_SECONDS}s instead.")
+            return RETRY_AFTER_MAX_SECONDS
+        return seconds
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if status_code == 429 and self.status_forcelist and 429 in self.status_forcelist:
+            return True
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+def build_retry_adapter(
+    pool_connections: int = 10,
+    pool_maxsize: int = 50,
+    total_retries: int = 3,
+    backoff_factor: float = 0.2,
+    status_forcelist: tuple[int, ...] = RETRY_STATUS_FORCELIST,
+    read_retries: Optional[int] = None,
+    allowed_methods: tuple[str, ...] = RETRY_ALLOWED_METHODS,
+) -> HTTPAdapter:
+    """
+    Builds an HTTPAdapter that retries connection errors and the given statuses with exponential backoff,
+    honouring Retry-After headers. Methods outside allowed_methods (POST by default) are only resent on a 429,
+    never after a read error or a 5xx. Pass read_retries=0 for non-idempotent endpoints of an API that opted
+    in to POST retries, so a request that may already have reached the server is not sent twice.
+    """
+    retry = _RateLimitAwareRetry(
+        total=total_retries,
+        read=read_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=status_forcelist,
+        allowed_methods=allowed_methods,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    return HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+
+
+def build_session(
+    pool_connections: int = 10,
+    pool_maxsize: int = 50,
+    total_retries: int = 3,
+    backoff_factor: float = 0.2,
+    status_forcelist: tuple[int, ...] = RETRY_STATUS_FORCELIST,
+    allowed_methods: tuple[str, ...] = RETRY_ALLOWED_METHODS,
+) -> requests.Session:
+    """
+    Builds a requests.Session whose keep-alive connection pool retries transient failures.
+    Connection errors and 502/503/504 responses (or the given status_forcelist) are retried with
+    exponential backoff; read errors and 5xx are only retried for allowed_methods, a POST is only resent
+    on a 429. Once retries are exhausted the last response is returned as-is, so callers keep handling it
+    through their usual raise_for_status() path.
+    """
+    adapter = build_retry_adapter(
+        pool_connections,
+        pool_maxsize,
+        total_retries,
+        backoff_factor,
+        status_forcelist,
+        allowed_methods=allowed_methods,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
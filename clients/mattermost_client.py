@@ -2,6 +2,7 @@ import json
 import logging  # Added logging
 from app.status_manager import status_manager
 import requests
+from clients.http_session import build_session
 from libraries.services.mattermost import slugify
 
 
@@ -32,6 +33,17 @@ class MattermostClient:
             "Accept": "application/json",
             "Authorization": f"Bearer {self.token}",
         }
+        # Bot headers are set once on the pooled session instead of being merged into every request.
+        # The session keeps the default idempotent-only retries: a POST (posts, DMs, channel creation) is never
+        # resent after a 5xx or a read error, which could post the same message twice.
+        self.session = build_session()
+        self.session.headers.update(self.headers)
+        # URL templates for the per-user and paginated endpoints, built once instead of on every call.
+        self._users_url_tmpl = self.base_url + "/api/v4/users/{uid}"
+        self._users_list_tmpl = self.base_url + "/api/v4/users?page={page}&per_page={per_page}"
+        self._channel_users_list_tmpl = (
+            self.base_url + "/api/v4/users?in_channel={channel_id}&page={page}&per_page={per_page}"
+        )
         self.bot_user_id: str | None = None
         self._initialize_bot_user_id()
 
@@ -69,10 +81,10 @@ class MattermostClient:
         Corresponds to Mattermost API: GET /api/v4/users/me
         :return: A dictionary containing user details if successful, None otherwise.
         """
-        api_url = f"{self.base_url}/api/v4/users/me"
+        api_url = self._users_url_tmpl.format(uid="me")
         logging.debug(f"Mattermost API >> Getting current user (bot) details from {api_url}")
         try:
-            response = requests.get(api_url, headers=self.headers)
+            response = self.session.get(api_url)
             response.raise_for_status()
             user_data = response.json()
             logging.info(f"Successfully fetched bot's user details. Bot User ID: {user_data.get('id')}")
@@ -106,7 +118,7 @@ class MattermostClient:
         }
         logging.debug(f"Mattermost API >> Posting to channel {channel_id}: {json.dumps(payload)}")
         try:
-            response = requests.post(api_url, headers=self.headers, json=payload)
+            response = self.session.post(api_url, json=payload)
             response.raise_for_status()
             logging.info(f"Message posted successfully to channel {channel_id}.")
             return True
@@ -151,7 +163,7 @@ class MattermostClient:
         }
 
         try:
-            response = requests.post(api_url, headers=self.headers, json=payload)
+            response = self.session.post(api_url, json=payload)
             response.raise_for_status()  # Check for HTTP errors
             created_channel = response.json()
             log_msg = (
@@ -207,7 +219,7 @@ class MattermostClient:
 
         logging.debug(f"Fetching Mattermost channel by name '{channel_name}' in team '{team_id}' from {url}")
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self.session.get(url)
             response.raise_for_status()
             channel_data = response.json()
             logging.info(f"Successfully fetched channel '{channel_name}' (ID: {channel_data.get('id')}).")
@@ -242,10 +254,10 @@ class MattermostClient:
 
         logging.debug(f"Fetching users in Mattermost channel '{channel_id}' (page size: {per_page})")
         while True:
-            url = f"{self.base_url}/api/v4/users?in_channel={channel_id}&page={page}&per_page={per_page}"
+            url = self._channel_users_list_tmpl.format(channel_id=channel_id, page=page, per_page=per_page)
             logging.debug(f"Fetching page {page} of users for channel '{channel_id}' from {url}.")
             try:
-                response = requests.get(url, headers=self.headers)
+                response = self.session.get(url)
                 response.raise_for_status()
                 users_page = response.json()
 
@@ -303,7 +315,7 @@ class MattermostClient:
             f"Mattermost API >> Creating direct channel with user '{other_user_id}'. Payload: {json.dumps(payload)}"
         )
         try:
-            response = requests.post(api_url, headers=self.headers, json=payload)
+            response = self.session.post(api_url, json=payload)
             response.raise_for_status()
             channel_data = response.json()
             dm_channel_id = channel_data.get("id")
@@ -371,7 +383,7 @@ class MattermostClient:
 
         logging.debug(f"Mattermost API >> Adding user {user_id} to channel {channel_id}: {json.dumps(payload)}")
         try:
-            response = requests.post(api_url, headers=self.headers, json=payload)
+            response = self.session.post(api_url, json=payload)
             response.raise_for_status()  # Check for HTTP errors (201 Created is success)
             logging.info(f"User {user_id} successfully added to channel {channel_id}.")
             return True
@@ -432,7 +444,7 @@ class MattermostClient:
                 f"Mattermost API >> Fetching {channel_type} channels for team {current_team_id} from {api_url}"
             )
             try:
-                response = requests.get(api_url, headers=self.headers)
+                response = self.session.get(api_url)
                 response.raise_for_status()
                 channels_data = response.json()
                 logging.debug(f"{channel_type} channels_data: {channels_data} from {api_url}")
@@ -486,7 +498,7 @@ class MattermostClient:
         url = f"{self.base_url}/api/v4/channels/{channel_id}"
         logging.debug(f"Fetching Mattermost channel by ID '{channel_id}' from {url}")
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self.session.get(url)
             response.raise_for_status()
             channel_data = response.json()
             logging.info(f"Successfully fetched channel ID '{channel_id}' (Name: {channel_data.get('name')}).")
@@ -518,10 +530,10 @@ class MattermostClient:
             logging.error("User ID must be provided to fetch user roles.")
             return []
 
-        api_url = f"{self.base_url}/api/v4/users/{user_id}"
+        api_url = self._users_url_tmpl.format(uid=user_id)
         logging.debug(f"Mattermost API >> Getting user roles for user_id {user_id} from {api_url}")
         try:
-            response = requests.get(api_url, headers=self.headers)
+            response = self.session.get(api_url)
             response.raise_for_status()
             user_data = response.json()
             roles_str = user_data.get("roles")
@@ -561,10 +573,10 @@ class MattermostClient:
         logging.info("Mattermost API >> Listing all users...")
 
         while True:
-            api_url = f"{self.base_url}/api/v4/users?page={page}&per_page={per_page}"
+            api_url = self._users_list_tmpl.format(page=page, per_page=per_page)
             logging.debug(f"Fetching page {page} of users from {api_url}")
             try:
-                response = requests.get(api_url, headers=self.headers)
+                response = self.session.get(api_url)
                 response.raise_for_status()
                 users_page = response.json()
 
@@ -602,11 +614,11 @@ class MattermostClient:
             logging.error("User ID must be provided to delete a user.")
             return False
 
-        api_url = f"{self.base_url}/api/v4/users/{user_id}"
+        api_url = self._users_url_tmpl.format(uid=user_id)
         logging.info(f"Mattermost API >> Deactivating user {user_id} from {api_url}")
 
         try:
-            response = requests.delete(api_url, headers=self.headers)
+            response = self.session.delete(api_url)
             response.raise_for_status()
             # Successful deactivation returns a 200 OK with a status object
             if response.json().get("status") == "ok":
@@ -634,6 +646,8 @@ class MattermostClient:
         headers = {"X-Requested-With": "XMLHttpRequest"}
         logging.info(f"MattermostClient: Logging in as user {self.login_id} to get CSRF token.")
         try:
+            # Deliberately not sent through self.session: the login must not carry the bot's
+            # Authorization header, nor leave the user's auth cookies in the bot session.
             response = requests.post(api_url, json=payload, headers=headers)
             response.raise_for_status()
             self.user_auth_token = response.cookies.get("MMAUTHTOKEN")
@@ -675,7 +689,7 @@ class MattermostClient:
         logging.info(f"MattermostClient: Duplicating board from template {template_board_id} to team {self.team_id}")
         try:
             # An empty JSON body is required for this POST request.
-            response = requests.post(api_url, headers=headers, json={})
+            response = self.session.post(api_url, headers=headers, json={})
             response.raise_for_status()
             response_data = response.json()
             if self.debug:
@@ -707,7 +721,7 @@ class MattermostClient:
         )
         try:
             # Using PATCH to update the board title
-            response = requests.patch(api_url, headers=headers, json=payload)
+            response = self.session.patch(api_url, headers=headers, json=payload)
             response.raise_for_status()
             if self.debug:
                 logging.info(f"Rename board response: {response.text}")
@@ -726,7 +740,7 @@ class MattermostClient:
         api_url = f"{self.base_url}/plugins/focalboard/api/v2/boards/{board_id}"
         logging.info(f"MattermostClient: Fetching board {board_id}")
         try:
-            response = requests.get(api_url, headers=headers)
+            response = self.session.get(api_url, headers=headers)
             response.raise_for_status()
             board = response.json()
             logging.info(f"Successfully fetched board {board_id}.")
@@ -755,7 +769,7 @@ class MattermostClient:
         }
         logging.info(f"Adding user {user_id} to board {board_id}")
         try:
-            response = requests.post(api_url, headers=headers, json=payload)
+            response = self.session.post(api_url, headers=headers, json=payload)
             response.raise_for_status()
             if self.debug:
                 logging.info(f"Add user to board response: {response.text}")
@@ -1,8 +1,11 @@
 import logging
+from datetime import datetime, timedelta
 from enum import Enum
 
 import requests
 
+from clients.http_session import build_session
+
 
 class NocoDBAction(Enum):
     USER_REMOVED_FROM_BASE = "NOCODB_USER_REMOVED_FROM_BASE"
@@ -44,6 +47,19 @@ class NocoDBAction(Enum):
 # Configure logging for the client
 logger = logging.getLogger(__name__)
 
+# How long the result of list_bases() is reused before the bases are fetched again.
+BASES_CACHE_TTL_SECONDS = 60
+
+
+def _copy_bases(bases: dict | list) -> dict | list:
+    """A copy of a list_bases() response whose top level and "list" can be modified without altering the cache."""
+    if isinstance(bases, list):
+        return list(bases)
+    copied = dict(bases)
+    if isinstance(copied.get("list"), list):
+        copied["list"] = list(copied["list"])
+    return copied
+
 
 class NocoDBClient:
     def __init__(self, nocodb_url: str, token: str):
@@ -55,15 +71,22 @@ class NocoDBClient:
             raise ValueError("NocoDB Token is required.")
 
         self.base_url = nocodb_url.rstrip("/")
+        self._meta_api_url = f"{self.base_url}/api/v1/db/meta/"
         self.headers = {
             "xc-token": token,  # Based on NoCoDB docs, token is often passed as xc-token
             "Content-Type": "application/json",
         }
+        # Pooled keep-alive connections, with retries on connection errors and 502/503/504.
+        # Headers are set once on the session instead of being merged into every request.
+        self.session = build_session()
+        self.session.headers.update(self.headers)
+        self._bases_cache: dict | None = None
+        self._bases_cache_expires_at: datetime | None = None
         logger.debug("NocoDBClient initialized for URL: %s", self.base_url)  # Changed to DEBUG
 
     def _make_request(self, method: str, endpoint: str, **kwargs) -> dict | list | None:
         """Helper function to make requests to the NoCoDB API."""
-        url = f"{self.base_url}/api/v1/db/meta/{endpoint.lstrip('/')}"
+        url = self._meta_api_url + endpoint.lstrip("/")
         # Removed detailed logging of headers and full JSON params from DEBUG by default,
         # as it can be very verbose and contain sensitive info if not careful.
         # Users can add it back if specific request debugging is needed.
@@ -72,7 +95,7 @@ class NocoDBClient:
             logger.debug(f"NoCoDB API >> JSON Payload: {kwargs.get('json')}")
 
         try:
-            response = requests.request(method, url, headers=self.headers, **kwargs)
+            response = self.session.request(method, url, **kwargs)
             response.raise_for_status()
             if response.content:  # Handle cases where response might be empty (e.g., 204 No Content)
                 return response.json()
@@ -108,6 +131,7 @@ class NocoDBClient:
             logger.info(
                 f"Successfully created NoCoDB base '{base_title}' with ID: {response_data['id']}"
             )  # Kept as INFO
+            self.invalidate_bases_cache()
             return response_data
         logger.warning(f"Failed to create NoCoDB base '{base_title}'. Response: {response_data}")  # Kept as WARNING
         return None
@@ -119,7 +143,7 @@ class NocoDBClient:
         Filters locally as NoCoDB API for listing projects doesn't seem to have a direct name filter.
         """
         logger.debug("Attempting to find NoCoDB base with title: %s", base_title)
-        response_data = self._make_request("get", "projects/")
+        response_data = self.list_bases()
         if response_data and isinstance(response_data, dict) and "list" in response_data:
             for base in response_data["list"]:
                 if base.get("title") == base_title:
@@ -209,15 +233,31 @@ class NocoDBClient:
         )
         return []
 
-    def list_bases(self) -> list[dict]:
+    def list_bases(self) -> dict | None:
         """
-        List all base meta data
+        List all base meta data.
+        Successful responses are cached for BASES_CACHE_TTL_SECONDS, as a sync pass looks bases up many times.
+        Each call returns its own copy of the response and of its "list", so callers may modify them; the base
+        dicts inside are shared with the cache and must not be mutated.
         """
+        if self._bases_cache is not None and datetime.now() < self._bases_cache_expires_at:
+            logger.debug("Using cached list of NoCoDB bases.")
+            return _copy_bases(self._bases_cache)
+
         logger.debug("Listing bases in NoCoDB")
         endpoint = "projects/"
         response_data = self._make_request("get", endpoint)
+        if response_data is not None:
+            self._bases_cache = response_data
+            self._bases_cache_expires_at = datetime.now() + timedelta(seconds=BASES_CACHE_TTL_SECONDS)
+            return _copy_bases(response_data)
         return response_data
 
+    def invalidate_bases_cache(self) -> None:
+        """Drops the cached result of list_bases() so the next call hits the API."""
+        self._bases_cache = None
+        self._bases_cache_expires_at = None
+
     def delete_base_user(self, base_id: str, user_id: str) -> bool:
         """
         Deletes/removes a user from a specific base.
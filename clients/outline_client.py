@@ -1,10 +1,30 @@
 import json
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Optional
+from typing import Iterator, Optional
 
+import orjson
 import requests
 
+from clients.http_session import (
+    RATE_LIMITED_RETRY_STATUS_FORCELIST,
+    RETRY_ALLOWED_METHODS_WITH_POST,
+    build_retry_adapter,
+    build_session,
+)
+
+# How long collection lookups (by name or by ID) are reused before hitting the API again.
+COLLECTION_CACHE_TTL_SECONDS = 60
+COLLECTION_CACHE_MAX_ENTRIES = 512
+
+# orjson parses and serializes noticeably faster than the stdlib json module on large list pages.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so the existing except clauses still apply.
+_loads = orjson.loads
+_dumps = orjson.dumps
+
 
 class OutlineAction(Enum):
     USER_ADDED_TO_COLLECTION_WITH_READ_ACCESS_AND_DM_SENT = (
@@ -32,11 +52,78 @@ class OutlineClient:
             raise ValueError("Outline base_url and token must be provided.")
         self.base_url = base_url.rstrip("/")  # Ensure no trailing slash
         self.token = token
+        # Endpoint URLs, built once instead of on every call.
+        api_root = f"{self.base_url}/api"
+        self._url_collections_list = f"{api_root}/collections.list"
+        self._url_collections_create = f"{api_root}/collections.create"
+        self._url_collections_info = f"{api_root}/collections.info"
+        self._url_collections_memberships = f"{api_root}/collections.memberships"
+        self._url_collections_add_user = f"{api_root}/collections.add_user"
+        self._url_collections_remove_user = f"{api_root}/collections.remove_user"
+        self._url_users_list = f"{api_root}/users.list"
+        self._url_users_info = f"{api_root}/users.info"
+        self._url_users_delete = f"{api_root}/users.delete"
         self.headers = {
             "Content-Type": "application/json",
             "Accept": "application/json",
             "Authorization": f"Bearer {self.token}",
         }
+        # Keep-alive pool shared by all calls (pagination, list+create in create_group, ...).
+        # Outline rate-limits its API: 429 responses are retried after their Retry-After delay.
+        # Every Outline call is a POST. The session keeps the idempotent-only default, so the mutating RPCs
+        # (collections.create/add_user/remove_user, users.delete) are resent on a 429 only, never after a read
+        # error or a 5xx that might follow a change already made.
+        self.session = build_session(
+            pool_maxsize=20, backoff_factor=0.3, status_forcelist=RATE_LIMITED_RETRY_STATUS_FORCELIST
+        )
+        # The read-only RPCs opt in to POST retries after 5xx and read errors.
+        read_adapter = build_retry_adapter(
+            pool_maxsize=20,
+            backoff_factor=0.3,
+            status_forcelist=RATE_LIMITED_RETRY_STATUS_FORCELIST,
+            allowed_methods=RETRY_ALLOWED_METHODS_WITH_POST,
+        )
+        for read_url in (
+            self._url_collections_list,
+            self._url_collections_info,
+            self._url_collections_memberships,
+            self._url_users_list,
+            self._url_users_info,
+        ):
+            self.session.mount(read_url, read_adapter)
+        self.session.headers.update(self.headers)
+        # Pages after the first one of collections.list / users.list are fetched with this many threads.
+        self._pagination_workers = 8
+        # Per-user requests of batch operations (e.g. remove_users_from_collection) use this many threads.
+        self._batch_workers = 8
+        # ("name", collection_name) or ("id", collection_id) -> (expires_at, collection)
+        self._collection_cache: dict[tuple[str, str], tuple[datetime, dict]] = {}
+
+    def _post(self, api_url: str, payload: dict) -> requests.Response:
+        """POSTs payload serialized with orjson (the session already sends the JSON Content-Type)."""
+        return self.session.post(api_url, data=_dumps(payload))
+
+    def _get_cached_collection(self, key: tuple[str, str]) -> dict | None:
+        """Returns the cached collection for key, or None if it is missing or expired."""
+        entry = self._collection_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, collection = entry
+        if datetime.now() >= expires_at:
+            del self._collection_cache[key]
+            return None
+        return collection
+
+    def _cache_collection(self, key: tuple[str, str], collection: dict) -> None:
+        """Caches a collection found by name or ID for COLLECTION_CACHE_TTL_SECONDS."""
+        if len(self._collection_cache) >= COLLECTION_CACHE_MAX_ENTRIES:
+            self._collection_cache.clear()
+        expires_at = datetime.now() + timedelta(seconds=COLLECTION_CACHE_TTL_SECONDS)
+        self._collection_cache[key] = (expires_at, collection)
+
+    def clear_cache(self) -> None:
+        """Drops every cached collection lookup."""
+        self._collection_cache.clear()
 
     def create_group(self, project_name: str) -> str:
         """
@@ -53,7 +140,7 @@ class OutlineClient:
             return None
 
         # 2. If not found (and no error during check), try to create it
-        create_api_url = f"{self.base_url}/api/collections.create"
+        create_api_url = self._url_collections_create
         payload = {"name": project_name}
 
         logging.debug(
@@ -61,13 +148,14 @@ class OutlineClient:
             f"Attempting to create with payload: {json.dumps(payload)}"
         )
         try:
-            response = requests.post(create_api_url, headers=self.headers, json=payload)
+            response = self._post(create_api_url, payload)
             if response.status_code == 200:
-                response_data = response.json()
+                response_data = _loads(response.content)
                 data_content = response_data.get("data")
                 if isinstance(data_content, dict) and data_content.get("id"):
                     collection_id = data_content.get("id")
                     logging.info(f"Outline collection '{project_name}' (ID: {collection_id}) created successfully.")
+                    self._cache_collection(("name", project_name), data_content)
                     return data_content  # Return the newly created collection object
                 else:
                     logging.warning(
@@ -78,7 +166,7 @@ class OutlineClient:
             else:
                 error_details_msg = ""
                 try:
-                    error_json = response.json()
+                    error_json = _loads(response.content)
                     error_details_msg = f" (API Error: {error_json.get('message', 'No specific message')})"
                 except json.JSONDecodeError:
                     error_details_msg = " (Could not parse JSON error response)"
@@ -96,17 +184,17 @@ class OutlineClient:
         :param email: The email address of the user to find.
         :return: A dictionary containing the user data if found, None otherwise.
         """
-        api_url = f"{self.base_url}/api/users.list"
+        api_url = self._url_users_list
         payload = {
             "emails": [email.lower()],  # API expects a list, convert email to lowercase for case-insensitivity
             "limit": 1,  # We only expect one user or none
         }
         logging.debug(f"Outline API >> Getting user by email '{email}' with payload: {json.dumps(payload)}")
         try:
-            response = requests.post(api_url, headers=self.headers, json=payload)
+            response = self._post(api_url, payload)
             response.raise_for_status()  # Check for HTTP errors like 401, 403, etc.
 
-            response_data = response.json()
+            response_data = _loads(response.content)
             users = response_data.get("data", [])
 
             if users and len(users) > 0:
@@ -138,45 +226,53 @@ class OutlineClient:
         :param limit: The number of items to return per page. Max 100.
         :return: A list of collection objects or a single collection object, or None on failure.
         """
-        api_url = f"{self.base_url}/api/collections.list"
-        all_collections = []
-        offset = 0
+        api_url = self._url_collections_list
 
         if name:
+            cached_collection = self._get_cached_collection(("name", name))
+            if cached_collection is not None:
+                logging.debug(f"Outline API >> Using cached collection '{name}'.")
+                return cached_collection
             logging.debug(f"Outline API >> Attempting to find collection by name '{name}'.")
         else:
             logging.info("Outline API >> Listing all collections...")
 
         try:
-            while True:
-                payload = {"limit": min(limit, 100), "offset": offset}
-                if name:
-                    payload["query"] = name
-                response = requests.post(api_url, headers=self.headers, json=payload)
-                response.raise_for_status()
-                response_data = response.json()
-                collections = response_data.get("data", [])
-                pagination = response_data.get("pagination", {})
-                total = pagination.get("total", 0)
-
-                if name:
-                    if collections:
-                        for collection in collections:
-                            if collection.get("name") == name:
-                                logging.info(f"Found Outline collection '{name}' (ID: {collection.get('id')}).")
-                                return collection
-                        logging.info(f"Outline collection named '{name}' not found after checking results.")
-                        return []  # Aucun nom exactement égal
-                    else:
-                        logging.info(f"Outline collection named '{name}' not found after checking all collections.")
-                        return []
+            payload = {"limit": min(limit, 100), "offset": 0}
+            if name:
+                payload["query"] = name
+            response = self._post(api_url, payload)
+            response.raise_for_status()
+            response_data = _loads(response.content)
+            collections = response_data.get("data", [])
+            pagination = response_data.get("pagination", {})
+            total = pagination.get("total", 0)
+
+            if name:
+                if collections:
+                    # The query is a fuzzy match: only page through the rest of its results when the
+                    # first page is ambiguous (more matches than one page, none of them exact).
+                    candidates = collections
+                    if len(collections) < total and not any(c.get("name") == name for c in collections):
+                        logging.debug(f"Outline API >> No exact match for '{name}' on page 1, checking the rest.")
+                        candidates = collections + self._fetch_remaining_pages(
+                            api_url, len(collections), total, extra_payload={"query": name}
+                        )
+                    for collection in candidates:
+                        if collection.get("name") == name:
+                            logging.info(f"Found Outline collection '{name}' (ID: {collection.get('id')}).")
+                            # Only hits are cached: a miss must be re-checked before create_group creates it.
+                            self._cache_collection(("name", name), collection)
+                            return collection
+                    logging.info(f"Outline collection named '{name}' not found after checking results.")
+                    return []  # Aucun nom exactement égal
                 else:
-                    all_collections.extend(collections)
-
-                if not collections or len(all_collections) >= total:
-                    break
+                    logging.info(f"Outline collection named '{name}' not found after checking all collections.")
+                    return []
 
-                offset += len(all_collections)
+            all_collections = list(collections)
+            if collections and len(all_collections) < total:
+                all_collections.extend(self._fetch_remaining_pages(api_url, len(collections), total))
 
             logging.info(f"Successfully fetched {len(all_collections)} Outline collections.")
             return all_collections
@@ -190,6 +286,30 @@ class OutlineClient:
             logging.error(f"Error decoding JSON from Outline collections.list response: {e}")
             return None
 
+    def _fetch_remaining_pages(
+        self, api_url: str, page_size: int, total: int, extra_payload: Optional[dict] = None
+    ) -> list[dict]:
+        """
+        Fetches every page after the first one of a paginated list endpoint concurrently.
+        :param api_url: The list endpoint (e.g. collections.list, users.list).
+        :param page_size: The number of items the API returned on the first page.
+        :param total: The total number of items announced by the first page's pagination block.
+        :param extra_payload: Filters sent with the first page (e.g. {"query": name}), repeated on every page.
+        :return: The items of the remaining pages, in offset order.
+        HTTP and JSON errors are propagated to the caller.
+        """
+        offsets = list(range(page_size, total, page_size))
+
+        def fetch_page(offset: int) -> list[dict]:
+            response = self._post(api_url, {**(extra_payload or {}), "limit": page_size, "offset": offset})
+            response.raise_for_status()
+            return _loads(response.content).get("data", [])
+
+        logging.debug(f"Outline API >> Fetching {len(offsets)} more page(s) from {api_url} concurrently.")
+        with ThreadPoolExecutor(max_workers=max(1, min(self._pagination_workers, len(offsets)))) as executor:
+            pages = list(executor.map(fetch_page, offsets))  # map() keeps the offset order
+        return [item for page in pages for item in page]
+
     def get_collection_members(self, collection_id: str, limit: int = 100) -> list[str] | None:
         """
         Retrieves user IDs of members for a specific collection.
@@ -201,7 +321,7 @@ class OutlineClient:
             logging.error("Collection ID must be provided to get collection members.")
             return None
 
-        api_url = f"{self.base_url}/api/collections.memberships"
+        api_url = self._url_collections_memberships
         member_user_ids = []
         offset = 0
         page_count = 0
@@ -220,9 +340,9 @@ class OutlineClient:
                     f"Outline API >> Fetching page {page_count} for collection members "
                     f"(offset: {offset}, limit: {payload['limit']})"
                 )
-                response = requests.post(api_url, headers=self.headers, json=payload)
+                response = self._post(api_url, payload)
                 response.raise_for_status()
-                response_data = response.json()
+                response_data = _loads(response.content)
 
                 data_block = response_data.get("data", {})
                 memberships = data_block.get("memberships", [])
@@ -280,7 +400,7 @@ class OutlineClient:
         :param permission: The permission level to grant (e.g., "read", "read_write"). Defaults to "read".
         :return: True if the user was successfully added (or was already a member with compatible permissions), False otherwise.
         """
-        api_url = f"{self.base_url}/api/collections.add_user"
+        api_url = self._url_collections_add_user
         payload = {
             "id": collection_id,
             "userId": user_id,
@@ -292,10 +412,10 @@ class OutlineClient:
         )  # noqa: E501
         logging.debug(log_msg)
         try:
-            response = requests.post(api_url, headers=self.headers, json=payload)
+            response = self._post(api_url, payload)
             response.raise_for_status()
 
-            response_data = response.json()
+            response_data = _loads(response.content)
             if response_data and "data" in response_data:
                 logging.info(
                     f"Successfully processed add_user_to_collection for user ID '{user_id}' to collection ID '{collection_id}'."  # noqa: E501
@@ -336,19 +456,25 @@ class OutlineClient:
             logging.error("Collection ID must be provided to get collection details.")
             return None
 
-        api_url = f"{self.base_url}/api/collections.info"
+        cached_collection = self._get_cached_collection(("id", collection_id))
+        if cached_collection is not None:
+            logging.debug(f"Outline API >> Using cached details for collection ID '{collection_id}'.")
+            return cached_collection
+
+        api_url = self._url_collections_info
         payload = {"id": collection_id}
         logging.debug(f"Outline API >> Getting collection details for ID '{collection_id}'")
 
         try:
-            response = requests.post(api_url, headers=self.headers, json=payload)
+            response = self._post(api_url, payload)
             response.raise_for_status()
 
-            response_data = response.json()
+            response_data = _loads(response.content)
             collection_data = response_data.get("data")
 
             if collection_data:
                 logging.info(f"Successfully fetched details for Outline collection ID '{collection_id}'.")
+                self._cache_collection(("id", collection_id), collection_data)
                 return collection_data
             else:
                 logging.warning(
@@ -382,14 +508,14 @@ class OutlineClient:
             logging.error("User ID must be provided to get user by ID.")
             return None
 
-        api_url = f"{self.base_url}/api/users.info"
+        api_url = self._url_users_info
         payload = {"id": user_id}
         logging.debug(f"Outline API >> Getting user by ID '{user_id}'")
 
         try:
-            response = requests.post(api_url, headers=self.headers, json=payload)
+            response = self._post(api_url, payload)
             response.raise_for_status()
-            response_data = response.json()
+            response_data = _loads(response.content)
             user_data = response_data.get("data")
 
             if user_data:
@@ -440,7 +566,7 @@ class OutlineClient:
             logging.error("Collection ID and User ID must be provided to remove user from collection.")
             return False
 
-        api_url = f"{self.base_url}/api/collections.remove_user"
+        api_url = self._url_collections_remove_user
         payload = {
             "id": collection_id,  # Corrigé: "id" au lieu de "collectionId"
             "userId": user_id,
@@ -449,18 +575,20 @@ class OutlineClient:
             f"Outline API >> Removing user ID '{user_id}' from collection ID '{collection_id}'. Payload: {json.dumps(payload)}"
         )
         try:
-            response = requests.post(api_url, headers=self.headers, json=payload)
+            response = self._post(api_url, payload)
             response.raise_for_status()  # Check for HTTP errors
 
             # Outline API usually returns a success boolean or specific data structure
             # For remove_user, a 200 OK with {"success": true} is common, or 204 No Content
             if response.status_code == 204:  # Successfully removed, no content
                 logging.info(f"Successfully removed user ID '{user_id}' from Outline collection ID '{collection_id}'.")
+                self._collection_cache.pop(("id", collection_id), None)
                 return True
 
-            response_data = response.json()
+            response_data = _loads(response.content)
             if response_data.get("success"):
                 logging.info(f"Successfully removed user ID '{user_id}' from Outline collection ID '{collection_id}'.")
+                self._collection_cache.pop(("id", collection_id), None)
                 return True
             else:
                 # This case handles 200 OK but success:false or missing success field
@@ -491,39 +619,53 @@ class OutlineClient:
             )
             return False
 
+    def remove_users_from_collection(self, collection_id: str, user_ids: list[str]) -> dict[str, bool]:
+        """
+        Removes several users from an Outline collection, issuing the requests concurrently.
+        :param collection_id: The ID of the collection.
+        :param user_ids: The IDs of the users to remove.
+        :return: A dict mapping each user ID to True if it was removed, False otherwise.
+        """
+        if not user_ids:
+            return {}
+
+        logging.info(f"Outline API >> Removing {len(user_ids)} user(s) from collection ID '{collection_id}'.")
+        with ThreadPoolExecutor(max_workers=min(self._batch_workers, len(user_ids))) as executor:
+            removed = executor.map(lambda user_id: self.remove_user_from_collection(collection_id, user_id), user_ids)
+            return dict(zip(user_ids, removed))
+
     def list_users(self, limit: int = 100) -> list[dict] | None:
         """
         Retrieves all users from Outline, handling pagination.
         :param limit: The number of users to return per page. Max 100.
         :return: A list of user objects, or None on failure.
         """
-        api_url = f"{self.base_url}/api/users.list"
-        all_users = []
-        offset = 0
+        api_url = self._url_users_list
 
         logging.info("Outline API >> Listing all users...")
 
         try:
-            while True:
-                # The payload should be `json=None` as the user mentioned, but the API probably expects a body for POST.
-                # An empty json body `{}` is safer. Or `json=payload`.
-                # The user mentioned `offset` and `limit` as parameters, so I will use them.
-                payload = {"limit": min(limit, 100), "offset": offset}
-                response = requests.post(api_url, headers=self.headers, json=payload)
-                response.raise_for_status()
-                response_data = response.json()
-                users = response_data.get("data", [])
-
-                all_users.extend(users)
-
-                pagination = response_data.get("pagination", {})
-                total = pagination.get("total")  # Can be None if not provided by API
+            payload = {"limit": min(limit, 100), "offset": 0}
+            response = self._post(api_url, payload)
+            response.raise_for_status()
+            response_data = _loads(response.content)
+            users = response_data.get("data", [])
+            all_users = list(users)
 
-                # Stop if we've received all users
-                if not users or (total is not None and len(all_users) >= total):
-                    break
+            pagination = response_data.get("pagination", {})
+            total = pagination.get("total")  # Can be None if not provided by API
 
-                offset += len(users)
+            if users and total is not None:
+                if len(all_users) < total:
+                    all_users.extend(self._fetch_remaining_pages(api_url, len(users), total))
+            else:
+                # Without a total the page count is unknown: walk the pages until an empty one.
+                while users:
+                    payload = {"limit": min(limit, 100), "offset": len(all_users)}
+                    response = self._post(api_url, payload)
+                    response.raise_for_status()
+                    users = _loads(response.content).get("data", [])
+                    all_users.extend(users)
 
             logging.info(f"Successfully fetched {len(all_users)} Outline users.")
             return all_users
@@ -537,6 +679,69 @@ class OutlineClient:
             logging.error(f"Error decoding JSON from Outline users.list response: {e}")
             return None
 
+    def _iter_pages(self, api_url: str, limit: int = 100, prefetch: int = 1) -> Iterator[list[dict]]:
+        """
+        Yields the pages of a paginated list endpoint one at a time. While the caller processes a page,
+        the next `prefetch` pages are already being fetched in the background.
+        :param api_url: The list endpoint (e.g. collections.list, users.list).
+        :param limit: The number of items to request per page. Max 100.
+        :param prefetch: How many pages to request ahead of the one being consumed (at least 1).
+        HTTP and JSON errors are propagated to the caller.
+        """
+        page_size = min(limit, 100)
+        window = max(1, prefetch)
+
+        def fetch_page(offset: int) -> dict:
+            response = self._post(api_url, {"limit": page_size, "offset": offset})
+            response.raise_for_status()
+            return _loads(response.content)
+
+        executor = ThreadPoolExecutor(max_workers=window)
+        try:
+            in_flight = deque([(0, executor.submit(fetch_page, 0))])  # (offset, future), in offset order
+            next_offset = page_size
+            total = None
+            while in_flight:
+                offset, future = in_flight.popleft()
+                response_data = future.result()
+                items = response_data.get("data", [])
+                if not items:
+                    return
+                total = response_data.get("pagination", {}).get("total", total)
+                end = offset + len(items)
+                if len(items) < page_size:
+                    # A short page means the pages requested ahead used the wrong offsets: restart after it.
+                    for _, stale in in_flight:
+                        stale.cancel()
+                    in_flight.clear()
+                    next_offset = end
+                while len(in_flight) < window and (total is None or next_offset < total):
+                    in_flight.append((next_offset, executor.submit(fetch_page, next_offset)))
+                    next_offset += page_size
+                yield items
+                if total is not None and end >= total:
+                    return
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_collections(self, limit: int = 100) -> Iterator[dict]:
+        """
+        Yields every Outline collection page by page, without holding the full list in memory.
+        Unlike list_collections(), request and JSON errors are raised instead of returning None.
+        :param limit: The number of collections to request per page. Max 100.
+        """
+        for page in self._iter_pages(self._url_collections_list, limit):
+            yield from page
+
+    def iter_users(self, limit: int = 100) -> Iterator[dict]:
+        """
+        Yields every Outline user page by page, without holding the full list in memory.
+        Unlike list_users(), request and JSON errors are raised instead of returning None.
+        :param limit: The number of users to request per page. Max 100.
+        """
+        for page in self._iter_pages(self._url_users_list, limit):
+            yield from page
+
     def delete_user(self, user_id: str) -> bool:
         """
         Deletes a user from Outline.
@@ -547,21 +752,23 @@ class OutlineClient:
             logging.error("User ID must be provided to delete a user.")
             return False
 
-        api_url = f"{self.base_url}/api/users.delete"
+        api_url = self._url_users_delete
         payload = {"id": user_id}
         logging.info(f"Outline API >> Deleting user ID '{user_id}'. Payload: {json.dumps(payload)}")
         try:
-            response = requests.post(api_url, headers=self.headers, json=payload)
+            response = self._post(api_url, payload)
             response.raise_for_status()
 
             # A successful deletion might return 204 No Content
             if response.status_code == 204:
                 logging.info(f"Successfully deleted user ID '{user_id}' from Outline.")
+                self.clear_cache()
                 return True
 
-            response_data = response.json()
+            response_data = _loads(response.content)
             if response_data.get("success"):
                 logging.info(f"Successfully deleted user ID '{user_id}' from Outline.")
+                self.clear_cache()
                 return True
             else:
                 logging.warning(
@@ -2,11 +2,15 @@ import json
 import logging
 import os
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from enum import Enum
 
 import requests
 
+from clients.http_session import build_session
+
 
 class VaultwardenAction(Enum):
     USER_INVITED_TO_COLLECTION = "USER_INVITED_TO_VW_COLLECTION"
@@ -53,14 +57,46 @@ class VaultwardenClient:
         self.bw_session = os.getenv("BW_SESSION")
         self.api_token = None
         self.api_token_expires_at = None
+        # Serializes token refreshes: the threads of a batch that all find the token expired request it once.
+        self._token_lock = threading.Lock()
+        # Token requests and API calls share pooled keep-alive connections, with retries on connection errors
+        # and 502/503/504.
+        self.session = build_session()
+        # Per-user requests of batch operations (e.g. invite_users_to_collection) use this many threads.
+        self._batch_workers = 8
 
         # self._ensure_server_configuration() # REMOVED: This call is too aggressive.
 
+    def _cached_api_token(self) -> str | None:
+        """The cached API token if it has not expired yet, else None."""
+        token, expires_at = self.api_token, self.api_token_expires_at
+        if token and expires_at and datetime.now() < expires_at:
+            return token
+        return None
+
     def _get_api_token(self) -> str | None:
-        if self.api_token and self.api_token_expires_at and datetime.now() < self.api_token_expires_at:
+        token = self._cached_api_token()
+        if token:
             logging.info("Using cached Vaultwarden API token.")
-            return self.api_token
+            return token
+
+        with self._token_lock:
+            # Another thread may have refreshed the token while this one waited for the lock.
+            token = self._cached_api_token()
+            if token:
+                logging.info("Using Vaultwarden API token refreshed by another request.")
+                return token
+            return self._request_api_token()
+
+    def _invalidate_api_token(self, rejected_token: str) -> None:
+        """Drops the cached token after a 401, unless another thread already replaced rejected_token."""
+        with self._token_lock:
+            if self.api_token == rejected_token:
+                self.api_token = None
+                self.api_token_expires_at = None
 
+    def _request_api_token(self) -> str | None:
+        """Requests and caches a new API token. Callers must hold self._token_lock."""
         logging.info("No valid cached token. Requesting new Vaultwarden API token.")
         if not self.api_username or not self.api_password:
             logging.error("Vaultwarden API username or password not configured. Cannot get API token.")
@@ -84,7 +120,7 @@ class VaultwardenClient:
 
         try:
             logging.debug(f"Requesting API token from {token_url} for user {self.api_username}")
-            response = requests.post(token_url, data=payload, headers=headers)
+            response = self.session.post(token_url, data=payload, headers=headers)
             response.raise_for_status()
             token_data = response.json()
             access_token = token_data.get("access_token")
@@ -215,6 +251,32 @@ class VaultwardenClient:
             logging.error(f"Request error inviting user {user_email} to collection {collection_id}: {e}")
             return False
 
+    def invite_users_to_collection(
+        self,
+        user_emails: list[str],
+        collection_id: str,
+        organization_id: str,
+    ) -> dict[str, bool]:
+        """
+        Invites several users to a Vaultwarden collection, issuing the requests concurrently.
+        :param user_emails: The emails of the users to invite.
+        :param collection_id: The ID of the collection.
+        :param organization_id: The ID of the organization owning the collection.
+        :return: A dict mapping each email to True if it was invited (or already was), False otherwise.
+        """
+        if not user_emails:
+            return {}
+
+        logging.info(f"Inviting {len(user_emails)} user(s) to Vaultwarden collection {collection_id}.")
+        # Fetch the API token up front so the worker threads share it instead of each requesting one.
+        self._get_api_token()
+        with ThreadPoolExecutor(max_workers=min(self._batch_workers, len(user_emails))) as executor:
+            invited = executor.map(
+                lambda user_email: self.invite_user_to_collection(user_email, collection_id, organization_id),
+                user_emails,
+            )
+            return dict(zip(user_emails, invited))
+
     def _run_bw_command(
         self,
         command_parts: list[str],
@@ -481,14 +543,13 @@ class VaultwardenClient:
         kwargs["headers"] = headers
 
         try:
-            response = requests.request(method, url, **kwargs)
+            response = self.session.request(method, url, **kwargs)
             response.raise_for_status()
             return response
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 401:
                 logging.warning("Token may have expired or been invalidated. Refreshing token and retrying.")
-                self.api_token = None  # Invalidate the token
-                self.api_token_expires_at = None
+                self._invalidate_api_token(access_token)
                 access_token = self._get_api_token()  # Force refresh
                 if not access_token:
                     logging.error("Failed to refresh token.")
@@ -497,7 +558,7 @@ class VaultwardenClient:
                 headers["Authorization"] = f"Bearer {access_token}"
                 kwargs["headers"] = headers
                 try:
-                    response = requests.request(method, url, **kwargs)
+                    response = self.session.request(method, url, **kwargs)
                     response.raise_for_status()
                     return response
                 except requests.exceptions.RequestException as retry_e:
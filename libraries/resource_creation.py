@@ -160,7 +160,8 @@ async def create_resources_for_entity(
         outline_msg = f"  - Outline Collection `{outline_coll_name}`: "
         if clients.get("outline"):
             try:
-                collection_obj = clients.get("outline").create_group(outline_coll_name)
+                # Run in a worker thread so the list+create round-trips do not block the event loop.
+                collection_obj = await asyncio.to_thread(clients.get("outline").create_group, outline_coll_name)
                 if collection_obj and collection_obj.get("id"):
                     outline_msg += ":white_check_mark: Collection assurée (créée ou existante)."
                 else:
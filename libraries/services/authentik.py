@@ -26,7 +26,8 @@ class AuthentikService(SyncService):
     ) -> tuple[list[dict], set]:  # Returns results and set of targeted authentik pks
         """
         Ensures that the given Mattermost users are in the specified Authentik group.
-        Adds users to the group if they are not already members.
+        Adds users to the group if they are not already members, all in one batch, or one by one if the
+        batch fails.
         Returns a list of action results and a set of Authentik PKs that were targeted (found in MM and Authentik).
         """
         results = []
@@ -39,6 +40,9 @@ class AuthentikService(SyncService):
             # Potentially return a result indicating this failure
             return results, targeted_auth_pks
 
+        # (Authentik PK, result) of the users to add; each result is already in `results`
+        # and is completed once the batch has been sent.
+        pending_additions = []
         for mm_user in mm_users_to_ensure:
             mm_username = mm_user.get("username", "UnknownUser")
             mm_user_email_lower = mm_user.get("email", "").lower()
@@ -85,20 +89,7 @@ class AuthentikService(SyncService):
             else:
                 targeted_auth_pks.add(auth_pk_for_mm_user)
                 if auth_pk_for_mm_user not in current_auth_user_pks_in_group:
-                    if authentik_client.add_user_to_group(auth_group_pk, auth_pk_for_mm_user):
-                        auth_user_result.update(
-                            {
-                                "status": SyncStatus.SUCCESS.value,
-                                "action": AuthentikAction.USER_ADDED_TO_GROUP.value,
-                            }
-                        )
-                    else:
-                        auth_user_result.update(
-                            {
-                                "action": "FAILED_TO_ADD_TO_AUTHENTIK_GROUP",
-                                "error_message": "API call to add user to Authentik group failed.",
-                            }
-                        )
+                    pending_additions.append((auth_pk_for_mm_user, auth_user_result))
                 else:
                     auth_user_result.update(
                         {
@@ -108,6 +99,30 @@ class AuthentikService(SyncService):
                     )
             results.append(auth_user_result)
 
+        if pending_additions:
+            added = authentik_client.add_users_to_group(auth_group_pk, [auth_pk for auth_pk, _ in pending_additions])
+            if not added:
+                # One bad PK or a transient error must not fail the whole group: retry the users one by one.
+                logging.warning(
+                    f"Batch addition to Authentik group '{auth_group_name}' failed. "
+                    f"Adding its {len(pending_additions)} user(s) one by one."
+                )
+            for auth_pk, auth_user_result in pending_additions:
+                if added or authentik_client.add_user_to_group(auth_group_pk, auth_pk):
+                    auth_user_result.update(
+                        {
+                            "status": SyncStatus.SUCCESS.value,
+                            "action": AuthentikAction.USER_ADDED_TO_GROUP.value,
+                        }
+                    )
+                else:
+                    auth_user_result.update(
+                        {
+                            "action": "FAILED_TO_ADD_TO_AUTHENTIK_GROUP",
+                            "error_message": "API call to add user to Authentik group failed.",
+                        }
+                    )
+
         return results, targeted_auth_pks
 
     def _sync_single_authentik_group(
@@ -239,30 +239,33 @@ class OutlineService(SyncService):
         target_outline_ids_for_collection.update(mm_targeted_outline_ids)
         return results
 
-    def _remove_user_from_outline_collection(
+    def _remove_users_from_outline_collection(
         self,
         outline_client: "OutlineClient",
         collection_id: str,
         collection_name: str,
-        user_id: str,
-        user_email: str,
+        users_to_remove: dict[str, str],  # Outline user ID -> email
         mm_channel_context_name: str,
-    ) -> dict:
-        """Removes a user from an Outline collection and returns a result dictionary."""
-        result = {
-            "service": "OUTLINE",
-            "target_resource_name": collection_name,
-            "mm_user_email": user_email,
-            "mm_channel_display_name": mm_channel_context_name,
-            "status": SyncStatus.FAILURE.value,
-            "action": "FAILED_TO_REMOVE_FROM_OUTLINE_COLLECTION",
-        }
-        if outline_client.remove_user_from_collection(collection_id, user_id):
-            result["status"] = SyncStatus.SUCCESS.value
-            result["action"] = OutlineAction.USER_REMOVED_FROM_COLLECTION.value
-        else:
-            result["error_message"] = "API call to remove user from Outline collection failed."
-        return result
+    ) -> list[dict]:
+        """Removes users from an Outline collection in one batch and returns a result dictionary per user."""
+        removed_by_user_id = outline_client.remove_users_from_collection(collection_id, list(users_to_remove))
+        results = []
+        for user_id, user_email in users_to_remove.items():
+            result = {
+                "service": "OUTLINE",
+                "target_resource_name": collection_name,
+                "mm_user_email": user_email,
+                "mm_channel_display_name": mm_channel_context_name,
+                "status": SyncStatus.FAILURE.value,
+                "action": "FAILED_TO_REMOVE_FROM_OUTLINE_COLLECTION",
+            }
+            if removed_by_user_id.get(user_id):
+                result["status"] = SyncStatus.SUCCESS.value
+                result["action"] = OutlineAction.USER_REMOVED_FROM_COLLECTION.value
+            else:
+                result["error_message"] = "API call to remove user from Outline collection failed."
+            results.append(result)
+        return results
 
     def _map_outline_collection_to_entity_and_base_name(
         self, collection_name: str, permissions_matrix: dict
@@ -340,19 +343,21 @@ class OutlineService(SyncService):
             outline_user_emails = {user.get("email", "").lower() for user in outline_users if user.get("email")}
 
             # Remove users from Outline collection if they are not in Mattermost
+            users_to_remove = {}
             for user in outline_users:
                 user_email = user.get("email", "").lower()
                 if user_email and user_email not in mm_user_emails:
-                    results.append(
-                        self._remove_user_from_outline_collection(
-                            self.client,
-                            collection_id,
-                            collection_name,
-                            user["id"],
-                            user_email,
-                            base_name,
-                        )
+                    users_to_remove[user["id"]] = user_email
+            if users_to_remove:
+                results.extend(
+                    self._remove_users_from_outline_collection(
+                        self.client,
+                        collection_id,
+                        collection_name,
+                        users_to_remove,
+                        base_name,
                     )
+                )
 
             # Add users to Outline collection if they are in Mattermost but not in Outline
             missing_mm_users_for_permission = {
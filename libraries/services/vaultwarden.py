@@ -38,6 +38,9 @@ class VaultwardenService(SyncService):
             # Could append a result indicating this failure
             return results
 
+        # (email, Mattermost user data, result) of the users to invite; each result is already in `results`
+        # and is completed once the batch of invitations has been sent.
+        pending_invites = []
         for email_lower, mm_user_data in mm_users_for_services.items():
             mm_username = mm_user_data.get("username", "UnknownUser")
 
@@ -76,12 +79,20 @@ class VaultwardenService(SyncService):
             logging.debug(
                 f"Attempting to invite {email_lower} to Vaultwarden collection '{collection_name}' (ID: {collection_id}) via ensure function."
             )
-            success = vaultwarden_client.invite_user_to_collection(
-                user_email=email_lower,
-                collection_id=collection_id,
-                organization_id=vaultwarden_client.organization_id,
-            )
+            pending_invites.append((email_lower, mm_user_data, invite_result))
+            results.append(invite_result)
+
+        if not pending_invites:
+            return results
 
+        invited_by_email = vaultwarden_client.invite_users_to_collection(
+            user_emails=[email_lower for email_lower, _, _ in pending_invites],
+            collection_id=collection_id,
+            organization_id=vaultwarden_client.organization_id,
+        )
+        for email_lower, mm_user_data, invite_result in pending_invites:
+            mm_username = mm_user_data.get("username", "UnknownUser")
+            success = invited_by_email.get(email_lower)
             action_verb = VaultwardenAction.USER_INVITED_TO_COLLECTION.value
             if success:
                 invite_result.update({"status": SyncStatus.SUCCESS.value, "action": action_verb})
@@ -112,7 +123,6 @@ class VaultwardenService(SyncService):
                         "error_message": f"API call to invite {email_lower} to VW collection {collection_name} failed or user already member/invited. See client logs.",
                     }
                 )
-            results.append(invite_result)
 
         return results
 
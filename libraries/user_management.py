@@ -2,6 +2,7 @@ import logging
 import os
 from typing import List
 
+import requests
 from clients.outline_client import OutlineClient
 from clients.nocodb_client import NocoDBClient
 from clients.mattermost_client import MattermostClient
@@ -53,12 +54,15 @@ def remove_inactive_outline_users(authentik_user_emails: set):
         return
 
     outline_client = OutlineClient(base_url=OUTLINE_URL, token=OUTLINE_TOKEN)
-    outline_users = outline_client.list_users()
-    if outline_users is None:
-        logging.error("Failed to fetch users from Outline.")
+    # Only the email -> ID map is needed, so users are streamed page by page instead of listed.
+    try:
+        outline_users_map = {
+            user["email"].lower(): user["id"] for user in outline_client.iter_users() if "email" in user
+        }
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logging.error(f"Failed to fetch users from Outline: {e}")
         return
 
-    outline_users_map = {user["email"].lower(): user["id"] for user in outline_users if "email" in user}
     logging.info(f"Found {len(outline_users_map)} users in Outline.")
 
     users_to_remove = [